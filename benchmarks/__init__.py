@@ -0,0 +1 @@
+"""Бенчмарки бота на локальной замене панели S-UI."""
@@ -0,0 +1,122 @@
+"""
+Бенчмарк разбора JSON ответов панели.
+
+    python -m benchmarks.decode
+    python -m benchmarks.decode --clients 10000,100000 --repeat 20
+
+Ответы /apiv2/clients и /apiv2/load собираются из тех же синтетических
+данных, что и в benchmarks.run. Для каждого способа разбора выводятся
+медианное время, пик выделенной памяти во время разбора и объём
+результата (tracemalloc):
+
+- json (str) - как aiohttp response.json(): тело декодируется в строку,
+  затем json.loads;
+- json, orjson, msgspec - JSONDecoder с этим бэкендом, разбор из bytes;
+- typed - JSONDecoder.decode_typed() с каждым бэкендом сразу в модели
+  src.models, как это делает SUiClient (msgspec разбирает в типы сам,
+  остальные бэкенды - разбор и convert()).
+
+Объём результата показывает, сколько памяти занимают клиенты в кэше:
+словари ответа против моделей со слотами.
+"""
+
+import argparse
+import functools
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from benchmarks.fake_panel import make_dataset
+from src.json_codec import JSONDecoder, available_backends
+from src.models import ClientsObj, LoadData
+from src.sui_api import response_type
+
+DEFAULT_SIZES = "1000,10000,100000"
+
+# Модели поля obj по эндпоинтам
+MODELS = {"clients": ClientsObj, "load": LoadData}
+
+
+def payloads(clients: int) -> dict[str, bytes]:
+    """Тела ответов /apiv2/clients и /apiv2/load."""
+    data = make_dataset(clients)
+    load = {key: data[key] for key in ("config", "clients", "tls", "inbounds", "outbounds")}
+    load |= {"endpoints": [], "services": [], "subURI": "", "onlines": data["onlines"]}
+    return {
+        "clients": json.dumps({"success": True, "msg": "", "obj": {"clients": data["clients"]}}).encode(),
+        "load": json.dumps({"success": True, "msg": "", "obj": load}).encode(),
+    }
+
+
+def decoders(endpoint: str) -> dict[str, Callable[[bytes], Any]]:
+    """Способы разбора ответа эндпоинта по имени."""
+    result: dict[str, Callable[[bytes], Any]] = {
+        "json (str)": lambda body: json.loads(body.decode("utf-8")),
+    }
+    for backend in available_backends():
+        result[backend] = JSONDecoder(backend).decode
+    model = response_type(MODELS[endpoint])
+    for backend in available_backends():
+        typed = JSONDecoder(backend)
+        label = f"typed ({backend})" if typed.native_typed else f"typed ({backend}+convert)"
+        result[label] = functools.partial(typed.decode_typed, tp=model)
+    return result
+
+
+def measure(decode: Callable[[bytes], Any], body: bytes, repeat: int) -> dict[str, float]:
+    """Время, пик памяти и объём результата одного способа разбора."""
+    decode(body)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        decode(body)
+        timings.append(time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    result = decode(body)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {
+        "median_ms": statistics.median(timings) * 1000,
+        "peak_kb": (peak - before) / 1024,
+        "retained_kb": (retained - before) / 1024,
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Бенчмарк разбора JSON ответов панели")
+    parser.add_argument("--clients", default=DEFAULT_SIZES, help=f"размеры наборов через запятую ({DEFAULT_SIZES})")
+    parser.add_argument("--repeat", type=int, default=10, help="повторов для замера времени")
+    parser.add_argument("--json", help="сохранить результаты в файл")
+    args = parser.parse_args(argv)
+
+    report: dict[int, dict] = {}
+    for clients in [int(size) for size in args.clients.split(",") if size.strip()]:
+        report[clients] = {}
+        for endpoint, body in payloads(clients).items():
+            print(f"\n=== {endpoint}, {clients} клиентов, {len(body) / 1024:.0f} KB ===")
+            header = f"{'способ':<24}{'median ms':>11}{'peak KB':>11}{'result KB':>11}"
+            print(header)
+            print("-" * len(header))
+            results = {}
+            for name, decode in decoders(endpoint).items():
+                r = results[name] = measure(decode, body, args.repeat)
+                print(f"{name:<24}{r['median_ms']:>11.2f}{r['peak_kb']:>11.0f}{r['retained_kb']:>11.0f}")
+            report[clients][endpoint] = results
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nРезультаты сохранены в {args.json}")
+
+
+if __name__ == "__main__":
+    main()
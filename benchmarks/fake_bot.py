@@ -0,0 +1,94 @@
+"""Бот без Telegram: запросы к Bot API записываются, а не отправляются."""
+
+import itertools
+from collections import Counter
+from collections.abc import AsyncGenerator
+from datetime import datetime
+from typing import Any
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import SendDocument, SendMessage, TelegramMethod
+from aiogram.types import CallbackQuery, Chat, Message, Update, User
+
+CHAT_ID = 1
+
+
+class RecordingSession(BaseSession):
+    """Сессия бота, которая считает вызовы методов и объём текста."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls: Counter[str] = Counter()
+        self.text_bytes = 0
+        # Содержимое, которое получает bot.download() для любого файла
+        self.download_payload = b""
+        self._message_ids = itertools.count(1000)
+
+    async def make_request(self, bot: Bot, method: TelegramMethod[Any], timeout: int | None = None) -> Any:
+        self.calls[type(method).__name__] += 1
+        text = getattr(method, "text", None)
+        if isinstance(text, str):
+            self.text_bytes += len(text.encode())
+        if isinstance(method, (SendMessage, SendDocument)):
+            return Message(
+                message_id=next(self._message_ids),
+                date=datetime.now(),
+                chat=Chat(id=CHAT_ID, type="private"),
+            )
+        # editMessageText, answerCallbackQuery и остальные возвращают True
+        return True
+
+    async def close(self):
+        pass
+
+    async def stream_content(
+        self,
+        url: str,
+        headers: dict[str, Any] | None = None,
+        timeout: int = 30,
+        chunk_size: int = 65536,
+        raise_for_status: bool = True,
+    ) -> AsyncGenerator[bytes, None]:
+        """Скачивание файла: отдаёт download_payload кусками по chunk_size."""
+        self.calls["stream_content"] += 1
+        payload = self.download_payload
+        for start in range(0, len(payload), chunk_size):
+            yield payload[start:start + chunk_size]
+
+
+def make_bot() -> Bot:
+    """Бот с записывающей сессией."""
+    return Bot("123456:benchmark", session=RecordingSession())
+
+
+_update_ids = itertools.count(1)
+
+
+def callback_update(data: str, user_id: int) -> Update:
+    """
+    Обновление с нажатием кнопки под сообщением бота.
+
+    Args:
+        data: callback_data кнопки
+        user_id: ID администратора
+    """
+    user = User(id=user_id, is_bot=False, first_name="admin")
+    message = Message(
+        message_id=1,
+        date=datetime.now(),
+        chat=Chat(id=CHAT_ID, type="private"),
+        from_user=User(id=123456, is_bot=True, first_name="bot"),
+        text="menu",
+    )
+    update_id = next(_update_ids)
+    return Update(
+        update_id=update_id,
+        callback_query=CallbackQuery(
+            id=str(update_id),
+            from_user=user,
+            chat_instance="benchmark",
+            data=data,
+            message=message,
+        ),
+    )
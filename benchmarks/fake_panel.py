@@ -0,0 +1,236 @@
+"""
+Локальная замена S-UI панели для бенчмарков.
+
+Запускается отдельным процессом, чтобы сериализация больших ответов не
+попадала в замеры бота:
+
+    python -m benchmarks.fake_panel --clients 10000 --port 0
+
+Первая строка вывода - URL для SUI_URL. Число запросов по эндпоинтам
+отдаёт GET /_bench/requests, сбрасывает POST /_bench/reset.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import socket
+import sys
+import time
+from collections import Counter
+from typing import Any
+
+from aiohttp import web
+
+GB = 1024 ** 3
+DAY = 86400
+
+
+def make_dataset(clients: int, inbounds: int = 20, seed: int = 1) -> dict[str, Any]:
+    """
+    Синтетические данные панели.
+
+    Args:
+        clients: Число клиентов
+        inbounds: Число inbounds
+        seed: Зерно генератора, чтобы прогоны были сравнимы
+
+    Returns:
+        Данные для ответов /apiv2/*
+    """
+    rng = random.Random(seed)
+    now = int(time.time())
+    protocols = ("vless", "vmess", "trojan", "shadowsocks", "hysteria2")
+    inbound_list = [
+        {
+            "id": i,
+            "type": protocols[i % len(protocols)],
+            "tag": f"in-{i}",
+            "listen": "::",
+            "listen_port": 10000 + i,
+            "tls_id": i % 3,
+        }
+        for i in range(1, inbounds + 1)
+    ]
+    client_list = []
+    for i in range(1, clients + 1):
+        volume = rng.choice((0, 10 * GB, 50 * GB, 100 * GB))
+        client_list.append({
+            "id": i,
+            "enable": rng.random() > 0.1,
+            "name": f"user{i:06d}",
+            "config": {"vless": {"name": f"user{i:06d}", "uuid": f"{i:08x}-0000-4000-8000-000000000000"}},
+            "inbounds": rng.sample(range(1, inbounds + 1), k=min(3, inbounds)),
+            "links": [],
+            "volume": volume,
+            "expiry": rng.choice((0, (now + rng.randint(-10, 90) * DAY) * 1000)),
+            "up": rng.randint(0, 5 * GB),
+            "down": rng.randint(0, 40 * GB),
+            "desc": "",
+            "group": f"group{i % 10}",
+        })
+    online = [client["name"] for client in client_list[: max(1, clients // 20)]]
+    return {
+        "clients": client_list,
+        "inbounds": inbound_list,
+        "outbounds": [{"id": i, "type": "direct", "tag": f"out-{i}"} for i in range(1, 6)],
+        "tls": [
+            {"id": i, "name": f"tls-{i}", "server": {"server_name": f"node{i}.example.com"}, "client": {}}
+            for i in range(3)
+        ],
+        "config": {"log": {"level": "info"}, "dns": {}, "route": {"rules": []}},
+        "settings": {"subURI": "", "subPath": "/sub/", "subDomain": "", "subPort": 2096, "webPort": 2095},
+        "onlines": {"user": online, "inbound": ["in-1"], "outbound": ["direct"]},
+        "logs": [f"2024/01/01 00:00:{i % 60:02d} INFO [{i}] inbound/vless[in-1]: connection from user{i:06d}"
+                 for i in range(1000)],
+    }
+
+
+class FakePanel:
+    """
+    aiohttp сервер, отвечающий как /app/apiv2/* панели S-UI.
+
+    Считает запросы по эндпоинтам, чтобы бенчмарк мог сравнить число
+    обращений к панели до и после изменений кэширования. `latency`
+    имитирует задержку сети и панели.
+    """
+
+    def __init__(self, dataset: dict[str, Any], latency: float = 0.0):
+        """
+        Инициализация.
+
+        Args:
+            dataset: Данные из make_dataset()
+            latency: Задержка каждого ответа в секундах
+        """
+        self.dataset = dataset
+        self.latency = latency
+        self.requests: Counter[str] = Counter()
+        self._by_id = {client["id"]: client for client in dataset["clients"]}
+        # Готовые тела ответов: эндпоинт и query -> JSON
+        self._bodies: dict[tuple[str, str], bytes] = {}
+        self._runner: web.AppRunner | None = None
+        self.port = 0
+
+    @property
+    def url(self) -> str:
+        """Базовый URL для SUI_URL."""
+        return f"http://127.0.0.1:{self.port}/app"
+
+    def _obj(self, request: web.Request) -> Any:
+        """Поле obj ответа для эндпоинта."""
+        name = request.match_info["name"]
+        data = self.dataset
+        if name == "clients":
+            client_id = request.query.get("id")
+            if client_id:
+                client = self._by_id.get(int(client_id))
+                return {"clients": [client] if client else []}
+            return {"clients": data["clients"]}
+        if name == "status":
+            return {
+                "cpu": 12.5,
+                "ram": {"total": 8 * GB, "used": 3 * GB},
+                "disk": {"total": 100 * GB, "used": 40 * GB},
+                "uptime": 864000,
+                "loads": [0.5, 0.4, 0.3],
+                "netIO": {"up": 1000 * GB, "down": 4000 * GB},
+                "tcpCount": 1200,
+                "udpCount": 300,
+            }
+        if name == "load":
+            return {
+                key: data[key]
+                for key in ("config", "clients", "tls", "inbounds", "outbounds")
+            } | {"endpoints": [], "services": [], "subURI": "", "onlines": data["onlines"]}
+        if name == "logs":
+            count = int(request.query.get("c", 100))
+            return data["logs"][-count:]
+        if name in ("inbounds", "outbounds", "tls", "config", "settings", "onlines"):
+            return data[name]
+        if name in ("endpoints", "services", "users", "stats", "changes"):
+            return []
+        return None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Ответ на запрос /apiv2/<name>."""
+        name = request.match_info["name"]
+        self.requests[name] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if request.method == "POST":
+            return web.json_response({"success": True, "msg": "", "obj": None})
+
+        key = (name, request.query_string)
+        body = self._bodies.get(key)
+        if body is None:
+            obj = self._obj(request)
+            if obj is None:
+                response = {"success": False, "msg": "not found"}
+            else:
+                response = {"success": True, "msg": "", "obj": obj}
+            body = json.dumps(response).encode()
+            if name != "clients" or "id" not in request.query:
+                self._bodies[key] = body
+        return web.Response(body=body, content_type="application/json")
+
+    async def _requests(self, request: web.Request) -> web.Response:
+        """Число запросов по эндпоинтам."""
+        return web.json_response(dict(self.requests))
+
+    async def _reset(self, request: web.Request) -> web.Response:
+        """Сбросить счётчики запросов."""
+        self.requests.clear()
+        return web.json_response({})
+
+    async def start(self, port: int = 0):
+        """
+        Запустить сервер.
+
+        Args:
+            port: Порт (0 - любой свободный)
+        """
+        app = web.Application()
+        app.router.add_route("*", "/app/apiv2/{name}", self._handle)
+        app.router.add_get("/_bench/requests", self._requests)
+        app.router.add_post("/_bench/reset", self._reset)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("127.0.0.1", port))
+        self.port = sock.getsockname()[1]
+        await web.SockSite(self._runner, sock).start()
+
+    async def stop(self):
+        """Остановить сервер."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def serve(clients: int, port: int, latency: float):
+    """Запустить панель и работать до завершения процесса."""
+    panel = FakePanel(make_dataset(clients), latency)
+    await panel.start(port)
+    print(panel.url, flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await panel.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальная замена панели S-UI")
+    parser.add_argument("--clients", type=int, default=1000, help="число клиентов")
+    parser.add_argument("--port", type=int, default=0, help="порт (0 - любой свободный)")
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка ответа, секунды")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.clients, args.port, args.latency))
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Бенчмарк обработчиков кнопок на локальной замене панели S-UI.
+
+    python -m benchmarks.run
+    python -m benchmarks.run --clients 100,10000 --iterations 200 --scenarios status,clients
+    python -m benchmarks.run --cold --latency 0.02 --json results.json
+
+Для каждого размера набора данных запускается отдельный процесс с
+замененной панелью (benchmarks.fake_panel) и отдельный процесс бота:
+настройки и реестр панелей создаются при импорте, а кэши не должны
+переходить из одного прогона в другой. Обновления проходят через
+диспетчер со всеми middleware, запросы к Bot API записывает
+RecordingSession. Фоновые задачи (снимок, опрос онлайн, сбор трафика)
+не запускаются - данные загружаются обработчиками по требованию.
+
+Для каждого сценария выводятся p50/p99 и среднее время обработки, пик
+выделенной памяти на одно обновление (tracemalloc), число запросов к
+панели и к Bot API на одно обновление.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+
+import aiohttp
+
+ADMIN_ID = 1
+
+# Сценарий -> callback_data по номеру итерации и числу клиентов
+SCENARIOS: dict[str, Callable[[int, int], str]] = {
+    "status": lambda i, n: "status",
+    "clients": lambda i, n: "clients",
+    "clients_pages": lambda i, n: f"clients:traffic:{i % max(1, n // 20)}",
+    "client_info": lambda i, n: f"client_info:{i * 7919 % n + 1}",
+    "inbounds": lambda i, n: "inbounds",
+    "outbounds": lambda i, n: "outbounds",
+    "tls": lambda i, n: "tls",
+    "config": lambda i, n: "config",
+    "settings": lambda i, n: "settings",
+    "logs": lambda i, n: "logs_100",
+    "traffic": lambda i, n: "traffic",
+}
+
+DEFAULT_SIZES = "100,1000,10000,100000"
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Перцентиль по ближайшему рангу."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+async def panel_requests(http: aiohttp.ClientSession, url: str, reset: bool = False) -> dict[str, int]:
+    """Счётчики запросов к замене панели."""
+    base = url.rsplit("/app", 1)[0]
+    if reset:
+        async with http.post(f"{base}/_bench/reset") as response:
+            return await response.json()
+    async with http.get(f"{base}/_bench/requests") as response:
+        return await response.json()
+
+
+async def run_worker(args) -> dict:
+    """Прогон всех сценариев на одном наборе данных (в отдельном процессе)."""
+    tmp = tempfile.mkdtemp(prefix="sui-bench-")
+    os.environ.update({
+        "BOT_TOKEN": "123456:benchmark",
+        "ADMIN_IDS": str(ADMIN_ID),
+        "SUI_URL": args.panel_url,
+        "SUI_TOKEN": "benchmark",
+        "TRAFFIC_DB_PATH": os.path.join(tmp, "traffic.db"),
+        "JOBS_PATH": os.path.join(tmp, "jobs.json"),
+    })
+    from benchmarks.fake_bot import callback_update, make_bot
+    from src.bot import create_dispatcher
+    from src.handlers.callbacks import panels
+
+    logging.getLogger().setLevel(logging.WARNING)
+    bot = make_bot()
+    session = bot.session
+    dp = create_dispatcher()
+    panel = panels.current(ADMIN_ID)
+
+    def reset_caches():
+        panel.client.cache.invalidate()
+        panel.client_store.invalidate()
+
+    async def feed(data: str) -> float:
+        started = time.perf_counter()
+        await dp.feed_update(bot, callback_update(data, ADMIN_ID))
+        return time.perf_counter() - started
+
+    results = {}
+    async with aiohttp.ClientSession() as http:
+        for name in args.scenarios:
+            make_data = SCENARIOS[name]
+            # Прогрев: импорт, первая загрузка данных, соединения пула
+            await feed(make_data(0, args.clients))
+
+            await panel_requests(http, args.panel_url, reset=True)
+            session.calls.clear()
+            session.text_bytes = 0
+            timings: list[float] = []
+            errors = 0
+            started = time.perf_counter()
+            for batch in range(0, args.iterations, args.concurrency):
+                if args.cold:
+                    reset_caches()
+                size = min(args.concurrency, args.iterations - batch)
+                done = await asyncio.gather(
+                    *(feed(make_data(batch + k, args.clients)) for k in range(size)),
+                    return_exceptions=True,
+                )
+                for item in done:
+                    if isinstance(item, BaseException):
+                        errors += 1
+                    else:
+                        timings.append(item)
+            elapsed = time.perf_counter() - started
+            requests = await panel_requests(http, args.panel_url)
+            telegram_calls = sum(session.calls.values())
+            text_bytes = session.text_bytes
+
+            # Память отдельным проходом: tracemalloc замедляет выполнение
+            peaks = []
+            tracemalloc.start()
+            for i in range(args.alloc_iterations):
+                if args.cold:
+                    reset_caches()
+                before, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                try:
+                    await feed(make_data(i, args.clients))
+                except Exception:
+                    continue
+                _, peak = tracemalloc.get_traced_memory()
+                peaks.append(peak - before)
+            tracemalloc.stop()
+
+            if not timings:
+                timings = [0.0]
+            results[name] = {
+                "p50_ms": percentile(timings, 50) * 1000,
+                "p99_ms": percentile(timings, 99) * 1000,
+                "mean_ms": statistics.fmean(timings) * 1000,
+                "updates_per_s": len(timings) / elapsed if elapsed else 0.0,
+                "peak_kb": (statistics.median(peaks) / 1024) if peaks else 0.0,
+                "panel_requests": requests,
+                "panel_requests_per_update": sum(requests.values()) / args.iterations,
+                "telegram_calls_per_update": telegram_calls / args.iterations,
+                "text_bytes_per_update": text_bytes / args.iterations,
+                "errors": errors,
+            }
+    await panels.stop()
+    await bot.session.close()
+    return results
+
+
+async def start_panel(clients: int, latency: float) -> tuple[asyncio.subprocess.Process, str]:
+    """Запустить замену панели и дождаться её адреса."""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "benchmarks.fake_panel",
+        "--clients", str(clients), "--latency", str(latency),
+        stdout=asyncio.subprocess.PIPE,
+    )
+    line = await process.stdout.readline()
+    if not line:
+        raise RuntimeError("Замена панели не запустилась")
+    return process, line.decode().strip()
+
+
+async def run_size(args, clients: int) -> dict:
+    """Прогон одного размера: панель и бот в отдельных процессах."""
+    panel, url = await start_panel(clients, args.latency)
+    try:
+        worker = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "benchmarks.run", "--worker",
+            "--panel-url", url,
+            "--clients", str(clients),
+            "--scenarios", ",".join(args.scenarios),
+            "--iterations", str(args.iterations),
+            "--concurrency", str(args.concurrency),
+            "--alloc-iterations", str(args.alloc_iterations),
+            *(["--cold"] if args.cold else []),
+            stdout=asyncio.subprocess.PIPE,
+        )
+        stdout, _ = await worker.communicate()
+        if worker.returncode != 0:
+            raise RuntimeError(f"Прогон на {clients} клиентах завершился с кодом {worker.returncode}")
+        return json.loads(stdout.decode().strip().splitlines()[-1])
+    finally:
+        panel.terminate()
+        await panel.wait()
+
+
+def print_table(clients: int, results: dict):
+    """Таблица результатов одного размера."""
+    print(f"\n=== {clients} клиентов ===")
+    header = f"{'сценарий':<14}{'p50 ms':>9}{'p99 ms':>9}{'upd/s':>9}{'peak KB':>10}{'panel/upd':>11}{'tg/upd':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(
+            f"{name:<14}{r['p50_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['updates_per_s']:>9.0f}"
+            f"{r['peak_kb']:>10.0f}{r['panel_requests_per_update']:>11.2f}"
+            f"{r['telegram_calls_per_update']:>8.1f}"
+            + (f"  ошибок: {r['errors']}" if r["errors"] else "")
+        )
+
+
+def parse_args(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Бенчмарк обработчиков бота на замене панели S-UI")
+    parser.add_argument("--clients", default=DEFAULT_SIZES, help=f"размеры наборов через запятую ({DEFAULT_SIZES})")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="сценарии через запятую")
+    parser.add_argument("--iterations", type=int, default=100, help="обновлений на сценарий")
+    parser.add_argument("--concurrency", type=int, default=1, help="одновременных обновлений")
+    parser.add_argument("--alloc-iterations", type=int, default=5, help="обновлений для замера памяти")
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка ответа панели, секунды")
+    parser.add_argument("--cold", action="store_true", help="сбрасывать кэши перед каждой пачкой")
+    parser.add_argument("--json", help="сохранить результаты в файл")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--panel-url", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"неизвестные сценарии: {', '.join(unknown)}; доступны: {', '.join(SCENARIOS)}")
+    if args.worker:
+        args.clients = int(args.clients)
+    else:
+        args.clients = [int(size) for size in args.clients.split(",") if size.strip()]
+    return args
+
+
+async def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    if args.worker:
+        print(json.dumps(await run_worker(args)))
+        return
+
+    report = {}
+    for clients in args.clients:
+        results = await run_size(args, clients)
+        report[clients] = results
+        print_table(clients, results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nРезультаты сохранены в {args.json}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,345 @@
+"""Оповещения о квоте трафика, сроке действия клиентов и нагрузке узлов."""
+
+import asyncio
+import heapq
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import NamedTuple
+
+from src.fleet import FleetDashboard, NodeStatus
+from src.models import Client
+from src.panels import PanelRegistry
+
+logger = logging.getLogger(__name__)
+
+DAY_MS = 86400 * 1000
+
+# Виды оповещений
+QUOTA = "quota"
+EXPIRY = "expiry"
+RESOURCE = "resource"
+RECOVERED = "recovered"
+
+
+@dataclass(frozen=True)
+class Alert:
+    """Одно оповещение."""
+
+    kind: str
+    panel: str
+    # Имя клиента или показатель узла (cpu, ram, disk)
+    subject: str
+    # Процент квоты, срок действия (ms) или значение показателя
+    value: float
+
+
+@dataclass(frozen=True)
+class Thresholds:
+    """Пороги оповещений (0 - проверка выключена)."""
+
+    quota_percent: float = 90.0
+    quota_hysteresis: float = 5.0
+    expiry_days: float = 3.0
+    # Показатель узла -> порог в процентах
+    resources: dict[str, float] = field(default_factory=dict)
+    resource_duration: float = 300.0
+    resource_hysteresis: float = 5.0
+
+
+class _ClientState(NamedTuple):
+    """Поля клиента, от которых зависят оповещения."""
+
+    name: str
+    enable: bool
+    used: int
+    volume: int
+    expiry: int
+
+
+class ClientWatch:
+    """
+    Квота и срок действия клиентов одной панели.
+
+    Состояние обновляется из снимка панели: пересчитываются только клиенты,
+    чьи трафик, квота или срок изменились. Сроки лежат в куче по времени
+    срабатывания (expiry - expiry_days), так что проверка по таймеру снимает
+    с кучи только наступившие записи и не перебирает клиентов. Записи,
+    устаревшие после продления или удаления клиента, отбрасываются при
+    снятии с кучи.
+
+    Квота срабатывает один раз при достижении порога и снова взводится,
+    только когда использование опустится на `quota_hysteresis` процентов
+    ниже порога (сброс трафика, увеличение квоты). Срок срабатывает один
+    раз на каждое значение expiry.
+
+    Состояние хранится только в памяти, поэтому первый список клиентов
+    после запуска принимается молча: клиенты, уже превысившие квоту или
+    вошедшие в окно предупреждения о сроке, считаются оповещёнными, и
+    перезапуск бота не рассылает оповещения повторно.
+    """
+
+    def __init__(self, panel: str, thresholds: Thresholds):
+        """
+        Инициализация.
+
+        Args:
+            panel: Имя панели
+            thresholds: Пороги
+        """
+        self.panel = panel
+        self.thresholds = thresholds
+        self._state: dict[int, _ClientState] = {}
+        self._quota_fired: set[int] = set()
+        self._expiry_fired: dict[int, int] = {}
+        self._heap: list[tuple[int, int, int]] = []
+        self._pending: list[Alert] = []
+        self._primed = False
+
+    def update(self, clients: list[Client]):
+        """
+        Принять список клиентов из снимка панели.
+
+        Args:
+            clients: Клиенты
+        """
+        now_ms = int(time.time() * 1000)
+        warn_ms = int(self.thresholds.expiry_days * DAY_MS)
+        seen = set()
+        for client in clients:
+            client_id = client.id
+            seen.add(client_id)
+            state = _ClientState(client.name, client.enable, client.used, client.volume, client.expiry)
+            old = self._state.get(client_id)
+            if old == state:
+                continue
+            self._state[client_id] = state
+            if self.thresholds.quota_percent > 0:
+                self._check_quota(client_id, state, notify=self._primed)
+            if (
+                warn_ms > 0
+                and state.expiry > now_ms
+                and (old is None or old.expiry != state.expiry)
+            ):
+                if not self._primed and state.expiry - warn_ms <= now_ms:
+                    self._expiry_fired[client_id] = state.expiry
+                else:
+                    heapq.heappush(self._heap, (state.expiry - warn_ms, client_id, state.expiry))
+        self._primed = True
+
+        for client_id in self._state.keys() - seen:
+            del self._state[client_id]
+            self._quota_fired.discard(client_id)
+            self._expiry_fired.pop(client_id, None)
+
+        if len(self._heap) > 2 * len(self._state) + 64:
+            # Слишком много устаревших записей - пересобираем кучу
+            self._heap = [
+                entry for entry in self._heap
+                if (state := self._state.get(entry[1])) is not None and state.expiry == entry[2]
+            ]
+            heapq.heapify(self._heap)
+
+    @property
+    def over_quota(self) -> int:
+        """Сколько клиентов сейчас выше порога квоты."""
+        return len(self._quota_fired)
+
+    def _check_quota(self, client_id: int, state: _ClientState, notify: bool = True):
+        """Проверить квоту клиента после изменения."""
+        if not state.enable or state.volume <= 0:
+            self._quota_fired.discard(client_id)
+            return
+        percent = state.used / state.volume * 100
+        if percent >= self.thresholds.quota_percent:
+            if client_id not in self._quota_fired:
+                self._quota_fired.add(client_id)
+                if notify:
+                    self._pending.append(Alert(QUOTA, self.panel, state.name, percent))
+        elif percent < self.thresholds.quota_percent - self.thresholds.quota_hysteresis:
+            self._quota_fired.discard(client_id)
+
+    def due(self, now_ms: int) -> list[Alert]:
+        """
+        Оповещения, накопленные с прошлой проверки.
+
+        Args:
+            now_ms: Текущее время в миллисекундах
+
+        Returns:
+            Оповещения о квоте и сроке
+        """
+        alerts, self._pending = self._pending, []
+        while self._heap and self._heap[0][0] <= now_ms:
+            _, client_id, expiry = heapq.heappop(self._heap)
+            state = self._state.get(client_id)
+            if state is None or state.expiry != expiry or not state.enable:
+                continue
+            if self._expiry_fired.get(client_id) == expiry:
+                continue
+            self._expiry_fired[client_id] = expiry
+            alerts.append(Alert(EXPIRY, self.panel, state.name, expiry))
+        return alerts
+
+
+class ResourceWatch:
+    """
+    Нагрузка узлов: порог должен держаться `resource_duration` секунд.
+
+    Отсчёт начинается с первого замера выше порога и сбрасывается любым
+    замером ниже. После оповещения показатель считается восстановившимся,
+    только когда опустится на `resource_hysteresis` процентов ниже порога,
+    тогда же приходит оповещение о восстановлении.
+    """
+
+    def __init__(self, thresholds: Thresholds):
+        """
+        Инициализация.
+
+        Args:
+            thresholds: Пороги
+        """
+        self.thresholds = thresholds
+        self._since: dict[tuple[str, str], float] = {}
+        self._fired: set[tuple[str, str]] = set()
+
+    @property
+    def active(self) -> list[tuple[str, str]]:
+        """Пары (панель, показатель), по которым порог сейчас превышен."""
+        return sorted(self._fired)
+
+    def observe(self, panel: str, status: NodeStatus, now: float) -> list[Alert]:
+        """
+        Учесть замер узла.
+
+        Args:
+            panel: Имя панели
+            status: Показатели узла
+            now: Время замера (time.monotonic)
+
+        Returns:
+            Оповещения о превышении и восстановлении
+        """
+        alerts = []
+        for metric, limit in self.thresholds.resources.items():
+            value = getattr(status, metric, None)
+            if value is None or limit <= 0:
+                continue
+            key = (panel, metric)
+            if value >= limit:
+                since = self._since.setdefault(key, now)
+                if key not in self._fired and now - since >= self.thresholds.resource_duration:
+                    self._fired.add(key)
+                    alerts.append(Alert(RESOURCE, panel, metric, value))
+                continue
+            self._since.pop(key, None)
+            if key in self._fired and value < limit - self.thresholds.resource_hysteresis:
+                self._fired.discard(key)
+                alerts.append(Alert(RECOVERED, panel, metric, value))
+        return alerts
+
+
+class AlertEngine:
+    """
+    Периодическая проверка порогов всех панелей.
+
+    Клиенты проверяются по индексам ClientWatch, которые обновляет снимок
+    панели, и запросов к панелям не добавляют. Нагрузка узлов берётся из
+    общей сводки FleetDashboard: если её результат старше FLEET_CACHE_TTL,
+    каждая проверка опрашивает /status всех узлов (раз в `interval`
+    секунд, пока задан хотя бы один порог нагрузки); свежий результат
+    делится с /fleet. Все оповещения одной проверки передаются в `report`
+    вместе.
+    """
+
+    def __init__(
+        self,
+        registry: PanelRegistry,
+        dashboard: FleetDashboard,
+        thresholds: Thresholds,
+        report: Callable[[object, list[Alert]], Awaitable[None]],
+        interval: float = 30.0,
+    ):
+        """
+        Инициализация.
+
+        Args:
+            registry: Реестр панелей
+            dashboard: Сводный статус узлов
+            thresholds: Пороги
+            report: Корутина отправки оповещений (бот, оповещения)
+            interval: Интервал проверки в секундах
+        """
+        self.registry = registry
+        self.dashboard = dashboard
+        self.thresholds = thresholds
+        self.report = report
+        self.interval = interval
+        self.bot = None
+        self.clients = {panel.name: ClientWatch(panel.name, thresholds) for panel in registry.panels}
+        self.resources = ResourceWatch(thresholds)
+        self._task: asyncio.Task | None = None
+        for panel in registry.panels:
+            watch = self.clients[panel.name]
+            panel.snapshot.subscribe(lambda snapshot, watch=watch: watch.update(snapshot.clients))
+
+    @property
+    def enabled(self) -> bool:
+        """Включена ли хотя бы одна проверка."""
+        t = self.thresholds
+        return t.quota_percent > 0 or t.expiry_days > 0 or any(v > 0 for v in t.resources.values())
+
+    def start(self, bot):
+        """
+        Запустить проверку.
+
+        Args:
+            bot: Бот для оповещений
+        """
+        self.bot = bot
+        if not self.enabled or (self._task is not None and not self._task.done()):
+            return
+        for panel in self.registry.panels:
+            if panel.snapshot.loaded:
+                self.clients[panel.name].update(panel.snapshot.clients)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Остановить проверку."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def check(self) -> list[Alert]:
+        """
+        Собрать оповещения.
+
+        Returns:
+            Новые оповещения
+        """
+        now_ms = int(time.time() * 1000)
+        alerts = [alert for watch in self.clients.values() for alert in watch.due(now_ms)]
+        if any(limit > 0 for limit in self.thresholds.resources.values()):
+            report = await self.dashboard.get()
+            now = time.monotonic()
+            for name, status in report.nodes:
+                # Ошибки и данные из кэша недоступной панели не считаются замером
+                if isinstance(status, NodeStatus) and not status.stale:
+                    alerts.extend(self.resources.observe(name, status, now))
+        return alerts
+
+    async def _run(self):
+        """Цикл проверки."""
+        while True:
+            try:
+                alerts = await self.check()
+                if alerts:
+                    await self.report(self.bot, alerts)
+            except Exception:
+                logger.exception("Непредвиденная ошибка при проверке порогов")
+            await asyncio.sleep(self.interval)
@@ -2,14 +2,19 @@
 
 import asyncio
 import logging
+import secrets
+import signal
 
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 from aiogram.types import BotCommand
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
 
 from src.config import settings
 from src.handlers import main_router
+from src.middlewares import UpdateMetricsMiddleware
 
 # Настройка логирования
 logging.basicConfig(
@@ -19,40 +24,172 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-async def main():
-    """Главная функция запуска бота."""
-    # Инициализация бота и диспетчера
-    bot = Bot(
-        token=settings.bot_token,
-        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
-    )
-    
-    dp = Dispatcher()
-    dp.include_router(main_router)
-    
+async def on_startup(bot: Bot):
+    """Действия при запуске: команды меню и фоновые задачи."""
     # Устанавливаем команды бота для меню
     commands = [
         BotCommand(command="start", description="Запустить бота"),
         BotCommand(command="menu", description="Главное меню"),
         BotCommand(command="stats", description="Детальная статистика сервера"),
+        BotCommand(command="find", description="Поиск клиентов"),
+        BotCommand(command="fleet", description="Нагрузка всех узлов"),
+        BotCommand(command="export", description="Выгрузка ссылок подписки"),
+        BotCommand(command="bulk", description="Массовые операции с клиентами"),
+        BotCommand(command="logsearch", description="Поиск по логам"),
+        BotCommand(command="alerts", description="Пороги оповещений"),
+        BotCommand(command="metrics", description="Метрики бота"),
+        BotCommand(command="profile", description="Профили обработчиков"),
         BotCommand(command="help", description="Помощь"),
     ]
     await bot.set_my_commands(commands)
     logger.info("Команды бота установлены в меню")
-    
-    logger.info("Бот запущен!")
-    
+
+    # Фоновое обновление снимков панелей, онлайн пользователей и трафика
+    from src.handlers.callbacks import panels
+    panels.start()
+
+    # Продолжаем массовые операции, прерванные остановкой бота
+    from src.handlers.bulk import jobs
+    await jobs.start(bot)
+
+    # Оповещения по правилам для логов панелей
+    from src.handlers.logsearch import watcher
+    watcher.start(bot)
+
+    # Оповещения о квоте, сроке действия клиентов и нагрузке узлов
+    from src.handlers.alerts import engine
+    engine.start(bot)
+
+    # HTTP эндпоинт с метриками
+    if settings.metrics_port:
+        from src.handlers.metrics import server
+        await server.start()
+
+
+async def on_shutdown():
+    """Действия при остановке: фоновые задачи и сессии S-UI."""
+    from src.handlers.alerts import engine
+    from src.handlers.bulk import jobs
+    from src.handlers.callbacks import panels
+    from src.handlers.logsearch import watcher
+    from src.handlers.logtail import stop_all
+    from src.handlers.metrics import server
+
+    # Прерываем массовые операции, прогресс уже сохранён в файл
+    await jobs.stop()
+    # Останавливаем live-просмотр и проверку логов
+    await stop_all()
+    await watcher.stop()
+    await engine.stop()
+    await server.stop()
+
+    # Останавливаем фоновые задачи и закрываем сессии SUiClient всех панелей
+    await panels.stop()
+
+
+def create_dispatcher() -> Dispatcher:
+    """Создать диспетчер с роутерами и обработчиками запуска/остановки."""
+    dp = Dispatcher()
+    dp.update.outer_middleware(UpdateMetricsMiddleware())
+    dp.include_router(main_router)
+    dp.startup.register(on_startup)
+    dp.shutdown.register(on_shutdown)
+    return dp
+
+
+def create_webhook_app(bot: Bot, dp: Dispatcher, secret_token: str | None = None) -> web.Application:
+    """
+    Создать aiohttp приложение для приёма обновлений через webhook.
+
+    Обновления обрабатываются в фоновых задачах, поэтому Telegram получает
+    ответ сразу, а медленные запросы к панели не задерживают другие
+    обновления. Приложение можно запустить в тестах через aiohttp test client.
+
+    Args:
+        bot: Экземпляр бота
+        dp: Диспетчер
+        secret_token: Секрет из заголовка X-Telegram-Bot-Api-Secret-Token
+
+    Returns:
+        Приложение aiohttp
+    """
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        handle_in_background=True,
+        secret_token=secret_token,
+    ).register(app, path=settings.webhook_path)
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def run_polling(bot: Bot, dp: Dispatcher):
+    """Запуск в режиме long polling."""
+    # Polling не работает, пока у бота установлен webhook
+    await bot.delete_webhook()
+    logger.info("Бот запущен в режиме polling!")
+    await dp.start_polling(bot)
+
+
+async def run_webhook(bot: Bot, dp: Dispatcher):
+    """Запуск в режиме webhook до получения SIGINT/SIGTERM."""
+    # Без заданного секрета генерируем новый при каждом запуске
+    secret_token = settings.webhook_secret or secrets.token_urlsafe(32)
+    app = create_webhook_app(bot, dp, secret_token)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, settings.webhook_host, settings.webhook_port)
+    await site.start()
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            # Windows: остановка только через KeyboardInterrupt
+            pass
+
+    try:
+        # on_startup уже выполнен: если Telegram отклонит webhook, фоновые
+        # задачи и сессии должны остановиться в finally
+        webhook_url = settings.webhook_base_url.rstrip("/") + settings.webhook_path
+        await bot.set_webhook(
+            webhook_url,
+            secret_token=secret_token,
+            allowed_updates=dp.resolve_used_update_types(),
+        )
+        logger.info(
+            f"Бот запущен в режиме webhook: {webhook_url} "
+            f"(слушаю {settings.webhook_host}:{settings.webhook_port})"
+        )
+        await stop_event.wait()
+    finally:
+        # Останавливает приём запросов, дожидается обработчиков и вызывает
+        # on_shutdown диспетчера; сессию бота закрывает SimpleRequestHandler
+        await runner.cleanup()
+
+
+async def main():
+    """Главная функция запуска бота."""
+    # Инициализация бота и диспетчера
+    bot = Bot(
+        token=settings.bot_token,
+        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+    )
+    dp = create_dispatcher()
+
     try:
-        # Запуск polling
-        await dp.start_polling(bot)
+        if settings.bot_mode == "webhook":
+            await run_webhook(bot, dp)
+        else:
+            await run_polling(bot, dp)
     finally:
         # Закрываем сессию бота
         await bot.session.close()
-        
-        # Закрываем сессию SUiClient
-        from src.handlers.callbacks import sui_client
-        await sui_client.close()
-        
+
         logger.info("Бот остановлен, все сессии закрыты")
 
 
@@ -61,4 +198,3 @@ if __name__ == "__main__":
         asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("Бот остановлен пользователем")
-
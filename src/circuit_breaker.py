@@ -0,0 +1,81 @@
+"""Автомат защиты (circuit breaker) для запросов к панели."""
+
+import time
+
+
+class CircuitBreaker:
+    """
+    Автомат защиты с тремя состояниями.
+
+    closed - запросы идут как обычно и считаются подряд идущие сбои;
+    open - после `failure_threshold` сбоев запросы сразу отклоняются;
+    half_open - через `reset_timeout` секунд пропускается один пробный запрос,
+    его успех замыкает автомат, сбой снова размыкает.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Инициализация автомата.
+
+        Args:
+            failure_threshold: Число сбоев подряд до размыкания
+            reset_timeout: Время в секундах до пробного запроса
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """Текущее состояние с учётом истёкшего таймаута."""
+        if self._state == self.OPEN and self.retry_after <= 0:
+            return self.HALF_OPEN
+        return self._state
+
+    @property
+    def retry_after(self) -> float:
+        """Сколько секунд осталось до пробного запроса."""
+        if self._state != self.OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        """
+        Можно ли выполнить запрос.
+
+        Returns:
+            False, если автомат разомкнут или пробный запрос уже выполняется
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._trial_in_flight:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        """Отметить успешный запрос."""
+        self.failures = 0
+        self._state = self.CLOSED
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        """Отметить сбой запроса."""
+        self.failures += 1
+        self._trial_in_flight = False
+        if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def release(self):
+        """Снять отметку пробного запроса, завершившегося без результата."""
+        self._trial_in_flight = False
@@ -0,0 +1,214 @@
+"""Кэш клиентов панели с индексами для быстрого поиска."""
+
+import asyncio
+import time
+
+from src.models import Client, client_list
+from src.sui_api import SUiClient
+
+# Ключи сортировки списка клиентов
+SORT_KEYS = ("name", "online", "traffic", "expiry")
+
+
+class ClientStore:
+    """
+    Кэш клиентов с TTL и индексами по ID, имени и группе.
+
+    Полный список обновляется не чаще раза в `ttl` секунд. Отдельный клиент,
+    которого нет в кэше или чья запись устарела, догружается запросом
+    /apiv2/clients?id=..., без скачивания всего списка.
+    """
+
+    def __init__(self, client: SUiClient, ttl: float = 30.0):
+        """
+        Инициализация кэша.
+
+        Args:
+            client: Клиент S-UI API
+            ttl: Время жизни данных в секундах
+        """
+        self.client = client
+        self.ttl = ttl
+        self.version = 0
+        self._by_id: dict[int, Client] = {}
+        self._by_name: dict[str, Client] = {}
+        self._by_group: dict[str, list[Client]] = {}
+        self._fetched_at: dict[int, float] = {}
+        self._list: list[Client] | None = None
+        self._sorted: dict[str, tuple[tuple, list[Client]]] = {}
+        self._totals: tuple[int, int, int] | None = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def fresh(self) -> bool:
+        """Не устарел ли полный список."""
+        return bool(self._loaded_at) and time.monotonic() - self._loaded_at < self.ttl
+
+    def replace(self, clients: list[Client]):
+        """
+        Заменить содержимое кэша новым списком клиентов.
+
+        Args:
+            clients: Клиенты из ответа панели
+        """
+        now = time.monotonic()
+        self._by_id = {client.id: client for client in clients}
+        self._fetched_at = dict.fromkeys(self._by_id, now)
+        self._loaded_at = now
+        self._reindex()
+
+    def _reindex(self):
+        """Перестроить индексы по имени и группе."""
+        self._by_name = {}
+        self._by_group = {}
+        for client in self._by_id.values():
+            self._by_name[client.name] = client
+            self._by_group.setdefault(client.group, []).append(client)
+        self._list = None
+        self._totals = None
+        self.version += 1
+
+    def _put(self, client: Client):
+        """Добавить или обновить одного клиента."""
+        client_id = client.id
+        old = self._by_id.get(client_id)
+        self._by_id[client_id] = client
+        self._fetched_at[client_id] = time.monotonic()
+        if old is not None and old.name == client.name and old.group == client.group:
+            # Индексы по имени и группе не меняются, достаточно подменить запись
+            self._by_name[client.name] = client
+            group = self._by_group.get(client.group, [])
+            group[:] = [client if c is old else c for c in group]
+            self._list = None
+            self._totals = None
+            self.version += 1
+        else:
+            self._reindex()
+
+    def invalidate(self, client_id: int | None = None):
+        """
+        Пометить данные устаревшими.
+
+        Args:
+            client_id: ID клиента (по умолчанию весь кэш)
+        """
+        if client_id is None:
+            self._loaded_at = 0.0
+            self._fetched_at.clear()
+        else:
+            self._fetched_at.pop(client_id, None)
+
+    async def refresh(self):
+        """Загрузить полный список клиентов."""
+        async with self._lock:
+            if self.fresh:
+                return
+            response = await self.client.get_clients()
+            self.replace(client_list(response.get("obj")))
+
+    async def all(self) -> list[Client]:
+        """
+        Получить всех клиентов.
+
+        Returns:
+            Список клиентов
+        """
+        if not self.fresh:
+            await self.refresh()
+        if self._list is None:
+            self._list = list(self._by_id.values())
+        return self._list
+
+    async def get(self, client_id: int) -> Client | None:
+        """
+        Получить клиента по ID.
+
+        Args:
+            client_id: ID клиента
+
+        Returns:
+            Клиент или None, если панель его не знает
+        """
+        client = self._by_id.get(client_id)
+        fetched_at = self._fetched_at.get(client_id, 0.0)
+        if client is not None and time.monotonic() - fetched_at < self.ttl:
+            return client
+
+        response = await self.client.get_clients(str(client_id))
+        for item in client_list(response.get("obj")):
+            if item.id == client_id:
+                self._put(item)
+                return item
+
+        # Клиент удалён на панели
+        if client is not None:
+            del self._by_id[client_id]
+            self._fetched_at.pop(client_id, None)
+            self._reindex()
+        return None
+
+    def sorted_clients(self, sort: str = "name", online: frozenset[str] = frozenset()) -> list[Client]:
+        """
+        Клиенты из кэша в заданном порядке.
+
+        Отсортированный массив запоминается и пересчитывается только после
+        изменения данных (или набора онлайн пользователей для сортировки
+        "online"), так что листание страниц обходится срезом.
+
+        Args:
+            sort: Ключ сортировки из SORT_KEYS
+            online: Имена онлайн пользователей
+
+        Returns:
+            Отсортированный список клиентов
+        """
+        if sort not in SORT_KEYS:
+            sort = "name"
+        cache_key = (self.version, online if sort == "online" else None)
+        cached = self._sorted.get(sort)
+        if cached is not None and cached[0] == cache_key:
+            return cached[1]
+
+        clients = self._list if self._list is not None else list(self._by_id.values())
+        if sort == "online":
+            result = sorted(
+                clients,
+                key=lambda c: (c.name not in online, not c.enable, c.name.lower()),
+            )
+        elif sort == "traffic":
+            result = sorted(clients, key=lambda c: c.up + c.down, reverse=True)
+        elif sort == "expiry":
+            # Бессрочные клиенты (expiry = 0) в конце списка
+            result = sorted(clients, key=lambda c: (c.expiry <= 0, c.expiry))
+        else:
+            result = sorted(clients, key=lambda c: c.name.lower())
+
+        self._sorted[sort] = (cache_key, result)
+        return result
+
+    def traffic_totals(self) -> tuple[int, int, int]:
+        """
+        Суммарный трафик клиентов из кэша.
+
+        Returns:
+            Отправлено, получено и всего байт
+        """
+        if self._totals is None:
+            up = sum(c.up for c in self._by_id.values())
+            down = sum(c.down for c in self._by_id.values())
+            self._totals = (up, down, up + down)
+        return self._totals
+
+    def by_name(self, name: str) -> Client | None:
+        """Клиент по имени из кэша."""
+        return self._by_name.get(name)
+
+    def by_group(self, group: str) -> list[Client]:
+        """Клиенты группы из кэша."""
+        return self._by_group.get(group, [])
+
+    @property
+    def groups(self) -> list[str]:
+        """Имена групп из кэша."""
+        return sorted(self._by_group)
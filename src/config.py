@@ -1,7 +1,21 @@
 """Конфигурация бота."""
 
+from typing import Literal
+
+from pydantic import BaseModel, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from src.response_cache import DEFAULT_CACHE_TTLS
+from src.sui_api import ConnectionOptions
+
+
+class PanelConfig(BaseModel):
+    """Адрес и токен одной панели S-UI."""
+
+    name: str
+    url: str
+    token: str
+
 
 class Settings(BaseSettings):
     """Настройки приложения."""
@@ -16,15 +30,172 @@ class Settings(BaseSettings):
     bot_token: str
     admin_ids: str
 
+    # Режим получения обновлений
+    bot_mode: Literal["polling", "webhook"] = "polling"
+    # Публичный адрес, на который Telegram шлёт обновления (https://bots.example.com)
+    webhook_base_url: str = ""
+    webhook_path: str = "/webhook"
+    # Секрет для заголовка X-Telegram-Bot-Api-Secret-Token (пусто - генерируется при запуске)
+    webhook_secret: str = ""
+    webhook_host: str = "127.0.0.1"
+    webhook_port: int = 8080
+
     # S-UI Panel
-    sui_url: str
-    sui_token: str
+    sui_url: str = ""
+    sui_token: str = ""
+    sui_name: str = "main"
+
+    # Несколько панелей: JSON список [{"name": ..., "url": ..., "token": ...}]
+    sui_panels: list[PanelConfig] = []
+
+    # Опрос всех узлов: одновременных запросов и таймаут на узел (секунды)
+    fleet_concurrency: int = 8
+    fleet_timeout: float = 5.0
+
+    # Сводный статус узлов: время жизни кэша (секунды) и число худших узлов
+    fleet_cache_ttl: float = 15.0
+    fleet_worst_n: int = 3
+
+    # Пул соединений и таймауты запросов к панели
+    sui_pool_size: int = 20
+    sui_pool_per_host: int = 10
+    sui_keepalive_timeout: float = 30.0
+    sui_connect_timeout: float = 5.0
+    sui_read_timeout: float = 30.0
+    sui_total_timeout: float = 60.0
+    sui_dns_cache_ttl: int = 300
+
+    # Повторы запросов и автомат защиты
+    sui_retries: int = 2
+    sui_backoff_base: float = 0.2
+    sui_backoff_max: float = 2.0
+    sui_breaker_threshold: int = 5
+    sui_breaker_reset_timeout: float = 30.0
+
+    # Кэш ответов панели: размер и время жизни по эндпоинтам (секунды),
+    # например {"settings": 600, "status": 0}; не указанные берутся по умолчанию
+    sui_cache_size: int = 256
+    sui_cache_ttls: dict[str, float] = {}
+    # Разбор JSON ответов панели: auto (orjson или msgspec, если установлены), orjson, msgspec, json
+    sui_json_backend: Literal["auto", "orjson", "msgspec", "json"] = "auto"
+
+    # Снимок данных панели (секунды)
+    snapshot_interval: float = 10.0
+    snapshot_full_interval: float = 60.0
+
+    # Время жизни кэша клиентов (секунды)
+    client_cache_ttl: float = 30.0
+
+    # Интервал опроса онлайн пользователей (секунды)
+    onlines_interval: float = 10.0
+
+    # История трафика
+    traffic_db_path: str = "traffic.db"
+    traffic_interval: float = 60.0
+    traffic_retention_days: int = 90
+
+    # Длинные ответы: сколько сообщений отправлять, прежде чем отправить файлом
+    output_max_messages: int = 3
+
+    # Массовые операции: файл незавершённых задач, размер пачки,
+    # одновременных запросов к панели и интервал обновления прогресса (секунды)
+    jobs_path: str = "jobs.json"
+    bulk_batch_size: int = 50
+    bulk_concurrency: int = 4
+    bulk_progress_interval: float = 3.0
+
+    # Live-просмотр логов: интервал опроса, минимальный интервал правки
+    # сообщения, длительность сессии (секунды) и максимальное окно запроса
+    log_tail_interval: float = 5.0
+    log_tail_edit_interval: float = 3.0
+    log_tail_duration: float = 600.0
+    log_tail_max_lines: int = 200
+
+    # Поиск по логам: сколько последних строк запрашивать у панели
+    log_search_lines: int = 1000
+
+    # Оповещения по логам: правила JSON {"имя": "регулярное выражение"},
+    # интервал опроса, окно запроса (строк) и пауза между оповещениями
+    # по одному правилу (секунды)
+    log_alert_rules: dict[str, str] = {}
+    log_alert_interval: float = 30.0
+    log_alert_window: int = 200
+    log_alert_cooldown: float = 300.0
+
+    # Оповещения о клиентах и нагрузке узлов (0 - проверка выключена):
+    # интервал проверки (секунды), порог квоты трафика (%), за сколько дней
+    # предупреждать об окончании срока, пороги CPU/RAM/диска (%) и сколько
+    # секунд порог должен держаться; гистерезис (%) - насколько значение
+    # должно опуститься ниже порога, чтобы оповещение сработало снова
+    alert_interval: float = 30.0
+    alert_quota_percent: float = 90.0
+    alert_quota_hysteresis: float = 5.0
+    alert_expiry_days: float = 3.0
+    alert_cpu_percent: float = 85.0
+    alert_ram_percent: float = 90.0
+    alert_disk_percent: float = 90.0
+    alert_resource_duration: float = 300.0
+    alert_resource_hysteresis: float = 5.0
+
+    # HTTP эндпоинт /metrics в формате Prometheus (порт 0 - выключен)
+    metrics_host: str = "127.0.0.1"
+    metrics_port: int = 0
+
+    # Доля профилируемых событий от 0 до 1 (0 - профилирование выключено)
+    profile_sample_rate: float = 0.0
+
+    @model_validator(mode="after")
+    def check_panels(self) -> "Settings":
+        """Проверить, что настроена хотя бы одна панель и имена уникальны."""
+        names = [panel.name for panel in self.panel_configs]
+        if not names:
+            raise ValueError("Укажите SUI_URL и SUI_TOKEN или SUI_PANELS")
+        if len(names) != len(set(names)):
+            raise ValueError("Имена панелей в SUI_PANELS должны быть уникальными")
+        return self
+
+    @model_validator(mode="after")
+    def check_webhook(self) -> "Settings":
+        """Проверить, что для режима webhook задан публичный https адрес."""
+        if self.bot_mode == "webhook" and not self.webhook_base_url.startswith("https://"):
+            raise ValueError("Для BOT_MODE=webhook укажите WEBHOOK_BASE_URL вида https://bots.example.com")
+        return self
+
+    @property
+    def panel_configs(self) -> list[PanelConfig]:
+        """Настроенные панели: SUI_URL/SUI_TOKEN идёт первой, затем SUI_PANELS."""
+        panels = []
+        if self.sui_url and self.sui_token:
+            panels.append(PanelConfig(name=self.sui_name, url=self.sui_url, token=self.sui_token))
+        panels.extend(self.sui_panels)
+        return panels
 
     @property
     def admin_list(self) -> list[int]:
         """Список ID администраторов."""
         return [int(uid.strip()) for uid in self.admin_ids.split(",") if uid.strip()]
 
+    @property
+    def connection_options(self) -> ConnectionOptions:
+        """Параметры пула соединений для SUiClient."""
+        return ConnectionOptions(
+            limit=self.sui_pool_size,
+            limit_per_host=self.sui_pool_per_host,
+            keepalive_timeout=self.sui_keepalive_timeout,
+            connect_timeout=self.sui_connect_timeout,
+            read_timeout=self.sui_read_timeout,
+            total_timeout=self.sui_total_timeout,
+            dns_cache_ttl=self.sui_dns_cache_ttl,
+            retries=self.sui_retries,
+            backoff_base=self.sui_backoff_base,
+            backoff_max=self.sui_backoff_max,
+            breaker_threshold=self.sui_breaker_threshold,
+            breaker_reset_timeout=self.sui_breaker_reset_timeout,
+            cache_size=self.sui_cache_size,
+            cache_ttls={**DEFAULT_CACHE_TTLS, **self.sui_cache_ttls},
+            json_backend=self.sui_json_backend,
+        )
+
 
 settings = Settings()
 
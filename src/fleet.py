@@ -0,0 +1,269 @@
+"""Сводные данные по всем панелям (узлам)."""
+
+import asyncio
+import heapq
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from src.panels import Panel, PanelRegistry
+
+
+@dataclass(frozen=True)
+class NodeSummary:
+    """Сводка одного узла."""
+
+    online: int
+    clients: int
+    up: int
+    down: int
+
+
+async def node_summary(panel: Panel) -> NodeSummary:
+    """
+    Собрать сводку узла.
+
+    Используются кэши панели: онлайн пользователи из фонового опроса и
+    суммарный трафик из кэша клиентов, который обновляется не чаще TTL.
+
+    Args:
+        panel: Панель
+
+    Returns:
+        Сводка узла
+    """
+    online, clients = await asyncio.gather(
+        panel.online_poller.ensure_loaded(),
+        panel.client_store.all(),
+    )
+    up, down, _ = panel.client_store.traffic_totals()
+    return NodeSummary(online=len(online.users), clients=len(clients), up=up, down=down)
+
+
+async def collect_overview(
+    registry: PanelRegistry,
+    concurrency: int,
+    timeout: float,
+) -> list[tuple[Panel, NodeSummary | BaseException]]:
+    """
+    Собрать сводки всех узлов параллельно.
+
+    Args:
+        registry: Реестр панелей
+        concurrency: Максимум одновременных запросов
+        timeout: Таймаут на один узел в секундах
+
+    Returns:
+        Пары (панель, сводка или исключение)
+    """
+    return await registry.fan_out(node_summary, concurrency=concurrency, timeout=timeout)
+
+
+# Показатели статуса узла: ключ -> подпись
+STATUS_METRICS = {
+    "cpu": "CPU",
+    "ram": "RAM",
+    "disk": "Диск",
+    "net_up": "Сеть ⬆️",
+    "net_down": "Сеть ⬇️",
+    "tcp": "TCP",
+    "udp": "UDP",
+}
+
+# Ресурсы, запрашиваемые у /apiv2/status для сводки
+STATUS_RESOURCES = "cpu,ram,disk,netIO,tcpCount,udpCount"
+
+
+@dataclass(frozen=True)
+class NodeStatus:
+    """Показатели статуса одного узла (None - панель не вернула значение)."""
+
+    cpu: float | None = None
+    ram: float | None = None
+    disk: float | None = None
+    net_up: float | None = None
+    net_down: float | None = None
+    tcp: float | None = None
+    udp: float | None = None
+    stale: bool = False
+
+
+@dataclass(frozen=True)
+class MetricSummary:
+    """Минимум, среднее и максимум показателя по узлам."""
+
+    min: float
+    avg: float
+    max: float
+    count: int
+
+
+@dataclass(frozen=True)
+class FleetReport:
+    """Результат одного опроса статуса всех узлов."""
+
+    sampled_at: float
+    nodes: list[tuple[str, NodeStatus | BaseException]]
+    metrics: dict[str, MetricSummary]
+    worst: dict[str, list[tuple[str, float]]]
+
+    @property
+    def available(self) -> int:
+        """Число узлов, вернувших статус."""
+        return sum(1 for _, status in self.nodes if isinstance(status, NodeStatus))
+
+
+def _percent(value: Any) -> float | None:
+    """Процент занятости из словаря {total, used}."""
+    if not isinstance(value, dict):
+        return None
+    total = value.get("total")
+    used = value.get("used")
+    if not isinstance(total, (int, float)) or not isinstance(used, (int, float)) or total <= 0:
+        return None
+    return used / total * 100
+
+
+def _number(value: Any) -> float | None:
+    """Число или None."""
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def parse_status(obj: dict[str, Any], stale: bool = False) -> NodeStatus:
+    """
+    Разобрать ответ /apiv2/status.
+
+    Args:
+        obj: Поле obj ответа
+        stale: Ответ взят из кэша последних удачных ответов
+
+    Returns:
+        Показатели узла
+    """
+    netio = obj.get("netIO")
+    if not isinstance(netio, dict):
+        netio = {}
+    return NodeStatus(
+        cpu=_number(obj.get("cpu")),
+        ram=_percent(obj.get("ram", obj.get("mem"))),
+        disk=_percent(obj.get("disk")),
+        net_up=_number(netio.get("up")),
+        net_down=_number(netio.get("down")),
+        tcp=_number(obj.get("tcpCount")),
+        udp=_number(obj.get("udpCount")),
+        stale=stale,
+    )
+
+
+async def node_status(panel: Panel) -> NodeStatus:
+    """Запросить статус узла."""
+    response = await panel.client.get_status(resource=STATUS_RESOURCES)
+    obj = response.get("obj")
+    return parse_status(obj if isinstance(obj, dict) else {}, stale=bool(response.get("stale")))
+
+
+def aggregate(
+    nodes: list[tuple[str, NodeStatus | BaseException]],
+    worst_n: int = 3,
+) -> tuple[dict[str, MetricSummary], dict[str, list[tuple[str, float]]]]:
+    """
+    Посчитать min/avg/max и худшие узлы по каждому показателю.
+
+    Худшими считаются узлы с наибольшим значением (самые загруженные).
+
+    Args:
+        nodes: Пары (имя узла, статус или исключение)
+        worst_n: Сколько худших узлов оставить
+
+    Returns:
+        Сводки и списки худших узлов по ключам STATUS_METRICS
+    """
+    metrics: dict[str, MetricSummary] = {}
+    worst: dict[str, list[tuple[str, float]]] = {}
+    for key in STATUS_METRICS:
+        values = [
+            (name, value)
+            for name, status in nodes
+            if isinstance(status, NodeStatus) and (value := getattr(status, key)) is not None
+        ]
+        if not values:
+            continue
+        numbers = [value for _, value in values]
+        metrics[key] = MetricSummary(
+            min=min(numbers),
+            avg=sum(numbers) / len(numbers),
+            max=max(numbers),
+            count=len(numbers),
+        )
+        worst[key] = heapq.nlargest(worst_n, values, key=lambda item: item[1])
+    return metrics, worst
+
+
+class FleetDashboard:
+    """
+    Сводный статус всех узлов с коротким кэшем.
+
+    Опрос узлов выполняется одной задачей: администраторы, открывшие сводку
+    одновременно или в пределах TTL, получают результат одного и того же
+    опроса, а панели получают по одному запросу /apiv2/status.
+    """
+
+    def __init__(
+        self,
+        registry: PanelRegistry,
+        concurrency: int = 8,
+        timeout: float = 5.0,
+        ttl: float = 15.0,
+        worst_n: int = 3,
+    ):
+        """
+        Инициализация сводки.
+
+        Args:
+            registry: Реестр панелей
+            concurrency: Максимум одновременных запросов
+            timeout: Таймаут на один узел в секундах
+            ttl: Сколько секунд результат опроса считается свежим
+            worst_n: Сколько худших узлов показывать по каждому показателю
+        """
+        self.registry = registry
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.ttl = ttl
+        self.worst_n = worst_n
+        self._report: FleetReport | None = None
+        self._expires_at = 0.0
+        self._task: asyncio.Task | None = None
+
+    async def get(self, force: bool = False) -> FleetReport:
+        """
+        Получить сводку.
+
+        Args:
+            force: Опросить узлы, даже если кэш свежий
+
+        Returns:
+            Результат последнего опроса
+        """
+        if not force and self._report is not None and time.monotonic() < self._expires_at:
+            return self._report
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._sample())
+        # Отмена одного обработчика не должна прерывать общий опрос
+        return await asyncio.shield(self._task)
+
+    async def _sample(self) -> FleetReport:
+        """Опросить все узлы."""
+        results = await self.registry.fan_out(
+            node_status, concurrency=self.concurrency, timeout=self.timeout
+        )
+        nodes = [(panel.name, status) for panel, status in results]
+        metrics, worst = aggregate(nodes, self.worst_n)
+        self._report = FleetReport(
+            sampled_at=time.time(),
+            nodes=nodes,
+            metrics=metrics,
+            worst=worst,
+        )
+        self._expires_at = time.monotonic() + self.ttl
+        return self._report
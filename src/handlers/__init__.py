@@ -2,13 +2,46 @@
 
 from aiogram import Router
 
+from src.config import settings
+from src.middlewares import HandlerMetricsMiddleware
+from src.profiling import ProfilingMiddleware
+
 from .admin import router as admin_router
+from .alerts import router as alerts_router
+from .bulk import router as bulk_router
 from .callbacks import router as callback_router
 from .commands import router as command_router
+from .export import router as export_router
+from .fleet import router as fleet_router
+from .logsearch import router as logsearch_router
+from .logtail import router as logtail_router
+from .metrics import router as metrics_router
+from .profile import profiler
+from .profile import router as profile_router
+from .search import router as search_router
 
 # Главный роутер
 main_router = Router()
-main_router.include_routers(command_router, callback_router, admin_router)
+main_router.include_routers(
+    command_router,
+    search_router,
+    export_router,
+    bulk_router,
+    logsearch_router,
+    logtail_router,
+    callback_router,
+    fleet_router,
+    alerts_router,
+    metrics_router,
+    profile_router,
+    admin_router,
+)
+
+# Длительность обработчиков; inner middleware распространяется на вложенные роутеры
+for observer in (main_router.message, main_router.callback_query, main_router.inline_query):
+    observer.middleware(HandlerMetricsMiddleware())
+    if settings.profile_sample_rate > 0:
+        observer.middleware(ProfilingMiddleware(profiler))
 
 __all__ = ["main_router"]
 
@@ -0,0 +1,116 @@
+"""Оповещения о квоте, сроке действия клиентов и нагрузке узлов (/alerts)."""
+
+import html
+import logging
+from datetime import datetime
+
+from aiogram import Bot, Router
+from aiogram.filters import Command
+from aiogram.types import Message
+
+from src.alerts import EXPIRY, QUOTA, RECOVERED, RESOURCE, Alert, AlertEngine, Thresholds
+from src.config import settings
+from src.fleet import STATUS_METRICS
+from src.handlers.callbacks import panels
+from src.handlers.fleet import dashboard, format_metric
+from src.render import Output, send_output_to
+
+logger = logging.getLogger(__name__)
+router = Router()
+
+# Заголовки разделов оповещения в порядке вывода
+SECTIONS = {
+    RESOURCE: "🔥 Высокая нагрузка",
+    RECOVERED: "✅ Нагрузка снизилась",
+    QUOTA: "📶 Квота трафика почти исчерпана",
+    EXPIRY: "📅 Скоро истекает срок",
+}
+
+thresholds = Thresholds(
+    quota_percent=settings.alert_quota_percent,
+    quota_hysteresis=settings.alert_quota_hysteresis,
+    expiry_days=settings.alert_expiry_days,
+    resources={
+        "cpu": settings.alert_cpu_percent,
+        "ram": settings.alert_ram_percent,
+        "disk": settings.alert_disk_percent,
+    },
+    resource_duration=settings.alert_resource_duration,
+    resource_hysteresis=settings.alert_resource_hysteresis,
+)
+
+
+def is_admin(user_id: int) -> bool:
+    """Проверка, является ли пользователь администратором."""
+    return user_id in settings.admin_list
+
+
+def format_alert(alert: Alert) -> str:
+    """Строка оповещения."""
+    subject = html.escape(alert.subject)
+    if alert.kind in (RESOURCE, RECOVERED):
+        subject = STATUS_METRICS.get(alert.subject, subject)
+        value = format_metric(alert.subject, alert.value)
+    elif alert.kind == QUOTA:
+        value = f"{alert.value:.0f}%"
+    else:
+        value = datetime.fromtimestamp(alert.value / 1000).strftime("%Y-%m-%d %H:%M")
+    panel = f" ({html.escape(alert.panel)})" if panels.multi else ""
+    return f"• <b>{subject}</b>{panel} - {value}\n"
+
+
+def format_alerts(alerts: list[Alert]) -> Output:
+    """Сводка оповещений одной проверки: разделы по видам."""
+    output = Output("🔔 <b>Оповещения</b>\n", "alerts.txt", settings.output_max_messages)
+    for kind, title in SECTIONS.items():
+        items = [alert for alert in alerts if alert.kind == kind]
+        if not items:
+            continue
+        output.add(f"\n<b>{title}</b> ({len(items)}):\n")
+        for alert in items:
+            output.add(format_alert(alert))
+    return output
+
+
+async def report_alerts(bot: Bot, alerts: list[Alert]):
+    """Отправить оповещения всем администраторам."""
+    output = format_alerts(alerts)
+    for admin_id in settings.admin_list:
+        try:
+            await send_output_to(bot, admin_id, output)
+        except Exception as e:
+            logger.warning(f"Не удалось отправить оповещения администратору {admin_id}: {e}")
+
+
+# Проверка порогов; нагрузка узлов берётся из общей сводки /fleet
+engine = AlertEngine(panels, dashboard, thresholds, report_alerts, interval=settings.alert_interval)
+
+
+@router.message(Command("alerts"))
+async def cmd_alerts(message: Message):
+    """Обработчик команды /alerts: пороги и текущие превышения."""
+    if not is_admin(message.from_user.id):
+        await message.answer("❌ У вас нет доступа к этому боту.")
+        return
+
+    def limit(value: float, unit: str) -> str:
+        return f"{value:g}{unit}" if value > 0 else "выкл"
+
+    text = "🔔 <b>Оповещения</b>\n\n"
+    text += f"📶 Квота трафика: {limit(thresholds.quota_percent, '%')}\n"
+    text += f"📅 Срок действия: {limit(thresholds.expiry_days, ' дн.')}\n"
+    for key, value in thresholds.resources.items():
+        text += f"🔥 {STATUS_METRICS[key]}: {limit(value, '%')}"
+        if value > 0:
+            text += f" дольше {thresholds.resource_duration:g} с"
+        text += "\n"
+
+    over_quota = sum(watch.over_quota for watch in engine.clients.values())
+    active = engine.resources.active
+    text += f"\n<b>Сейчас:</b>\nКлиентов выше порога квоты: {over_quota}\n"
+    for panel, metric in active:
+        name = f" ({html.escape(panel)})" if panels.multi else ""
+        text += f"🔥 {STATUS_METRICS[metric]}{name} выше порога\n"
+    if not active:
+        text += "Нагрузка узлов в норме\n"
+    await message.answer(text, parse_mode="HTML")
@@ -0,0 +1,186 @@
+"""Массовые операции с клиентами: команда /bulk."""
+
+import html
+import logging
+
+from aiogram import Bot, F, Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import CallbackQuery, Message
+
+from src.config import settings
+from src.handlers.callbacks import panels
+from src.jobs import BULK_ACTIONS, DONE, PAUSED, STOPPED, BulkJob, JobRunner, JobStore
+from src.keyboards import get_bulk_confirm, get_bulk_progress
+from src.sui_api import SUiAPIError
+
+logger = logging.getLogger(__name__)
+router = Router()
+
+# Сколько имён клиентов показывать в подтверждении и ошибок в итоге
+PREVIEW_NAMES = 10
+REPORT_ERRORS = 10
+
+BULK_HELP = (
+    "🧰 <b>Массовые операции</b>\n\n"
+    "<code>/bulk enable группа</code> - включить клиентов группы\n"
+    "<code>/bulk disable группа</code> - отключить клиентов группы\n"
+    "<code>/bulk extend группа дни</code> - продлить срок на N дней\n"
+    "<code>/bulk reset группа</code> - сбросить трафик\n"
+    "<code>/bulk delete_expired [группа]</code> - удалить клиентов с истёкшим сроком\n\n"
+    "Вместо группы можно указать <code>*</code> - все клиенты.\n"
+    "Перед выполнением бот покажет, сколько клиентов будет изменено."
+)
+
+
+def is_admin(user_id: int) -> bool:
+    """Проверка, является ли пользователь администратором."""
+    return user_id in settings.admin_list
+
+
+def format_job(job: BulkJob) -> str:
+    """Текст сообщения с прогрессом задачи."""
+    total = len(job.items)
+    percent = job.done / total * 100 if total else 100.0
+    text = f"🧰 <b>{html.escape(job.title)}</b>"
+    if panels.multi:
+        text += f" (панель {html.escape(job.panel)})"
+    text += f"\n\n📊 Обработано: {job.done}/{total} ({percent:.0f}%)\n"
+    if job.failed:
+        text += f"❌ Ошибок: {len(job.failed)}\n"
+
+    if job.state == DONE:
+        text += "\n✅ <b>Готово</b>\n"
+    elif job.state == STOPPED:
+        text += "\n⏹ <b>Остановлено</b>\n"
+    elif job.state == PAUSED:
+        text += "\n⏸ <b>Панель недоступна, задача приостановлена</b>\n"
+    else:
+        text += "\n⏳ Выполняется...\n"
+
+    if job.state in (DONE, STOPPED) and job.failed:
+        text += "\n<b>Ошибки:</b>\n"
+        for name, error in job.failed[:REPORT_ERRORS]:
+            text += f"• {html.escape(str(name))}: {html.escape(error)}\n"
+        if len(job.failed) > REPORT_ERRORS:
+            text += f"... и ещё {len(job.failed) - REPORT_ERRORS}\n"
+    return text
+
+
+async def report_job(bot: Bot, job: BulkJob):
+    """Обновить сообщение с прогрессом задачи."""
+    finished = job.state in (DONE, STOPPED)
+    await bot.edit_message_text(
+        format_job(job),
+        chat_id=job.chat_id,
+        message_id=job.message_id,
+        parse_mode="HTML",
+        reply_markup=None if finished else get_bulk_progress(job.id, job.state == PAUSED),
+    )
+
+
+# Выполнение массовых операций с сохранением прогресса в файл
+jobs = JobRunner(
+    panels,
+    JobStore(settings.jobs_path),
+    report_job,
+    batch_size=settings.bulk_batch_size,
+    concurrency=settings.bulk_concurrency,
+    progress_interval=settings.bulk_progress_interval,
+)
+
+
+@router.message(Command("bulk"))
+async def cmd_bulk(message: Message, command: CommandObject):
+    """Обработчик команды /bulk."""
+    if not is_admin(message.from_user.id):
+        await message.answer("❌ У вас нет доступа к этому боту.")
+        return
+
+    args = (command.args or "").split()
+    action = args[0] if args else ""
+    if action not in BULK_ACTIONS:
+        text = BULK_HELP
+        active = jobs.active()
+        if active:
+            text += "\n\n<b>Текущие задачи:</b>\n"
+            text += "\n".join(
+                f"• {html.escape(job.title)} - {job.done}/{len(job.items)}"
+                + (" (пауза)" if job.state == PAUSED else "")
+                for job in active
+            )
+        await message.answer(text, parse_mode="HTML")
+        return
+
+    group = args[1] if len(args) > 1 else None
+    days = 0
+    if action == "delete_expired":
+        pass
+    elif group is None:
+        await message.answer("❌ Укажите группу или * для всех клиентов.\n\n" + BULK_HELP, parse_mode="HTML")
+        return
+    elif action == "extend":
+        if len(args) < 3 or not args[2].isdigit() or int(args[2]) <= 0:
+            await message.answer("❌ Укажите число дней: <code>/bulk extend группа 30</code>", parse_mode="HTML")
+            return
+        days = int(args[2])
+    if group == "*":
+        group = None
+
+    panel = panels.current(message.from_user.id)
+    try:
+        job = await jobs.create(panel, action, message.chat.id, group, days)
+    except SUiAPIError as e:
+        logger.error(f"Ошибка при подготовке массовой операции: {e}")
+        await message.answer(f"❌ Ошибка при получении клиентов:\n{str(e)}")
+        return
+
+    if not job.items:
+        jobs.discard(job.id)
+        await message.answer("🧰 Нет клиентов, которых изменит эта операция.")
+        return
+
+    names = ", ".join(html.escape(str(item[1])) for item in job.items[:PREVIEW_NAMES])
+    if len(job.items) > PREVIEW_NAMES:
+        names += f" и ещё {len(job.items) - PREVIEW_NAMES}"
+    text = f"🧰 <b>{html.escape(job.title)}</b>"
+    if panels.multi:
+        text += f" (панель {html.escape(panel.name)})"
+    text += f"\n\nБудет изменено клиентов: <b>{len(job.items)}</b>\n{names}\n\nВыполнить?"
+    await message.answer(text, parse_mode="HTML", reply_markup=get_bulk_confirm(job.id))
+
+
+@router.callback_query(F.data.startswith("bulk_run:"))
+async def callback_bulk_run(callback: CallbackQuery):
+    """Запустить или продолжить массовую операцию."""
+    if not is_admin(callback.from_user.id):
+        await callback.answer("❌ У вас нет доступа к этому боту.", show_alert=True)
+        return
+    job = await jobs.run(callback.data.split(":")[1], callback.message.message_id)
+    if job is None:
+        await callback.answer("Задача не найдена или уже выполняется", show_alert=True)
+        return
+    await callback.answer("Запущено")
+
+
+@router.callback_query(F.data.startswith("bulk_cancel:"))
+async def callback_bulk_cancel(callback: CallbackQuery):
+    """Отменить неподтверждённую массовую операцию."""
+    if not is_admin(callback.from_user.id):
+        await callback.answer("❌ У вас нет доступа к этому боту.", show_alert=True)
+        return
+    await callback.answer()
+    jobs.discard(callback.data.split(":")[1])
+    await callback.message.edit_text("❌ Операция отменена")
+
+
+@router.callback_query(F.data.startswith("bulk_stop:"))
+async def callback_bulk_stop(callback: CallbackQuery):
+    """Остановить массовую операцию."""
+    if not is_admin(callback.from_user.id):
+        await callback.answer("❌ У вас нет доступа к этому боту.", show_alert=True)
+        return
+    job = await jobs.stop_job(callback.data.split(":")[1])
+    if job is None:
+        await callback.answer("Задача не найдена или уже завершена", show_alert=True)
+        return
+    await callback.answer("Остановка после текущей пачки")
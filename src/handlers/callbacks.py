@@ -1,6 +1,10 @@
 """Обработчики callback запросов."""
 
+import html
 import logging
+import sqlite3
+import time
+from datetime import datetime
 
 from aiogram import F, Router
 from aiogram.types import CallbackQuery
@@ -10,15 +14,28 @@ from src.keyboards import (
     get_confirm_restart,
     get_logs_menu,
     get_main_menu,
+    get_panels_keyboard,
 )
-from src.sui_api import SUiAPIError, SUiClient
+from src.sui_api import SUiAPIError
+from src.circuit_breaker import CircuitBreaker
+from src.client_store import SORT_KEYS
+from src.onlines import OnlineState
+from src.panels import PanelRegistry
+from src.render import Output, send_output
 from src.config import settings
 
 logger = logging.getLogger(__name__)
 router = Router()
 
-# Создаём глобальный клиент
-sui_client = SUiClient(settings.sui_url, settings.sui_token)
+# Реестр панелей: у каждой свой клиент API, пул соединений и кэши
+panels = PanelRegistry.from_settings(settings)
+
+
+def main_menu_title(user_id: int) -> str:
+    """Заголовок главного меню с выбранной панелью."""
+    if panels.multi:
+        return f"📋 Главное меню (панель <b>{panels.current(user_id).name}</b>):"
+    return "📋 Главное меню:"
 
 
 def format_bytes(bytes_value: int) -> str:
@@ -30,31 +47,88 @@ def format_bytes(bytes_value: int) -> str:
     return f"{bytes_value:.2f} PB"
 
 
+def format_breaker(breaker: CircuitBreaker) -> str:
+    """Описание состояния автомата защиты."""
+    state = breaker.state
+    if state == CircuitBreaker.OPEN:
+        return f"🔴 разомкнут, повтор через {breaker.retry_after:.0f} с"
+    if state == CircuitBreaker.HALF_OPEN:
+        return "🟡 пробный запрос"
+    if breaker.failures:
+        return f"🟢 замкнут (сбоев подряд: {breaker.failures})"
+    return "🟢 замкнут"
+
+
 @router.callback_query(F.data == "back_to_menu")
 async def callback_back_to_menu(callback: CallbackQuery):
     """Возврат в главное меню."""
     await callback.message.edit_text(
-        "📋 Главное меню:",
-        reply_markup=get_main_menu(),
+        main_menu_title(callback.from_user.id),
+        parse_mode="HTML",
+        reply_markup=get_main_menu(panels.multi),
     )
     await callback.answer()
 
 
+@router.callback_query(F.data == "panels")
+async def callback_panels(callback: CallbackQuery):
+    """Показать список панелей для выбора."""
+    await callback.answer()
+    current = panels.current(callback.from_user.id)
+    await callback.message.edit_text(
+        f"🖧 <b>Панели ({len(panels)}):</b>\n\nТекущая: <b>{current.name}</b>",
+        parse_mode="HTML",
+        reply_markup=get_panels_keyboard([panel.name for panel in panels], current.name),
+    )
+
+
+@router.callback_query(F.data.startswith("panel:"))
+async def callback_select_panel(callback: CallbackQuery):
+    """Выбрать панель."""
+    index = callback.data.split(":")[1]
+    panel = panels.by_index(int(index)) if index.isdigit() else None
+    if panel is None:
+        await callback.answer("Панель не найдена", show_alert=True)
+        return
+    
+    panels.select(callback.from_user.id, panel)
+    await callback.answer(f"Выбрана панель {panel.name}")
+    await callback.message.edit_text(
+        main_menu_title(callback.from_user.id),
+        parse_mode="HTML",
+        reply_markup=get_main_menu(panels.multi),
+    )
+
+
 @router.callback_query(F.data == "status")
 async def callback_status(callback: CallbackQuery):
     """Показать статус сервера."""
     await callback.answer()
+    panel = panels.current(callback.from_user.id)
     
     try:
-        # Запрашиваем статус с правильными параметрами согласно документации API
-        response = await sui_client.get_status(resource="cpu,ram,disk,uptime,loads,netIO,tcpCount,udpCount")
+        # Статус и онлайн запрашиваем параллельно
+        response, online = await panel.client.gather(
+            panel.client.get_status(resource="cpu,ram,disk,uptime,loads,netIO,tcpCount,udpCount"),
+            panel.online_poller.ensure_loaded(),
+        )
+        if isinstance(response, SUiAPIError):
+            raise response
+        if isinstance(online, SUiAPIError):
+            logger.warning(f"Не удалось получить онлайн пользователей: {online}")
+            online = OnlineState()
         obj = response.get("obj", {})
         
         # Логируем для отладки
         logger.info(f"Получен статус с метриками: {list(obj.keys())}")
         
         # Форматируем статус
-        status_text = "📊 <b>Статус сервера:</b>\n\n"
+        if panels.multi:
+            status_text = f"📊 <b>Статус сервера {panel.name}:</b>\n\n"
+        else:
+            status_text = "📊 <b>Статус сервера:</b>\n\n"
+        if response.get("stale"):
+            status_text += "⚠️ <i>Панель недоступна, показаны последние полученные данные</i>\n\n"
         
         # CPU
         if "cpu" in obj:
@@ -122,14 +196,16 @@ async def callback_status(callback: CallbackQuery):
                 status_text += f"   ⬇️ Получено: {format_bytes(down)}\n"
         
         # Онлайн клиенты
-        try:
-            online_response = await sui_client.get_onlines()
-            online_data = online_response.get("obj", {})
-            online_users = online_data.get("user", []) if isinstance(online_data, dict) else []
-            if online_users:
-                status_text += f"\n🌐 <b>Клиентов онлайн:</b> {len(online_users)}\n"
-        except:
-            pass
+        if online.users:
+            status_text += f"\n🌐 <b>Клиентов онлайн:</b> {len(online.users)}\n"
+        
+        # Пул соединений с панелью
+        pool = panel.client.pool_stats()
+        status_text += (
+            f"\n🔌 <b>Пул соединений:</b> {pool['in_use']} занято, "
+            f"{pool['idle']} свободно, {pool['queued']} в очереди (лимит {pool['limit']})\n"
+        )
+        status_text += f"🛡 <b>Автомат защиты:</b> {format_breaker(panel.client.breaker)}\n"
         
         await callback.message.edit_text(
             status_text,
@@ -144,23 +220,26 @@ async def callback_status(callback: CallbackQuery):
         )
 
 
+@router.callback_query(F.data == "noop")
+async def callback_noop(callback: CallbackQuery):
+    """Кнопка без действия (например, номер страницы)."""
+    await callback.answer()
+
+
 @router.callback_query(F.data == "clients")
+@router.callback_query(F.data.startswith("clients:"))
 async def callback_clients(callback: CallbackQuery):
-    """Показать список клиентов с кнопками и онлайн статусом."""
+    """Показать страницу списка клиентов с кнопками и онлайн статусом."""
     await callback.answer()
+    panel = panels.current(callback.from_user.id)
+    
+    # Формат callback_data: clients[:<сортировка>:<страница>]
+    parts = callback.data.split(":")
+    sort = parts[1] if len(parts) > 1 and parts[1] in SORT_KEYS else "name"
+    page = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else 0
     
     try:
-        response = await sui_client.get_clients()
-        clients_data = response.get("obj", {})
-        
-        # API возвращает словарь с ключом 'clients'
-        if isinstance(clients_data, dict):
-            clients = clients_data.get("clients", [])
-        elif isinstance(clients_data, list):
-            clients = clients_data
-        else:
-            logger.error(f"Неожиданный тип данных клиентов: {type(clients_data)}")
-            clients = []
+        clients = await panel.client_store.all()
         
         if not clients:
             await callback.message.edit_text(
@@ -170,27 +249,14 @@ async def callback_clients(callback: CallbackQuery):
             )
             return
         
-        # Получаем онлайн пользователей
-        try:
-            online_response = await sui_client.get_onlines()
-            online_data = online_response.get("obj", {})
-            online_users = online_data.get("user", []) if isinstance(online_data, dict) else []
-        except:
-            online_users = []
+        # Онлайн пользователи из фонового опроса
+        online_set = (await panel.online_poller.ensure_loaded()).users
         
         from src.keyboards import get_clients_keyboard
         
-        # Подсчитываем общий трафик всех клиентов
-        total_up = 0
-        total_down = 0
-        for client in clients:
-            if isinstance(client, dict):
-                up = client.get("up", 0)
-                down = client.get("down", 0)
-                if isinstance(up, (int, float)):
-                    total_up += up
-                if isinstance(down, (int, float)):
-                    total_down += down
+        # Общий трафик и порядок сортировки кэшируются до изменения данных
+        total_up, total_down, _ = panel.client_store.traffic_totals()
+        sorted_clients = panel.client_store.sorted_clients(sort, online_set)
         
         def format_traffic(bytes_val):
             if bytes_val < 1024**3:  # Меньше 1GB
@@ -208,7 +274,7 @@ async def callback_clients(callback: CallbackQuery):
         await callback.message.edit_text(
             text,
             parse_mode="HTML",
-            reply_markup=get_clients_keyboard(clients, online_users),
+            reply_markup=get_clients_keyboard(sorted_clients, online_set, page, sort),
         )
     except SUiAPIError as e:
         logger.error(f"Ошибка при получении клиентов: {e}")
@@ -222,25 +288,26 @@ async def callback_clients(callback: CallbackQuery):
 async def callback_client_info(callback: CallbackQuery):
     """Показать полную информацию о клиенте включая ссылки."""
     await callback.answer()
+    panel = panels.current(callback.from_user.id)
     
-    client_id = int(callback.data.split(":")[1])
+    # Формат callback_data: client_info:<id>[:<сортировка>:<страница>]
+    parts = callback.data.split(":")
+    client_id = int(parts[1])
+    back = ":".join(["clients", *parts[2:4]]) if len(parts) >= 4 else "clients"
     
     try:
-        # Получаем данные клиента
-        response = await sui_client.get_clients()
-        clients_data = response.get("obj", {})
-        
-        if isinstance(clients_data, dict):
-            clients = clients_data.get("clients", [])
-        else:
-            clients = []
-        
-        # Найти клиента по ID
-        client = None
-        for c in clients:
-            if c.get("id") == client_id:
-                client = c
-                break
+        # Клиент, снимок панели, онлайн и шаблон подписки независимы — запрашиваем параллельно
+        client, loaded, online, template = await panel.client.gather(
+            panel.client_store.get(client_id),
+            panel.snapshot.ensure_loaded(),
+            panel.online_poller.ensure_loaded(),
+            panel.subscriptions.template(),
+        )
+        if isinstance(client, SUiAPIError):
+            raise client
+        if isinstance(online, SUiAPIError):
+            logger.warning(f"Не удалось получить онлайн пользователей: {online}")
+            online = OnlineState()
         
         if not client:
             await callback.message.edit_text(
@@ -249,30 +316,19 @@ async def callback_client_info(callback: CallbackQuery):
             )
             return
         
-        name = client.get("name", "Без имени")
-        enable = client.get("enable", False)
-        volume = client.get("volume", 0)
-        used_up = client.get("up", 0)
-        used_down = client.get("down", 0)
-        expiry = client.get("expiry", 0)
-        desc = client.get("desc", "")
-        group = client.get("group", "")
-        inbound_ids = client.get("inbounds", [])
+        name = client.name or "Без имени"
+        volume = client.volume
+        used_up = client.up
+        used_down = client.down
         
         # Проверяем онлайн статус
-        try:
-            online_response = await sui_client.get_onlines()
-            online_data = online_response.get("obj", {})
-            online_users = online_data.get("user", []) if isinstance(online_data, dict) else []
-            is_online = name in online_users
-        except:
-            is_online = False
+        is_online = name in online.users
         
         # Формируем статус
         if is_online:
             status_icon = "🟢"
             status_text = "Онлайн"
-        elif enable:
+        elif client.enable:
             status_icon = "🟡"
             status_text = "Офлайн"
         else:
@@ -283,7 +339,7 @@ async def callback_client_info(callback: CallbackQuery):
         text += f"📊 <b>Статус:</b> {status_text}\n"
         
         # Статистика трафика
-        used_total = used_up + used_down
+        used_total = client.used
         
         if volume > 0:
             percent = (used_total / volume * 100)
@@ -298,94 +354,36 @@ async def callback_client_info(callback: CallbackQuery):
         text += f"   ⬇️ Загрузка: {format_bytes(used_down)}\n"
         text += f"   ⬆️ Отдача: {format_bytes(used_up)}\n"
         
-        # Получаем настройки для подписки
-        try:
-            settings_response = await sui_client.get_settings()
-            settings_obj = settings_response.get("obj", {})
-            
-            # Получаем путь подписки (по умолчанию /sub согласно документации)
-            sub_uri = settings_obj.get("subURI", settings_obj.get("subPath", "/sub"))
-            sub_domain = settings_obj.get("subDomain", "")
-            # Получаем порт подписки (может быть отдельным или тем же что и панель)
-            sub_port = settings_obj.get("subPort", settings_obj.get("webPort", None))
-            
-            # Логируем для отладки
-            logger.info(f"Настройки подписки: sub_uri={sub_uri}, sub_domain={sub_domain}, sub_port={sub_port}")
-            
-            # Если sub_uri пустой, используем стандартный путь /sub
-            if not sub_uri or sub_uri.strip() == "":
-                sub_uri = "/sub"
-            
-            # Убеждаемся что sub_uri начинается с /
-            if sub_uri and not sub_uri.startswith("/"):
-                sub_uri = "/" + sub_uri
-            
-            from src.config import settings
-            from urllib.parse import urlparse
-            parsed = urlparse(settings.sui_url)
-            
-            if sub_domain:
-                # Если указан отдельный домен для подписки
-                if sub_port and sub_port not in [80, 443]:
-                    sub_url = f"https://{sub_domain}:{sub_port}{sub_uri}/{name}"
-                else:
-                    sub_url = f"https://{sub_domain}{sub_uri}/{name}"
-            else:
-                # Используем URL из конфига бота
-                scheme = parsed.scheme
-                hostname = parsed.hostname
-                # Используем порт подписки если указан, иначе порт из URL
-                if sub_port:
-                    port = sub_port
-                else:
-                    port = parsed.port
-                
-                if port and port not in [80, 443]:
-                    sub_url = f"{scheme}://{hostname}:{port}{sub_uri}/{name}"
-                else:
-                    sub_url = f"{scheme}://{hostname}{sub_uri}/{name}"
-            
-            logger.info(f"Сформирована ссылка подписки: {sub_url}")
-            text += f"\n🔗 <b>Подписка:</b>\n<code>{sub_url}</code>\n"
-        except Exception as e:
-            logger.error(f"Ошибка генерации ссылки подписки: {e}")
-            pass
+        # Ссылка подписки по шаблону из настроек панели
+        if isinstance(template, SUiAPIError):
+            logger.error(f"Ошибка генерации ссылки подписки: {template}")
+        else:
+            text += f"\n🔗 <b>Подписка:</b>\n<code>{template.link(name)}</code>\n"
         
         # Получаем inbounds для ссылок
-        if inbound_ids:
-            try:
-                load_response = await sui_client.load_full_data()
-                load_data = load_response.get("obj", {})
-                inbounds = load_data.get("inbounds", [])
-                
-                text += f"\n📱 <b>Доступные подключения:</b>\n"
-                for inbound_id in inbound_ids:
-                    for inbound in inbounds:
-                        if inbound.get("id") == inbound_id:
-                            tag = inbound.get("tag", "")
-                            protocol = inbound.get("type", "")
-                            port = inbound.get("listen_port", 0)
-                            text += f"   • {tag} ({protocol}) - порт {port}\n"
-            except:
-                pass
-        
-        if expiry > 0:
-            from datetime import datetime
-            expiry_date = datetime.fromtimestamp(expiry / 1000)
+        if client.inbounds and not isinstance(loaded, SUiAPIError):
+            text += f"\n📱 <b>Доступные подключения:</b>\n"
+            for inbound_id in client.inbounds:
+                inbound = panel.snapshot.find_inbound(inbound_id)
+                if inbound:
+                    text += f"   • {inbound.tag} ({inbound.type}) - порт {inbound.listen_port}\n"
+        
+        if client.expiry > 0:
+            expiry_date = datetime.fromtimestamp(client.expiry / 1000)
             text += f"\n📅 <b>Истекает:</b> {expiry_date.strftime('%Y-%m-%d %H:%M')}\n"
         
-        if group:
-            text += f"👥 <b>Группа:</b> {group}\n"
+        if client.group:
+            text += f"👥 <b>Группа:</b> {client.group}\n"
         
-        if desc:
-            text += f"\n📝 <b>Описание:</b> {desc}\n"
+        if client.desc:
+            text += f"\n📝 <b>Описание:</b> {client.desc}\n"
         
         from src.keyboards import get_client_actions
         
         await callback.message.edit_text(
             text,
             parse_mode="HTML",
-            reply_markup=get_client_actions(client_id, name),
+            reply_markup=get_client_actions(client_id, name, back),
         )
     except SUiAPIError as e:
         logger.error(f"Ошибка при получении информации о клиенте: {e}")
@@ -395,23 +393,75 @@ async def callback_client_info(callback: CallbackQuery):
         )
 
 
+@router.callback_query(F.data == "traffic")
+async def callback_traffic(callback: CallbackQuery):
+    """Показать историю трафика из собранной статистики."""
+    await callback.answer()
+    panel = panels.current(callback.from_user.id)
+    
+    now = int(time.time())
+    day_ago = now - 86400
+    month_start = int(datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0).timestamp())
+    
+    try:
+        top_clients = await panel.traffic_collector.query("top", "client", day_ago, 10)
+        top_inbounds = await panel.traffic_collector.query("top", "inbound", day_ago, 5)
+        rates = await panel.traffic_collector.query("rates", "client", 300, 5)
+        days = await panel.traffic_collector.query("totals", "client", "day", now - 7 * 86400)
+        months = await panel.traffic_collector.query("totals", "client", "month", month_start)
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка чтения истории трафика: {e}")
+        await callback.message.edit_text(
+            f"❌ Ошибка при чтении истории трафика:\n{str(e)}",
+            reply_markup=get_back_button(),
+        )
+        return
+    
+    text = "📈 <b>Трафик</b>\n"
+    
+    if rates:
+        text += "\n⚡ <b>Скорость за 5 минут:</b>\n"
+        for tag, up, down in rates:
+            text += f"   • {tag}: ⬆️ {format_bytes(up)}/с ⬇️ {format_bytes(down)}/с\n"
+    
+    if top_clients:
+        text += "\n🏆 <b>Топ клиентов за 24 часа:</b>\n"
+        for idx, (tag, up, down) in enumerate(top_clients, 1):
+            text += f"   {idx}. {tag}: {format_bytes(up + down)}\n"
+    
+    if top_inbounds:
+        text += "\n📥 <b>Топ inbounds за 24 часа:</b>\n"
+        for idx, (tag, up, down) in enumerate(top_inbounds, 1):
+            text += f"   {idx}. {tag}: {format_bytes(up + down)}\n"
+    
+    if days:
+        text += "\n📅 <b>По дням:</b>\n"
+        for period, up, down in days:
+            text += f"   {period}: ⬆️ {format_bytes(up)} ⬇️ {format_bytes(down)}\n"
+    
+    if months:
+        period, up, down = months[-1]
+        text += f"\n🗓 <b>За месяц ({period}):</b> {format_bytes(up + down)}\n"
+    
+    if not (top_clients or top_inbounds or days):
+        text += "\nСтатистика ещё не собрана, загляните через несколько минут."
+    
+    await callback.message.edit_text(
+        text,
+        parse_mode="HTML",
+        reply_markup=get_back_button(),
+    )
+
+
 @router.callback_query(F.data == "inbounds")
 async def callback_inbounds(callback: CallbackQuery):
     """Показать список inbound соединений."""
     await callback.answer()
+    panel = panels.current(callback.from_user.id)
     
     try:
-        response = await sui_client.get_inbounds()
-        inbounds_data = response.get("obj", {})
-        
-        # API возвращает словарь с ключом 'inbounds'
-        if isinstance(inbounds_data, dict):
-            inbounds = inbounds_data.get("inbounds", [])
-        elif isinstance(inbounds_data, list):
-            inbounds = inbounds_data
-        else:
-            logger.error(f"Неожиданный тип данных inbounds: {type(inbounds_data)}")
-            inbounds = []
+        await panel.snapshot.ensure_loaded()
+        inbounds = panel.snapshot.inbounds
         
         if not inbounds:
             await callback.message.edit_text(
@@ -421,35 +471,22 @@ async def callback_inbounds(callback: CallbackQuery):
             )
             return
         
-        text = "📥 <b>Список Inbound соединений:</b>\n\n"
+        output = Output(
+            "📥 <b>Список Inbound соединений:</b>\n\n",
+            "inbounds.txt",
+            settings.output_max_messages,
+        )
         
         for idx, inbound in enumerate(inbounds, 1):
-            # Проверяем что inbound - это словарь
-            if not isinstance(inbound, dict):
-                logger.warning(f"Inbound {idx} не является словарем: {inbound}")
-                continue
-                
-            tag = inbound.get("tag", "N/A")
-            protocol = inbound.get("type", inbound.get("protocol", "N/A"))
-            listen = inbound.get("listen", "::")
-            port = inbound.get("listen_port", inbound.get("port", "N/A"))
-            # enable может отсутствовать, считаем что включен по умолчанию
-            enable = inbound.get("enable", True)
+            status = "✅" if inbound.enable else "❌"
             
-            status = "✅" if enable else "❌"
-            
-            text += f"{idx}. {status} <b>{tag}</b>\n"
-            text += f"   🔌 Протокол: {protocol}\n"
-            text += f"   🌐 Адрес: {listen}:{port}\n\n"
-        
-        if len(text) > 4000:
-            text = text[:4000] + "\n\n... (список слишком длинный)"
+            output.add(
+                f"{idx}. {status} <b>{inbound.tag or 'N/A'}</b>\n"
+                f"   🔌 Протокол: {inbound.type or 'N/A'}\n"
+                f"   🌐 Адрес: {inbound.listen}:{inbound.listen_port or 'N/A'}\n\n"
+            )
         
-        await callback.message.edit_text(
-            text,
-            parse_mode="HTML",
-            reply_markup=get_back_button(),
-        )
+        await send_output(callback.message, output, get_back_button())
     except SUiAPIError as e:
         logger.error(f"Ошибка при получении inbounds: {e}")
         await callback.message.edit_text(
@@ -462,18 +499,11 @@ async def callback_inbounds(callback: CallbackQuery):
 async def callback_outbounds(callback: CallbackQuery):
     """Показать список outbound соединений."""
     await callback.answer()
+    panel = panels.current(callback.from_user.id)
     
     try:
-        response = await sui_client.get_outbounds()
-        outbounds_data = response.get("obj", {})
-        
-        # API возвращает словарь с ключом 'outbounds'
-        if isinstance(outbounds_data, dict):
-            outbounds = outbounds_data.get("outbounds", [])
-        elif isinstance(outbounds_data, list):
-            outbounds = outbounds_data
-        else:
-            outbounds = []
+        await panel.snapshot.ensure_loaded()
+        outbounds = panel.snapshot.outbounds
         
         if not outbounds:
             await callback.message.edit_text(
@@ -483,26 +513,16 @@ async def callback_outbounds(callback: CallbackQuery):
             )
             return
         
-        text = "📤 <b>Список Outbound соединений:</b>\n\n"
+        output = Output(
+            "📤 <b>Список Outbound соединений:</b>\n\n",
+            "outbounds.txt",
+            settings.output_max_messages,
+        )
         
         for idx, outbound in enumerate(outbounds, 1):
-            if not isinstance(outbound, dict):
-                continue
-                
-            tag = outbound.get("tag", "N/A")
-            out_type = outbound.get("type", "N/A")
-            
-            text += f"{idx}. <b>{tag}</b>\n"
-            text += f"   🔌 Тип: {out_type}\n\n"
-        
-        if len(text) > 4000:
-            text = text[:4000] + "\n\n... (список слишком длинный)"
+            output.add(f"{idx}. <b>{outbound.tag or 'N/A'}</b>\n   🔌 Тип: {outbound.type or 'N/A'}\n\n")
         
-        await callback.message.edit_text(
-            text,
-            parse_mode="HTML",
-            reply_markup=get_back_button(),
-        )
+        await send_output(callback.message, output, get_back_button())
     except SUiAPIError as e:
         logger.error(f"Ошибка при получении outbounds: {e}")
         await callback.message.edit_text(
@@ -515,19 +535,11 @@ async def callback_outbounds(callback: CallbackQuery):
 async def callback_tls(callback: CallbackQuery):
     """Показать TLS сертификаты."""
     await callback.answer()
+    panel = panels.current(callback.from_user.id)
     
     try:
-        load_response = await sui_client.load_full_data()
-        load_data = load_response.get("obj", {})
-        
-        # Логируем для отладки
-        logger.info(f"TLS data keys: {load_data.keys() if isinstance(load_data, dict) else 'not dict'}")
-        
-        # API возвращает словарь с ключом 'tls' или 'tlsConfigs'
-        if isinstance(load_data, dict):
-            tls_certs = load_data.get("tls", load_data.get("tlsConfigs", []))
-        else:
-            tls_certs = []
+        await panel.snapshot.ensure_loaded()
+        tls_certs = panel.snapshot.tls
         
         if not tls_certs:
             await callback.message.edit_text(
@@ -537,60 +549,24 @@ async def callback_tls(callback: CallbackQuery):
             )
             return
         
-        text = "🔐 <b>TLS сертификаты:</b>\n\n"
+        output = Output("🔐 <b>TLS сертификаты:</b>\n\n", "tls.txt", settings.output_max_messages)
         
         for idx, cert in enumerate(tls_certs, 1):
-            if not isinstance(cert, dict):
-                logger.warning(f"TLS cert {idx} не является словарем: {cert}")
-                continue
-            
-            # Логируем для отладки
-            logger.info(f"TLS cert {idx} поля: {cert.keys()}")
-            
-            # Пробуем разные варианты полей
-            server_name = cert.get("server_name", cert.get("serverName", cert.get("sni", "")))
-            cert_file = cert.get("certificate", cert.get("cert", cert.get("cert_file", cert.get("certificateFile", ""))))
-            key_file = cert.get("key", cert.get("key_file", cert.get("keyFile", "")))
+            server = cert.server
+            server_name = server.server_name or cert.name or f"TLS #{cert.id}"
             
-            # Получаем ID и используем его для имени если нет server_name
-            cert_id = cert.get("id", idx)
-            if not server_name:
-                # Пытаемся найти любое полезное имя
-                for key in ["name", "tag", "domain"]:
-                    if key in cert and cert[key]:
-                        server_name = cert[key]
-                        break
-            
-            if not server_name:
-                server_name = f"TLS #{cert_id}"
-            
-            text += f"{idx}. <b>{server_name}</b>\n"
-            if cert_file:
+            text = f"{idx}. <b>{server_name}</b>\n"
+            if server.certificate_path:
                 # Показываем только имя файла, не полный путь
-                cert_name = cert_file.split("/")[-1] if "/" in cert_file else cert_file
-                text += f"   📄 Сертификат: {cert_name}\n"
-            if key_file:
-                key_name = key_file.split("/")[-1] if "/" in key_file else key_file
-                text += f"   🔑 Ключ: {key_name}\n"
-            
-            # Дополнительная информация
-            if "alpn" in cert:
-                alpn = cert["alpn"]
-                if isinstance(alpn, list):
-                    text += f"   🔧 ALPN: {', '.join(alpn)}\n"
-                else:
-                    text += f"   🔧 ALPN: {alpn}\n"
+                text += f"   📄 Сертификат: {server.certificate_path.rsplit('/', 1)[-1]}\n"
+            if server.key_path:
+                text += f"   🔑 Ключ: {server.key_path.rsplit('/', 1)[-1]}\n"
+            if server.alpn:
+                text += f"   🔧 ALPN: {', '.join(server.alpn)}\n"
             
-            text += "\n"
+            output.add(text + "\n")
         
-        if len(text) > 4000:
-            text = text[:4000] + "\n\n... (список слишком длинный)"
-        
-        await callback.message.edit_text(
-            text,
-            parse_mode="HTML",
-            reply_markup=get_back_button(),
-        )
+        await send_output(callback.message, output, get_back_button())
     except SUiAPIError as e:
         logger.error(f"Ошибка при получении TLS: {e}")
         await callback.message.edit_text(
@@ -603,30 +579,24 @@ async def callback_tls(callback: CallbackQuery):
 async def callback_config(callback: CallbackQuery):
     """Показать конфигурацию."""
     await callback.answer()
+    panel = panels.current(callback.from_user.id)
     
     try:
-        response = await sui_client.get_config()
-        config_data = response.get("obj", {})
+        await panel.snapshot.ensure_loaded()
+        config_data = panel.snapshot.config
         
-        text = "📋 <b>Конфигурация системы:</b>\n\n"
+        output = Output("📋 <b>Конфигурация системы:</b>\n\n", "config.txt", settings.output_max_messages)
         
         if isinstance(config_data, dict):
-            # Показываем основные параметры конфигурации
-            for key, value in list(config_data.items())[:15]:  # Первые 15 параметров
+            # Показываем простые параметры конфигурации
+            for key, value in config_data.items():
                 if isinstance(value, (str, int, bool, float)):
-                    text += f"• <code>{key}</code>: {value}\n"
+                    output.add(f"• <code>{key}</code>: {value}\n")
         
-        if len(text) < 50:
-            text += "Конфигурация пуста или недоступна."
+        if not output.blocks:
+            output.add("Конфигурация пуста или недоступна.")
         
-        if len(text) > 4000:
-            text = text[:4000] + "\n\n... (конфигурация обрезана)"
-        
-        await callback.message.edit_text(
-            text,
-            parse_mode="HTML",
-            reply_markup=get_back_button(),
-        )
+        await send_output(callback.message, output, get_back_button())
     except SUiAPIError as e:
         logger.error(f"Ошибка при получении config: {e}")
         await callback.message.edit_text(
@@ -639,9 +609,10 @@ async def callback_config(callback: CallbackQuery):
 async def callback_settings(callback: CallbackQuery):
     """Показать настройки панели."""
     await callback.answer()
+    panel = panels.current(callback.from_user.id)
     
     try:
-        response = await sui_client.get_settings()
+        response = await panel.client.get_settings()
         settings_obj = response.get("obj", {})
         
         text = "⚙️ <b>Настройки панели:</b>\n\n"
@@ -722,11 +693,12 @@ async def callback_logs(callback: CallbackQuery):
 async def callback_logs_count(callback: CallbackQuery):
     """Показать логи с определённым количеством записей."""
     await callback.answer()
+    panel = panels.current(callback.from_user.id)
     
     count = int(callback.data.split("_")[1])
     
     try:
-        response = await sui_client.get_logs(count=count)
+        response = await panel.client.get_logs(count=count)
         logs = response.get("obj", [])
         
         if not logs:
@@ -737,24 +709,18 @@ async def callback_logs_count(callback: CallbackQuery):
             )
             return
         
-        text = f"📝 <b>Последние {count} записей логов:</b>\n\n"
-        text += "```\n"
+        output = Output(
+            f"📝 <b>Последние {count} записей логов:</b>\n\n",
+            "logs.txt",
+            settings.output_max_messages,
+            wrap=("<pre>", "</pre>"),
+        )
         
         # Берём последние записи и показываем их в хронологическом порядке (старые сверху, новые снизу)
         for log in logs[-count:]:
-            text += f"{log}\n"
+            output.add(f"{html.escape(str(log))}\n")
         
-        text += "```"
-        
-        # Если слишком длинно, обрезаем
-        if len(text) > 4000:
-            text = text[:4000] + "\n```\n... (логи обрезаны)"
-        
-        await callback.message.edit_text(
-            text,
-            parse_mode="Markdown",
-            reply_markup=get_back_button(),
-        )
+        await send_output(callback.message, output, get_back_button())
     except SUiAPIError as e:
         logger.error(f"Ошибка при получении логов: {e}")
         await callback.message.edit_text(
@@ -793,9 +759,10 @@ async def callback_restart_app(callback: CallbackQuery):
 async def callback_confirm_restart_core(callback: CallbackQuery):
     """Подтверждённый перезапуск Core."""
     await callback.answer("Перезапускаю Core...")
+    panel = panels.current(callback.from_user.id)
     
     try:
-        await sui_client.restart_core()
+        await panel.client.restart_core()
         await callback.message.edit_text(
             "✅ Sing-Box Core успешно перезапущен!",
             reply_markup=get_back_button(),
@@ -812,9 +779,10 @@ async def callback_confirm_restart_core(callback: CallbackQuery):
 async def callback_confirm_restart_app(callback: CallbackQuery):
     """Подтверждённый перезапуск приложения."""
     await callback.answer("Перезапускаю приложение...")
+    panel = panels.current(callback.from_user.id)
     
     try:
-        await sui_client.restart_app()
+        await panel.client.restart_app()
         await callback.message.edit_text(
             "✅ Приложение S-UI успешно перезапущено!",
             reply_markup=get_back_button(),
@@ -7,6 +7,7 @@ from aiogram.filters import Command
 from aiogram.types import Message
 
 from src.config import settings
+from src.handlers.callbacks import panels
 from src.keyboards import get_main_menu
 
 logger = logging.getLogger(__name__)
@@ -29,7 +30,7 @@ async def cmd_start(message: Message):
         f"👋 Привет, {message.from_user.first_name}!\n\n"
         "Это бот для управления S-UI панелью VPN.\n"
         "Выберите действие из меню ниже:",
-        reply_markup=get_main_menu(),
+        reply_markup=get_main_menu(panels.multi),
     )
 
 
@@ -46,6 +47,14 @@ async def cmd_help(message: Message):
 <b>Доступные команды:</b>
 /start - Запустить бота и показать главное меню
 /help - Показать это сообщение
+/find - Поиск клиентов по имени, группе и статусу
+/fleet - Нагрузка всех узлов (CPU, RAM, диск, сеть)
+/export - Выгрузка ссылок подписки всех клиентов (csv или txt)
+/bulk - Массовые операции: включение, отключение, продление, сброс трафика, удаление истёкших
+/logsearch - Поиск по логам регулярным выражением
+/alerts - Пороги оповещений о квоте, сроке и нагрузке
+/metrics - Метрики бота: запросы к панели, кэш, обработчики
+/profile - Профили обработчиков (если включено профилирование)
 
 <b>Функции бота:</b>
 • 📊 Статус сервера - загрузка CPU, RAM, диска, сети, uptime
@@ -58,8 +67,9 @@ async def cmd_help(message: Message):
 • 🔐 TLS - сертификаты и конфигурация
 • ⚙️ Настройки - конфигурация панели S-UI
 • 📋 Конфиг - параметры системы
-• 📜 Логи - просмотр логов сервера
+• 📜 Логи - просмотр логов сервера, 📡 Live - обновление в реальном времени
 • 🔄 Перезапуск - Core или приложение
+• 🔎 Inline поиск - наберите @имя_бота и начало имени клиента
 
 <b>О панели S-UI:</b>
 S-UI - это продвинутая панель управления для Sing-Box с поддержкой множества протоколов и расширенной маршрутизацией трафика.
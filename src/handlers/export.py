@@ -0,0 +1,107 @@
+"""Выгрузка ссылок подписки всех клиентов файлом."""
+
+import csv
+import io
+import logging
+from datetime import datetime
+
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import BufferedInputFile, Message
+
+from src.config import settings
+from src.handlers.callbacks import panels
+from src.models import Client
+from src.subscriptions import SubscriptionTemplate
+from src.sui_api import SUiAPIError
+
+logger = logging.getLogger(__name__)
+router = Router()
+
+EXPORT_FORMATS = ("csv", "txt")
+
+# Начало ячейки, с которого табличные редакторы читают формулу
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def is_admin(user_id: int) -> bool:
+    """Проверка, является ли пользователь администратором."""
+    return user_id in settings.admin_list
+
+
+def csv_cell(value: str) -> str:
+    """Текст ячейки CSV, который табличный редактор не примет за формулу."""
+    if value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def build_export(template: SubscriptionTemplate, clients: list[Client], fmt: str) -> tuple[bytes, int]:
+    """
+    Сформировать файл со ссылками подписки.
+
+    Args:
+        template: Шаблон ссылки подписки
+        clients: Клиенты
+        fmt: csv (имя, группа, включен, ссылка) или txt (ссылка на строку)
+
+    Returns:
+        Содержимое файла и число ссылок
+    """
+    links = template.links(clients)
+    if fmt == "txt":
+        return "".join(f"{link}\n" for _, link in links).encode(), len(links)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(("name", "group", "enable", "subscription"))
+    writer.writerows(
+        (csv_cell(client.name), csv_cell(client.group), int(client.enable), link)
+        for client, link in links
+    )
+    # BOM, чтобы Excel открыл кириллицу в UTF-8
+    return buffer.getvalue().encode("utf-8-sig"), len(links)
+
+
+@router.message(Command("export"))
+async def cmd_export(message: Message, command: CommandObject):
+    """Обработчик команды /export."""
+    if not is_admin(message.from_user.id):
+        await message.answer("❌ У вас нет доступа к этому боту.")
+        return
+
+    fmt = (command.args or "csv").strip().lower()
+    if fmt not in EXPORT_FORMATS:
+        await message.answer(
+            "📤 <b>Выгрузка ссылок подписки</b>\n\n"
+            "<code>/export</code> или <code>/export csv</code> - таблица с именем, группой и ссылкой\n"
+            "<code>/export txt</code> - только ссылки, по одной на строку",
+            parse_mode="HTML",
+        )
+        return
+
+    panel = panels.current(message.from_user.id)
+    try:
+        template, loaded = await panel.client.gather(
+            panel.subscriptions.template(),
+            panel.client_store.all(),
+        )
+        for result in (template, loaded):
+            if isinstance(result, SUiAPIError):
+                raise result
+        clients = panel.client_store.sorted_clients("name")
+    except SUiAPIError as e:
+        logger.error(f"Ошибка при выгрузке ссылок подписки: {e}")
+        await message.answer(f"❌ Ошибка при выгрузке ссылок подписки:\n{str(e)}")
+        return
+
+    if not clients:
+        await message.answer("📤 Клиенты не найдены.")
+        return
+
+    data, count = build_export(template, clients, fmt)
+    filename = f"subscriptions-{panel.name}-{datetime.now():%Y%m%d-%H%M}.{fmt}"
+    await message.answer_document(
+        BufferedInputFile(data, filename=filename),
+        caption=f"📤 Ссылок подписки: {count}",
+    )
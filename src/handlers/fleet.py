@@ -0,0 +1,145 @@
+"""Обработчики сводных представлений по всем узлам."""
+
+import asyncio
+import html
+import logging
+from datetime import datetime
+
+from aiogram import F, Router
+from aiogram.filters import Command
+from aiogram.types import CallbackQuery, Message
+
+from src.config import settings
+from src.fleet import STATUS_METRICS, FleetDashboard, FleetReport, NodeStatus, collect_overview
+from src.handlers.callbacks import format_bytes, panels
+from src.keyboards import get_fleet_keyboard
+from src.render import Output, send_output
+
+logger = logging.getLogger(__name__)
+router = Router()
+
+# Сводный статус узлов; опрос разделяется между администраторами
+dashboard = FleetDashboard(
+    panels,
+    concurrency=settings.fleet_concurrency,
+    timeout=settings.fleet_timeout,
+    ttl=settings.fleet_cache_ttl,
+    worst_n=settings.fleet_worst_n,
+)
+
+# Показатели в байтах (остальные - проценты или количество)
+BYTE_METRICS = {"net_up", "net_down"}
+PERCENT_METRICS = {"cpu", "ram", "disk"}
+
+
+def is_admin(user_id: int) -> bool:
+    """Проверка, является ли пользователь администратором."""
+    return user_id in settings.admin_list
+
+
+def format_metric(key: str, value: float) -> str:
+    """Форматирование значения показателя."""
+    if key in BYTE_METRICS:
+        return format_bytes(value)
+    if key in PERCENT_METRICS:
+        return f"{value:.1f}%"
+    return str(round(value))
+
+
+def format_fleet_report(report: FleetReport) -> Output:
+    """Сводный статус узлов: показатели в заголовке, проблемные узлы списком."""
+    updated = datetime.fromtimestamp(report.sampled_at).strftime("%H:%M:%S")
+    text = (
+        f"📊 <b>Нагрузка узлов ({report.available}/{len(report.nodes)} доступны)</b>\n"
+        f"<i>обновлено {updated}</i>\n\n"
+    )
+
+    if report.metrics:
+        text += "<i>min / avg / max</i>\n"
+    for key, label in STATUS_METRICS.items():
+        summary = report.metrics.get(key)
+        if summary is None:
+            continue
+        text += (
+            f"<b>{label}:</b> {format_metric(key, summary.min)} / "
+            f"{format_metric(key, summary.avg)} / {format_metric(key, summary.max)}\n"
+        )
+        if panels.multi:
+            worst = ", ".join(
+                f"{html.escape(name)} {format_metric(key, value)}" for name, value in report.worst[key]
+            )
+            text += f"   ↳ {worst}\n"
+
+    output = Output(text + "\n", "fleet.txt", settings.output_max_messages)
+    for name, status in report.nodes:
+        if isinstance(status, asyncio.TimeoutError):
+            output.add(f"❌ <b>{html.escape(name)}</b> - таймаут\n")
+        elif isinstance(status, BaseException):
+            output.add(f"❌ <b>{html.escape(name)}</b> - ошибка: {html.escape(str(status))}\n")
+        elif isinstance(status, NodeStatus) and status.stale:
+            output.add(f"⚠️ <b>{html.escape(name)}</b> - недоступна, последние данные\n")
+    return output
+
+
+@router.message(Command("fleet"))
+async def cmd_fleet(message: Message):
+    """Обработчик команды /fleet."""
+    if not is_admin(message.from_user.id):
+        await message.answer("❌ У вас нет доступа к этому боту.")
+        return
+
+    report = await dashboard.get()
+    await send_output(message, format_fleet_report(report), get_fleet_keyboard("fleet_status"), edit=False)
+
+
+@router.callback_query(F.data.in_({"fleet_status", "fleet_status:refresh"}))
+async def callback_fleet_status(callback: CallbackQuery):
+    """Показать сводный статус узлов."""
+    await callback.answer()
+
+    report = await dashboard.get(force=callback.data.endswith(":refresh"))
+    await send_output(callback.message, format_fleet_report(report), get_fleet_keyboard("fleet_status"))
+
+
+@router.callback_query(F.data == "fleet_overview")
+async def callback_fleet_overview(callback: CallbackQuery):
+    """Показать суммарный онлайн и трафик по всем узлам."""
+    await callback.answer()
+
+    results = await collect_overview(panels, settings.fleet_concurrency, settings.fleet_timeout)
+
+    total_online = 0
+    total_clients = 0
+    total_up = 0
+    total_down = 0
+    available = 0
+    lines = []
+    for panel, summary in results:
+        if isinstance(summary, BaseException):
+            if isinstance(summary, asyncio.TimeoutError):
+                reason = "таймаут"
+            else:
+                reason = f"ошибка: {html.escape(str(summary))}"
+            lines.append(f"❌ <b>{html.escape(panel.name)}</b> - {reason}")
+            continue
+        available += 1
+        total_online += summary.online
+        total_clients += summary.clients
+        total_up += summary.up
+        total_down += summary.down
+        lines.append(
+            f"✅ <b>{html.escape(panel.name)}</b> - 🟢 {summary.online} / 👥 {summary.clients}, "
+            f"{format_bytes(summary.up + summary.down)}"
+        )
+
+    text = f"🌐 <b>Все узлы ({available}/{len(panels)} доступны):</b>\n\n"
+    text += f"🟢 <b>Онлайн:</b> {total_online}\n"
+    text += f"👥 <b>Клиентов:</b> {total_clients}\n"
+    text += f"⬆️ Отправлено: {format_bytes(total_up)}\n"
+    text += f"⬇️ Получено: {format_bytes(total_down)}\n"
+    text += f"📈 Всего: {format_bytes(total_up + total_down)}\n\n"
+
+    output = Output(text, "fleet.txt", settings.output_max_messages)
+    for line in lines:
+        output.add(line + "\n")
+    await send_output(callback.message, output, get_fleet_keyboard("fleet_overview"))
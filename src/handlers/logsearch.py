@@ -0,0 +1,110 @@
+"""Поиск по логам (/logsearch) и оповещения по правилам."""
+
+import html
+import logging
+import re
+
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message
+
+from src.config import settings
+from src.handlers.callbacks import panels
+from src.log_alerts import LogAlert, LogAlertWatcher, LogMatcher
+from src.render import Output, send_output
+from src.sui_api import SUiAPIError
+
+logger = logging.getLogger(__name__)
+router = Router()
+
+
+def is_admin(user_id: int) -> bool:
+    """Проверка, является ли пользователь администратором."""
+    return user_id in settings.admin_list
+
+
+def format_alert(alert: LogAlert) -> str:
+    """Текст оповещения по правилу."""
+    text = f"🚨 <b>Логи: {html.escape(alert.rule)}</b>"
+    if panels.multi:
+        text += f" (панель {html.escape(alert.panel)})"
+    text += f"\nСовпадений: {alert.count}\n\n"
+    text += "<pre>" + "\n".join(html.escape(line[:500]) for line in alert.samples) + "</pre>"
+    return text
+
+
+async def report_alert(bot, alert: LogAlert):
+    """Отправить оповещение всем администраторам."""
+    text = format_alert(alert)
+    for admin_id in settings.admin_list:
+        try:
+            await bot.send_message(admin_id, text, parse_mode="HTML")
+        except Exception as e:
+            logger.warning(f"Не удалось отправить оповещение администратору {admin_id}: {e}")
+
+
+# Правила проверяются при запуске: ошибка в выражении останавливает бота
+watcher = LogAlertWatcher(
+    panels,
+    LogMatcher(settings.log_alert_rules),
+    report_alert,
+    interval=settings.log_alert_interval,
+    window=settings.log_alert_window,
+    cooldown=settings.log_alert_cooldown,
+    concurrency=settings.fleet_concurrency,
+    timeout=settings.fleet_timeout,
+)
+
+
+@router.message(Command("logsearch"))
+async def cmd_logsearch(message: Message, command: CommandObject):
+    """Обработчик команды /logsearch."""
+    if not is_admin(message.from_user.id):
+        await message.answer("❌ У вас нет доступа к этому боту.")
+        return
+
+    query = (command.args or "").strip()
+    if not query:
+        await message.answer(
+            "🔎 <b>Поиск по логам</b>\n\n"
+            "<code>/logsearch выражение</code> - строки последних "
+            f"{settings.log_search_lines} записей лога, подходящие под регулярное "
+            "выражение (без учёта регистра)\n\n"
+            "Например: <code>/logsearch user1</code> или <code>/logsearch error|timeout</code>",
+            parse_mode="HTML",
+        )
+        return
+    try:
+        pattern = re.compile(query, re.IGNORECASE)
+    except re.error as e:
+        await message.answer(f"❌ Некорректное выражение: {html.escape(str(e))}", parse_mode="HTML")
+        return
+
+    panel = panels.current(message.from_user.id)
+    try:
+        response = await panel.client.get_logs(count=settings.log_search_lines)
+    except SUiAPIError as e:
+        logger.error(f"Ошибка при поиске по логам: {e}")
+        await message.answer(f"❌ Ошибка при получении логов:\n{str(e)}")
+        return
+
+    logs = response.get("obj") or []
+    lines = [str(line) for line in logs] if isinstance(logs, list) else []
+    found = [line for line in lines if pattern.search(line)]
+    if not found:
+        await message.answer(f"🔎 В последних {len(lines)} строках лога совпадений нет.")
+        return
+
+    header = f"🔎 <b>Логи:</b> <code>{html.escape(query)}</code>"
+    if panels.multi:
+        header += f" (панель {html.escape(panel.name)})"
+    header += f"\nНайдено строк: {len(found)} из {len(lines)}\n\n"
+    output = Output(
+        header,
+        "logsearch.txt",
+        max_messages=settings.output_max_messages,
+        wrap=("<pre>", "</pre>"),
+    )
+    for line in found:
+        output.add(f"{html.escape(line)}\n")
+    await send_output(message, output, edit=False)
@@ -0,0 +1,132 @@
+"""Live-просмотр логов панели."""
+
+import html
+import logging
+from datetime import datetime
+
+from aiogram import F, Router
+from aiogram.types import CallbackQuery
+
+from src.config import settings
+from src.handlers.callbacks import panels
+from src.keyboards import LOG_LEVELS, get_logtail_keyboard
+from src.logtail import LogTailSession
+
+logger = logging.getLogger(__name__)
+router = Router()
+
+# Сколько символов строк помещается в сообщение вместе с заголовком
+LINES_LIMIT = 3500
+
+# Активные сессии по чату: в одном чате - одна сессия
+sessions: dict[int, LogTailSession] = {}
+
+
+def format_tail(session: LogTailSession) -> str:
+    """Текст сообщения live-просмотра."""
+    level = LOG_LEVELS.get(session.level, session.level)
+    text = f"📡 <b>Live логи</b> ({level})"
+    if panels.multi:
+        text += f" - панель {html.escape(session.panel_name)}"
+    text += "\n"
+    if session.updated_at:
+        updated = datetime.fromtimestamp(session.updated_at).strftime("%H:%M:%S")
+        text += f"<i>обновлено {updated}</i>\n"
+    if not session.running:
+        text += "⏹ <i>Остановлено</i>\n"
+    if session.error:
+        text += f"⚠️ {html.escape(session.error)}\n"
+
+    # Последние строки, сколько поместится
+    lines = []
+    size = 0
+    for line in reversed(session.lines):
+        escaped = html.escape(line)
+        size += len(escaped) + 1
+        if size > LINES_LIMIT:
+            break
+        lines.append(escaped)
+    lines.reverse()
+    text += "\n<pre>" + ("\n".join(lines) or "Новых записей пока нет") + "</pre>"
+    return text
+
+
+async def render_tail(session: LogTailSession):
+    """Отредактировать сообщение live-просмотра."""
+    await session.bot.edit_message_text(
+        format_tail(session),
+        chat_id=session.chat_id,
+        message_id=session.message_id,
+        parse_mode="HTML",
+        reply_markup=get_logtail_keyboard(session.level, session.running),
+    )
+
+
+def forget_session(session: LogTailSession):
+    """Убрать завершившуюся сессию, если её ещё не заменила новая."""
+    if sessions.get(session.chat_id) is session:
+        del sessions[session.chat_id]
+
+
+async def stop_all():
+    """Остановить все сессии."""
+    for session in list(sessions.values()):
+        await session.stop()
+    sessions.clear()
+
+
+@router.callback_query(F.data == "logtail")
+@router.callback_query(F.data.startswith("logtail:"))
+async def callback_logtail(callback: CallbackQuery):
+    """Запустить live-просмотр логов или сменить уровень."""
+    level = callback.data.split(":", 1)[1] if ":" in callback.data else ""
+    if level not in LOG_LEVELS:
+        await callback.answer("Неизвестный уровень логов", show_alert=True)
+        return
+    await callback.answer()
+
+    chat_id = callback.message.chat.id
+    panel = panels.current(callback.from_user.id)
+    session = sessions.get(chat_id)
+    if (
+        session is not None
+        and session.running
+        and session.message_id == callback.message.message_id
+        and session.client is panel.client
+    ):
+        # Та же сессия - меняем уровень, опрос продолжается
+        session.set_level(level)
+        await render_tail(session)
+        return
+
+    if session is not None:
+        await session.stop()
+
+    session = LogTailSession(
+        panel.client,
+        callback.bot,
+        chat_id,
+        callback.message.message_id,
+        render_tail,
+        level=level,
+        interval=settings.log_tail_interval,
+        edit_interval=settings.log_tail_edit_interval,
+        duration=settings.log_tail_duration,
+        max_lines=settings.log_tail_max_lines,
+        panel_name=panel.name,
+        on_finish=forget_session,
+    )
+    sessions[chat_id] = session
+    session.start()
+
+
+@router.callback_query(F.data == "logtail_stop")
+async def callback_logtail_stop(callback: CallbackQuery):
+    """Остановить live-просмотр логов."""
+    await callback.answer("Остановлено")
+    session = sessions.pop(callback.message.chat.id, None)
+    if session is None:
+        await callback.message.edit_reply_markup(reply_markup=get_logtail_keyboard("", running=False))
+        return
+    await session.stop()
+    await render_tail(session)
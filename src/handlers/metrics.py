@@ -0,0 +1,88 @@
+"""Просмотр метрик бота (/metrics)."""
+
+import html
+
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message
+
+from src.config import settings
+from src.handlers.bulk import jobs
+from src.handlers.callbacks import panels
+from src.metrics import REGISTRY, MetricsServer
+from src.render import Output, send_output
+
+router = Router()
+
+
+def _cache_ratio() -> dict[tuple, float]:
+    """Доля ответов панели из кэша."""
+    ratios = {}
+    for panel in panels.panels:
+        cache = panel.client.cache
+        total = cache.hits + cache.misses
+        ratios[(panel.name,)] = cache.hits / total if total else 0.0
+    return ratios
+
+
+# Значения, которые уже считают кэш ответов и выполнение массовых операций
+REGISTRY.gauge(
+    "sui_cache_hits_total",
+    "Ответы панели из кэша",
+    ("panel",),
+    collect=lambda: {(panel.name,): panel.client.cache.hits for panel in panels.panels},
+    type="counter",
+)
+REGISTRY.gauge(
+    "sui_cache_misses_total",
+    "Промахи кэша ответов панели",
+    ("panel",),
+    collect=lambda: {(panel.name,): panel.client.cache.misses for panel in panels.panels},
+    type="counter",
+)
+REGISTRY.gauge("sui_cache_hit_ratio", "Доля ответов панели из кэша", ("panel",), collect=_cache_ratio)
+REGISTRY.gauge(
+    "sui_in_flight_requests",
+    "GET запросы к панели, которые сейчас выполняются",
+    ("panel",),
+    collect=lambda: {(panel.name,): panel.client.in_flight for panel in panels.panels},
+)
+REGISTRY.gauge(
+    "bot_bulk_items_pending",
+    "Клиенты, ожидающие обработки в активных массовых операциях",
+    collect=lambda: {(): sum(len(job.items) - job.done for job in jobs.active())},
+)
+
+# HTTP эндпоинт /metrics; запускается, только если задан METRICS_PORT
+server = MetricsServer(settings.metrics_host, settings.metrics_port)
+
+
+def is_admin(user_id: int) -> bool:
+    """Проверка, является ли пользователь администратором."""
+    return user_id in settings.admin_list
+
+
+@router.message(Command("metrics"))
+async def cmd_metrics(message: Message, command: CommandObject):
+    """Обработчик команды /metrics: метрики, опционально с началом имени."""
+    if not is_admin(message.from_user.id):
+        await message.answer("❌ У вас нет доступа к этому боту.")
+        return
+
+    prefix = (command.args or "").strip()
+    text = REGISTRY.render(prefix)
+    if not text:
+        await message.answer("📈 Метрик с таким началом имени нет.")
+        return
+
+    output = Output(
+        "📈 <b>Метрики</b>\n",
+        "metrics.txt",
+        max_messages=settings.output_max_messages,
+        wrap=("<pre>", "</pre>"),
+    )
+    for line in text.splitlines():
+        # Описания и типы метрик отдаёт HTTP эндпоинт, здесь только значения
+        if not line.startswith("#"):
+            output.add(html.escape(line) + "\n")
+    await send_output(message, output, edit=False)
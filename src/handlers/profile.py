@@ -0,0 +1,104 @@
+"""Просмотр и выгрузка профилей обработчиков (/profile)."""
+
+import html
+import re
+
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import BufferedInputFile, Message
+
+from src.config import settings
+from src.profiling import HandlerProfiler
+from src.render import Output, send_output
+
+router = Router()
+
+# Профили обработчиков; middleware подключается, только если PROFILE_SAMPLE_RATE > 0
+profiler = HandlerProfiler(settings.profile_sample_rate)
+
+PROFILE_HELP = (
+    "<code>/profile</code> - замеры по обработчикам\n"
+    "<code>/profile ключ</code> - самые затратные функции и файл pstats\n"
+    "<code>/profile all</code> - все замеры одним файлом\n"
+    "<code>/profile reset</code> - сбросить замеры\n\n"
+    "Файл открывается <code>python -m pstats</code> или snakeviz, "
+    "flame graph строит flameprof."
+)
+
+
+def is_admin(user_id: int) -> bool:
+    """Проверка, является ли пользователь администратором."""
+    return user_id in settings.admin_list
+
+
+def dump_filename(key: str) -> str:
+    """Имя файла профиля для ключа."""
+    return "profile-" + (re.sub(r"[^\w-]+", "_", key).strip("_") or "all") + ".pstats"
+
+
+@router.message(Command("profile"))
+async def cmd_profile(message: Message, command: CommandObject):
+    """Обработчик команды /profile."""
+    if not is_admin(message.from_user.id):
+        await message.answer("❌ У вас нет доступа к этому боту.")
+        return
+
+    if profiler.rate <= 0:
+        await message.answer(
+            "⏱ Профилирование выключено. Задайте долю профилируемых событий "
+            "<code>PROFILE_SAMPLE_RATE</code> (например 0.1) и перезапустите бота.",
+            parse_mode="HTML",
+        )
+        return
+
+    arg = (command.args or "").strip()
+    if arg == "reset":
+        profiler.reset()
+        await message.answer("⏱ Замеры сброшены.")
+        return
+
+    if not arg:
+        if not profiler.entries:
+            await message.answer(
+                f"⏱ Замеров пока нет (профилируется {profiler.rate:.0%} событий).\n\n{PROFILE_HELP}",
+                parse_mode="HTML",
+            )
+            return
+        output = Output(
+            f"⏱ <b>Профили обработчиков</b> ({profiler.rate:.0%} событий)\n"
+            "<i>ключ: замеров, среднее время</i>\n\n",
+            "profile.txt",
+            max_messages=settings.output_max_messages,
+        )
+        entries = sorted(profiler.entries.items(), key=lambda item: item[1].wall, reverse=True)
+        for key, entry in entries:
+            output.add(
+                f"<code>{html.escape(key)}</code>: {entry.count}, "
+                f"{entry.wall / entry.count * 1000:.1f} мс\n"
+            )
+        output.add(f"\n{PROFILE_HELP}")
+        await send_output(message, output, edit=False)
+        return
+
+    key = None if arg == "all" else arg
+    stats = profiler.merged(key)
+    if stats is None:
+        await message.answer(f"⏱ Замеров для <code>{html.escape(arg)}</code> нет.", parse_mode="HTML")
+        return
+
+    # Файл до таблицы: таблица сокращает пути к модулям
+    dump = profiler.dump(stats)
+    output = Output(
+        f"⏱ <b>Профиль {html.escape(arg)}</b>\n",
+        "profile-top.txt",
+        max_messages=settings.output_max_messages,
+        wrap=("<pre>", "</pre>"),
+    )
+    for line in profiler.top(stats).splitlines():
+        if line.strip():
+            output.add(html.escape(line) + "\n")
+    await send_output(message, output, edit=False)
+    await message.answer_document(
+        BufferedInputFile(dump, filename=dump_filename(arg)),
+        caption="Файл pstats",
+    )
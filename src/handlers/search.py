@@ -0,0 +1,143 @@
+"""Поиск клиентов: команда /find и inline режим."""
+
+import logging
+
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import (
+    InlineQuery,
+    InlineQueryResultArticle,
+    InputTextMessageContent,
+    Message,
+)
+
+from src.config import settings
+from src.handlers.callbacks import format_bytes, panels
+from src.panels import Panel
+from src.keyboards import get_search_results_keyboard
+from src.models import Client
+from src.search_index import parse_query
+from src.sui_api import SUiAPIError
+
+logger = logging.getLogger(__name__)
+router = Router()
+
+# Сколько результатов показывать
+FIND_LIMIT = 20
+INLINE_LIMIT = 50
+
+
+def is_admin(user_id: int) -> bool:
+    """Проверка, является ли пользователь администратором."""
+    return user_id in settings.admin_list
+
+
+async def search_clients(panel: Panel, query: str, limit: int) -> tuple[list[Client], frozenset[str]]:
+    """
+    Найти клиентов по строке поиска.
+
+    Индекс перестраивается инкрементально, только если данные кэша клиентов
+    изменились с прошлого поиска.
+
+    Args:
+        panel: Панель, в которой ищем
+        query: Строка поиска
+        limit: Максимум результатов
+
+    Returns:
+        Найденные клиенты и имена онлайн пользователей
+    """
+    clients = await panel.client_store.all()
+    if panel.search_index.version != panel.client_store.version:
+        panel.search_index.update(clients, panel.client_store.version)
+
+    online = (await panel.online_poller.ensure_loaded()).users
+    panel.search_index.set_online(online)
+
+    prefix, group, status = parse_query(query)
+    return panel.search_index.search(prefix, group=group, status=status, limit=limit), online
+
+
+@router.message(Command("find"))
+async def cmd_find(message: Message, command: CommandObject):
+    """Обработчик команды /find."""
+    if not is_admin(message.from_user.id):
+        await message.answer("❌ У вас нет доступа к этому боту.")
+        return
+
+    if not command.args:
+        await message.answer(
+            "🔎 <b>Поиск клиентов</b>\n\n"
+            "<code>/find имя</code> - по началу имени\n"
+            "<code>/find group:vip</code> - по группе\n"
+            "<code>/find status:online</code> - по статусу "
+            "(online, offline, enabled, disabled)\n\n"
+            "Условия можно сочетать: <code>/find ivan group:vip status:online</code>",
+            parse_mode="HTML",
+        )
+        return
+
+    try:
+        panel = panels.current(message.from_user.id)
+        results, online = await search_clients(panel, command.args, FIND_LIMIT)
+    except SUiAPIError as e:
+        logger.error(f"Ошибка при поиске клиентов: {e}")
+        await message.answer(f"❌ Ошибка при поиске клиентов:\n{str(e)}")
+        return
+
+    if not results:
+        await message.answer("🔎 Клиенты не найдены.")
+        return
+
+    text = f"🔎 <b>Найдено клиентов:</b> {len(results)}"
+    if len(results) >= FIND_LIMIT:
+        text += f" (показаны первые {FIND_LIMIT}, уточните запрос)"
+
+    await message.answer(
+        text,
+        parse_mode="HTML",
+        reply_markup=get_search_results_keyboard(results, online),
+    )
+
+
+@router.inline_query()
+async def inline_find(inline_query: InlineQuery):
+    """Поиск клиентов в inline режиме."""
+    if not is_admin(inline_query.from_user.id):
+        await inline_query.answer([], cache_time=60, is_personal=True)
+        return
+
+    try:
+        panel = panels.current(inline_query.from_user.id)
+        results, online = await search_clients(panel, inline_query.query, INLINE_LIMIT)
+    except SUiAPIError as e:
+        logger.error(f"Ошибка inline поиска: {e}")
+        await inline_query.answer([], cache_time=1, is_personal=True)
+        return
+
+    articles = []
+    for client in results:
+        name = client.name or "Без имени"
+        if name in online:
+            status = "🟢 Онлайн"
+        elif client.enable:
+            status = "🟡 Офлайн"
+        else:
+            status = "🔴 Отключен"
+
+        description = f"{status} • {format_bytes(client.used)}"
+        if client.group:
+            description += f" • {client.group}"
+
+        articles.append(
+            InlineQueryResultArticle(
+                id=str(client.id),
+                title=name,
+                description=description,
+                input_message_content=InputTextMessageContent(
+                    message_text=f"👤 {name}\n{description}",
+                ),
+            )
+        )
+
+    await inline_query.answer(articles, cache_time=5, is_personal=True)
@@ -0,0 +1,420 @@
+"""Массовые операции с клиентами: задачи с сохранением прогресса."""
+
+import asyncio
+import json
+import logging
+import os
+import secrets
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from src.models import Client
+from src.panels import Panel, PanelRegistry
+from src.sui_api import SUiAPIError, SUiConnectionError
+
+logger = logging.getLogger(__name__)
+
+# Действия: ключ -> подпись
+BULK_ACTIONS = {
+    "enable": "✅ Включить",
+    "disable": "⛔ Отключить",
+    "extend": "📅 Продлить",
+    "reset": "♻️ Сбросить трафик",
+    "delete_expired": "🗑 Удалить истёкших",
+}
+
+# Изменения клиента для действий через save_config(..., "edit", ...)
+EDITS: dict[str, Callable[[dict, Any], dict]] = {
+    "enable": lambda client, _: {**client, "enable": True},
+    "disable": lambda client, _: {**client, "enable": False},
+    "extend": lambda client, expiry: {**client, "expiry": expiry},
+    "reset": lambda client, _: {**client, "up": 0, "down": 0},
+}
+
+# Состояния задачи
+PENDING = "pending"
+RUNNING = "running"
+PAUSED = "paused"
+STOPPED = "stopped"
+DONE = "done"
+
+DAY_MS = 86400 * 1000
+
+
+@dataclass
+class BulkJob:
+    """
+    Массовая операция над клиентами одной панели.
+
+    Список клиентов и целевые значения фиксируются при создании, поэтому
+    повторное выполнение пачки после сбоя даёт тот же результат (продление
+    ставит заранее посчитанную дату, а не прибавляет дни ещё раз).
+    """
+
+    id: str
+    panel: str
+    action: str
+    title: str
+    # Элементы [id клиента, имя, значение для действия]
+    items: list[list]
+    chat_id: int
+    message_id: int | None = None
+    # Сколько элементов обработано (граница последней завершённой пачки)
+    done: int = 0
+    # Ошибки [имя клиента, текст ошибки]
+    failed: list[list] = field(default_factory=list)
+    state: str = PENDING
+    created_at: float = field(default_factory=time.time)
+
+
+def select_items(
+    clients: list[Client],
+    action: str,
+    group: str | None = None,
+    days: int = 0,
+    now_ms: int | None = None,
+) -> list[list]:
+    """
+    Выбрать клиентов для действия.
+
+    Клиенты, которых действие не изменит, пропускаются.
+
+    Args:
+        clients: Клиенты панели
+        action: Ключ из BULK_ACTIONS
+        group: Группа (None - все клиенты)
+        days: На сколько дней продлить (для extend)
+        now_ms: Текущее время в миллисекундах
+
+    Returns:
+        Элементы задачи [id, имя, значение]
+    """
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    items = []
+    for client in clients:
+        if group is not None and client.group != group:
+            continue
+        client_id = client.id
+        name = client.name or str(client_id)
+        expiry = client.expiry
+        if action == "enable" and not client.enable:
+            items.append([client_id, name, None])
+        elif action == "disable" and client.enable:
+            items.append([client_id, name, None])
+        elif action == "reset" and (client.up or client.down):
+            items.append([client_id, name, None])
+        elif action == "extend" and expiry > 0:
+            # Истёкшим клиентам срок считается от текущего момента
+            items.append([client_id, name, max(expiry, now_ms) + days * DAY_MS])
+        elif action == "delete_expired" and 0 < expiry < now_ms:
+            items.append([client_id, name, None])
+    return items
+
+
+class JobStore:
+    """Файл JSON с незавершёнными задачами."""
+
+    def __init__(self, path: str):
+        """
+        Инициализация хранилища.
+
+        Args:
+            path: Путь к файлу
+        """
+        self.path = path
+
+    def load(self) -> list[BulkJob]:
+        """Прочитать задачи из файла."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError) as e:
+            logger.error(f"Не удалось прочитать файл задач {self.path}: {e}")
+            return []
+        if not isinstance(data, dict) or not isinstance(data.get("jobs", []), list):
+            logger.error(f"Неверный формат файла задач {self.path}")
+            return []
+
+        jobs = []
+        for job in data.get("jobs", []):
+            # Повреждённые записи и записи старого формата пропускаются
+            try:
+                jobs.append(BulkJob(**job))
+            except (TypeError, KeyError, ValueError) as e:
+                logger.error(f"Пропущена задача из файла {self.path}: {e}")
+        return jobs
+
+    def save(self, jobs: list[BulkJob]):
+        """
+        Записать задачи в файл.
+
+        Запись идёт во временный файл с заменой, чтобы падение процесса
+        не оставило файл наполовину записанным.
+        """
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"jobs": [asdict(job) for job in jobs]}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+class JobRunner:
+    """
+    Выполнение массовых операций.
+
+    Элементы задачи обрабатываются пачками по `batch_size`, внутри пачки
+    к панели идёт не больше `concurrency` запросов одновременно. После каждой
+    пачки прогресс сохраняется в файл, а сообщение с прогрессом обновляется
+    не чаще раза в `progress_interval` секунд. Задачи, прерванные остановкой
+    или падением бота, продолжаются с последней сохранённой пачки при
+    следующем запуске. Если панель недоступна, задача ставится на паузу.
+    """
+
+    def __init__(
+        self,
+        registry: PanelRegistry,
+        store: JobStore,
+        report: Callable[[Any, BulkJob], Awaitable[None]],
+        batch_size: int = 50,
+        concurrency: int = 4,
+        progress_interval: float = 3.0,
+    ):
+        """
+        Инициализация.
+
+        Args:
+            registry: Реестр панелей
+            store: Хранилище задач
+            report: Корутина (bot, задача), обновляющая сообщение с прогрессом
+            batch_size: Элементов в пачке
+            concurrency: Одновременных запросов к панели
+            progress_interval: Минимальный интервал обновления прогресса (секунды)
+        """
+        self.registry = registry
+        self.store = store
+        self.report = report
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.progress_interval = progress_interval
+        self.bot = None
+        self.jobs: dict[str, BulkJob] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    async def create(
+        self,
+        panel: Panel,
+        action: str,
+        chat_id: int,
+        group: str | None = None,
+        days: int = 0,
+    ) -> BulkJob:
+        """
+        Создать задачу, ожидающую подтверждения.
+
+        Args:
+            panel: Панель
+            action: Ключ из BULK_ACTIONS
+            chat_id: Чат для сообщений о прогрессе
+            group: Группа (None - все клиенты)
+            days: На сколько дней продлить (для extend)
+
+        Returns:
+            Задача
+        """
+        # Неподтверждённые задачи старше часа уже не подтвердят
+        for job_id, job in list(self.jobs.items()):
+            if job.state == PENDING and time.time() - job.created_at > 3600:
+                del self.jobs[job_id]
+
+        clients = await panel.client_store.all()
+        title = BULK_ACTIONS[action]
+        if action == "extend":
+            title += f" на {days} дн."
+        title += f", группа {group}" if group is not None else ", все клиенты"
+        job = BulkJob(
+            id=secrets.token_hex(4),
+            panel=panel.name,
+            action=action,
+            title=title,
+            items=select_items(clients, action, group, days),
+            chat_id=chat_id,
+        )
+        self.jobs[job.id] = job
+        return job
+
+    def discard(self, job_id: str) -> BulkJob | None:
+        """Отменить неподтверждённую задачу."""
+        job = self.jobs.get(job_id)
+        if job is None or job.state != PENDING:
+            return None
+        return self.jobs.pop(job_id)
+
+    async def run(self, job_id: str, message_id: int) -> BulkJob | None:
+        """
+        Запустить или продолжить задачу.
+
+        Args:
+            job_id: ID задачи
+            message_id: Сообщение, в котором показывается прогресс
+
+        Returns:
+            Задача или None, если её нет или она уже выполняется
+        """
+        job = self.jobs.get(job_id)
+        if job is None or job.state not in (PENDING, PAUSED):
+            return None
+        job.state = RUNNING
+        job.message_id = message_id
+        await self._save()
+        self._start_task(job)
+        return job
+
+    async def stop_job(self, job_id: str) -> BulkJob | None:
+        """
+        Остановить задачу после текущей пачки.
+
+        Returns:
+            Задача или None, если её нет или она уже завершена
+        """
+        job = self.jobs.get(job_id)
+        if job is None or job.state not in (RUNNING, PAUSED):
+            return None
+        paused = job.state == PAUSED
+        job.state = STOPPED
+        if paused:
+            # Задача на паузе не выполняется, завершаем её сразу
+            await self._finish(job)
+        return job
+
+    def active(self) -> list[BulkJob]:
+        """Выполняющиеся и приостановленные задачи."""
+        return [job for job in self.jobs.values() if job.state in (RUNNING, PAUSED)]
+
+    async def start(self, bot):
+        """
+        Загрузить сохранённые задачи и продолжить прерванные.
+
+        Args:
+            bot: Бот для сообщений о прогрессе
+        """
+        self.bot = bot
+        for job in await asyncio.to_thread(self.store.load):
+            if self.registry.get(job.panel) is None:
+                logger.warning(f"Задача {job.id}: панель {job.panel} не настроена, задача пропущена")
+                continue
+            self.jobs[job.id] = job
+            if job.state == RUNNING:
+                logger.info(f"Продолжаем задачу {job.id} ({job.title}) с {job.done}/{len(job.items)}")
+                self._start_task(job)
+
+    async def stop(self):
+        """Прервать выполнение; задачи продолжатся при следующем запуске."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _start_task(self, job: BulkJob):
+        """Запустить фоновую задачу выполнения."""
+        task = asyncio.create_task(self._execute(job))
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+
+    async def _save(self):
+        """Сохранить незавершённые задачи."""
+        jobs = [job for job in self.jobs.values() if job.state in (RUNNING, PAUSED)]
+        try:
+            await asyncio.to_thread(self.store.save, jobs)
+        except OSError as e:
+            logger.error(f"Не удалось сохранить файл задач {self.store.path}: {e}")
+
+    async def _report(self, job: BulkJob):
+        """Обновить сообщение с прогрессом."""
+        if self.bot is None or job.message_id is None:
+            return
+        try:
+            await self.report(self.bot, job)
+        except Exception as e:
+            # Telegram может отклонить правку (лимиты, сообщение удалено) - задача важнее
+            logger.warning(f"Не удалось обновить прогресс задачи {job.id}: {e}")
+
+    async def _apply(self, panel: Panel, action: str, client_id: int, value: Any):
+        """Применить действие к одному клиенту."""
+        if action == "delete_expired":
+            await panel.client.save_config("clients", "del", client_id)
+            return
+
+        # В моделях нет части полей (config, links), а панель сохраняет
+        # клиента целиком, поэтому перед правкой загружаем его как есть
+        response = await panel.client.get_clients(str(client_id), raw=True)
+        obj = response.get("obj") or {}
+        clients = obj.get("clients") if isinstance(obj, dict) else obj
+        client = next(
+            (c for c in clients or [] if isinstance(c, dict) and c.get("id") == client_id),
+            None,
+        )
+        if client is None:
+            raise SUiAPIError("Клиент не найден")
+        await panel.client.save_config("clients", "edit", EDITS[action](client, value))
+
+    async def _execute(self, job: BulkJob):
+        """Выполнить задачу с последней сохранённой пачки."""
+        panel = self.registry.get(job.panel)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def apply(item: list) -> Any:
+            async with semaphore:
+                await self._apply(panel, job.action, item[0], item[2])
+
+        await self._report(job)
+        reported_at = time.monotonic()
+        while job.state == RUNNING and job.done < len(job.items):
+            batch = job.items[job.done:job.done + self.batch_size]
+            results = await asyncio.gather(*(apply(item) for item in batch), return_exceptions=True)
+
+            lost = next((r for r in results if isinstance(r, SUiConnectionError)), None)
+            if lost is not None:
+                # Пачка будет выполнена заново после продолжения
+                logger.warning(f"Задача {job.id} приостановлена: {lost}")
+                job.state = PAUSED
+                break
+
+            for item, result in zip(batch, results):
+                if isinstance(result, asyncio.CancelledError):
+                    raise result
+                if isinstance(result, Exception):
+                    job.failed.append([item[1], str(result)])
+            job.done += len(batch)
+            await self._save()
+
+            if time.monotonic() - reported_at >= self.progress_interval:
+                await self._report(job)
+                reported_at = time.monotonic()
+
+        if job.state == RUNNING:
+            job.state = DONE
+        if job.state == PAUSED:
+            await self._save()
+            await self._report(job)
+        else:
+            await self._finish(job)
+
+    async def _finish(self, job: BulkJob):
+        """Завершить задачу: убрать из файла и обновить кэши панели."""
+        await self._save()
+        self.jobs.pop(job.id, None)
+        logger.info(
+            f"Задача {job.id} ({job.title}) завершена: {job.state}, "
+            f"{job.done}/{len(job.items)}, ошибок {len(job.failed)}"
+        )
+        panel = self.registry.get(job.panel)
+        if panel is not None and job.done:
+            panel.client_store.invalidate()
+            try:
+                await panel.snapshot.refresh()
+            except SUiAPIError as e:
+                logger.warning(f"Не удалось обновить снимок панели после задачи {job.id}: {e}")
+        await self._report(job)
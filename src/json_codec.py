@@ -0,0 +1,268 @@
+"""Разбор JSON ответов панели с быстрым бэкендом, если он установлен."""
+
+import dataclasses
+import functools
+import json
+import types
+import typing
+from collections.abc import Callable
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - зависит от окружения
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - зависит от окружения
+    msgspec = None
+
+# Бэкенды в порядке выбора для "auto"
+BACKENDS = ("orjson", "msgspec", "json")
+
+
+class JSONDecodeError(ValueError):
+    """Ответ не является корректным JSON или не подходит под тип."""
+    pass
+
+
+def available_backends() -> list[str]:
+    """Установленные бэкенды в порядке предпочтения."""
+    installed = {"orjson": orjson is not None, "msgspec": msgspec is not None, "json": True}
+    return [name for name in BACKENDS if installed[name]]
+
+
+# Типы JSON значений, допустимые для скалярных аннотаций (как в msgspec: bool - не int)
+_SCALARS: dict[Any, tuple[type, ...]] = {
+    int: (int,),
+    float: (float, int),
+    str: (str,),
+    bool: (bool,),
+}
+
+
+def _scalar_types(tp: Any) -> tuple[type, ...] | None:
+    """JSON типы для скалярной аннотации (в том числе `int | None`) или None."""
+    if tp in _SCALARS:
+        return _SCALARS[tp]
+    if typing.get_origin(tp) in (typing.Union, types.UnionType):
+        args = typing.get_args(tp)
+        options = [arg for arg in args if arg is not type(None)]
+        if len(options) == 1 and options[0] in _SCALARS and len(args) == 2:
+            return (*_SCALARS[options[0]], type(None))
+    return None
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _type_name(tp: Any) -> str:
+    return getattr(tp, "__name__", str(tp))
+
+
+def _check(value: Any, kind: type, tp: Any):
+    """Проверить JSON тип значения."""
+    if type(value) is not kind:
+        raise JSONDecodeError(f"Ожидался {_type_name(tp)}, получен {type(value).__name__}")
+
+
+@functools.lru_cache(maxsize=None)
+def _converter(tp: Any) -> Callable[[Any], Any]:
+    """Функция проверки и приведения к типу; строится один раз на тип."""
+    if tp in _SCALARS:
+        allowed = _SCALARS[tp]
+
+        def check_scalar(value: Any) -> Any:
+            if type(value) not in allowed:
+                raise JSONDecodeError(f"Ожидался {tp.__name__}, получен {type(value).__name__}")
+            return value
+
+        return check_scalar
+
+    if dataclasses.is_dataclass(tp):
+        hints = typing.get_type_hints(tp)
+        # Скалярные поля проверяются на месте, без вызова функции на значение
+        fields = []
+        for field in dataclasses.fields(tp):
+            hint = hints[field.name]
+            conv = _converter(hint)
+            fields.append((field.name, _scalar_types(hint), None if conv is _identity else conv))
+
+        def convert_dataclass(value: Any) -> Any:
+            _check(value, dict, tp)
+            kwargs = {}
+            for name, allowed, conv in fields:
+                if name not in value:
+                    continue
+                item = value[name]
+                if allowed is not None:
+                    if type(item) not in allowed:
+                        raise JSONDecodeError(
+                            f"{tp.__name__}.{name}: ожидался {allowed[0].__name__}, получен {type(item).__name__}"
+                        )
+                elif conv is not None:
+                    try:
+                        item = conv(item)
+                    except JSONDecodeError as e:
+                        raise JSONDecodeError(f"{tp.__name__}.{name}: {e}") from None
+                kwargs[name] = item
+            try:
+                return tp(**kwargs)
+            except TypeError as e:
+                raise JSONDecodeError(f"{tp.__name__}: {e}") from e
+
+        return convert_dataclass
+
+    origin = typing.get_origin(tp) or tp
+    args = typing.get_args(tp)
+    if origin in (list, tuple):
+        # list[T] и tuple[T, ...]; JSON массив приходит списком
+        conv = _converter(args[0]) if args else _identity
+        result = tuple if origin is tuple else None
+
+        def convert_list(value: Any) -> Any:
+            _check(value, list, tp)
+            if conv is not _identity:
+                value = [conv(v) for v in value]
+            return result(value) if result is not None else value
+
+        return convert_list
+    if origin is dict:
+        conv = _converter(args[1]) if args else _identity
+
+        def convert_dict(value: Any) -> Any:
+            _check(value, dict, tp)
+            return value if conv is _identity else {k: conv(v) for k, v in value.items()}
+
+        return convert_dict
+    if origin in (typing.Union, types.UnionType):
+        nullable = type(None) in args
+        options = [arg for arg in args if arg is not type(None)]
+        if len(options) == 1:
+            conv = _converter(options[0])
+            return lambda value: None if value is None and nullable else conv(value)
+
+        # Несколько вариантов различаются по JSON типу значения, как в msgspec
+        by_kind: dict[type, Callable[[Any], Any]] = {}
+        for option in options:
+            option_origin = typing.get_origin(option) or option
+            if dataclasses.is_dataclass(option) or option_origin is dict:
+                by_kind.setdefault(dict, _converter(option))
+            elif option_origin in (list, tuple):
+                by_kind.setdefault(list, _converter(option))
+            elif option in _SCALARS:
+                for kind in _SCALARS[option]:
+                    by_kind.setdefault(kind, _identity)
+            else:
+                return _identity
+
+        def convert_union(value: Any) -> Any:
+            if value is None and nullable:
+                return None
+            conv = by_kind.get(type(value))
+            if conv is None:
+                raise JSONDecodeError(f"Ожидался {tp}, получен {type(value).__name__}")
+            return conv(value)
+
+        return convert_union
+    return _identity
+
+
+def convert(value: Any, tp: Any) -> Any:
+    """
+    Привести разобранный JSON к типу без msgspec.
+
+    Поддерживаются dataclass (лишние ключи отбрасываются, отсутствующие
+    берутся из значений по умолчанию), list[T], tuple[T, ...], dict[str, T],
+    объединения и int/float/str/bool, которые проверяются по типу JSON
+    значения так же строго, как в msgspec. Остальные типы (Any) не
+    проверяются.
+
+    Raises:
+        JSONDecodeError: Структура не совпадает с типом
+    """
+    return _converter(tp)(value)
+
+
+class JSONDecoder:
+    """
+    Разбор тела ответа из bytes.
+
+    Тело не декодируется в str перед разбором: orjson и msgspec читают
+    bytes напрямую, stdlib json сам определяет кодировку. Для больших
+    списков есть decode_typed() - разбор сразу в dataclass или msgspec.Struct:
+    msgspec пропускает ненужные поля, не создавая для них объектов, и
+    проверяет типы; без msgspec ответ разбирается целиком и приводится
+    функцией convert().
+    """
+
+    def __init__(self, backend: str = "auto"):
+        """
+        Инициализация.
+
+        Args:
+            backend: orjson, msgspec, json или auto (самый быстрый из установленных;
+                decode_typed() при этом использует msgspec, если он установлен)
+
+        Raises:
+            ValueError: Бэкенд неизвестен или не установлен
+        """
+        # Разбор в типы через msgspec: при auto - если установлен, иначе только
+        # для явно выбранного бэкенда msgspec, чтобы настройка действовала и здесь
+        self._msgspec_typed = msgspec is not None and backend in ("auto", "msgspec")
+        if backend == "auto":
+            backend = available_backends()[0]
+        elif backend not in BACKENDS:
+            raise ValueError(f"Неизвестный JSON бэкенд {backend}, доступны: auto, {', '.join(BACKENDS)}")
+        elif backend not in available_backends():
+            raise ValueError(f"JSON бэкенд {backend} не установлен: pip install {backend}")
+        self.backend = backend
+        self._typed_decoders: dict[Any, Any] = {}
+
+    @property
+    def native_typed(self) -> bool:
+        """Разбирает ли decode_typed() сразу в типы (msgspec), а не через convert()."""
+        return self._msgspec_typed
+
+    def decode(self, data: bytes) -> Any:
+        """
+        Разобрать JSON.
+
+        Raises:
+            JSONDecodeError: Некорректный JSON
+        """
+        try:
+            if self.backend == "orjson":
+                return orjson.loads(data)
+            if self.backend == "msgspec":
+                return msgspec.json.decode(data)
+            return json.loads(data)
+        except (ValueError, UnicodeDecodeError) as e:
+            raise JSONDecodeError(str(e)) from e
+        except Exception as e:
+            if msgspec is not None and isinstance(e, msgspec.DecodeError):
+                raise JSONDecodeError(str(e)) from e
+            raise
+
+    def decode_typed(self, data: bytes, tp: Any) -> Any:
+        """
+        Разобрать JSON сразу в тип.
+
+        Args:
+            data: Тело ответа
+            tp: dataclass, msgspec.Struct или list/dict из них
+
+        Raises:
+            JSONDecodeError: Некорректный JSON или структура не совпадает с типом
+        """
+        if self._msgspec_typed:
+            decoder = self._typed_decoders.get(tp)
+            if decoder is None:
+                decoder = self._typed_decoders[tp] = msgspec.json.Decoder(tp)
+            try:
+                return decoder.decode(data)
+            except (msgspec.DecodeError, msgspec.ValidationError) as e:
+                raise JSONDecodeError(str(e)) from e
+        return convert(self.decode(data), tp)
@@ -2,8 +2,10 @@
 
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
+from src.models import Client
 
-def get_main_menu() -> InlineKeyboardMarkup:
+
+def get_main_menu(multi_panel: bool = False) -> InlineKeyboardMarkup:
     """Главное меню бота."""
     keyboard = [
         [
@@ -19,6 +21,7 @@ def get_main_menu() -> InlineKeyboardMarkup:
             InlineKeyboardButton(text="⚙️ Настройки", callback_data="settings"),
         ],
         [
+            InlineKeyboardButton(text="📈 Трафик", callback_data="traffic"),
             InlineKeyboardButton(text="📝 Логи", callback_data="logs"),
         ],
         [
@@ -26,6 +29,44 @@ def get_main_menu() -> InlineKeyboardMarkup:
             InlineKeyboardButton(text="🔄 Перезапуск App", callback_data="restart_app"),
         ],
     ]
+    if multi_panel:
+        keyboard.insert(0, [
+            InlineKeyboardButton(text="🖧 Панели", callback_data="panels"),
+            InlineKeyboardButton(text="🌐 Все узлы", callback_data="fleet_overview"),
+        ])
+    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+
+def get_panels_keyboard(names: list[str], current: str) -> InlineKeyboardMarkup:
+    """Клавиатура выбора панели (в callback_data передаётся номер панели)."""
+    keyboard = []
+    row = []
+    for index, name in enumerate(names):
+        row.append(
+            InlineKeyboardButton(
+                text=f"✅ {name}" if name == current else name,
+                callback_data=f"panel:{index}",
+            )
+        )
+        if len(row) == 2:
+            keyboard.append(row)
+            row = []
+    if row:
+        keyboard.append(row)
+    keyboard.append([InlineKeyboardButton(text="◀️ Назад", callback_data="back_to_menu")])
+    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+
+def get_fleet_keyboard(view: str) -> InlineKeyboardMarkup:
+    """Клавиатура сводки по узлам (view - fleet_overview или fleet_status)."""
+    if view == "fleet_status":
+        keyboard = [
+            [InlineKeyboardButton(text="🔄 Обновить", callback_data="fleet_status:refresh")],
+            [InlineKeyboardButton(text="🌐 Онлайн и трафик", callback_data="fleet_overview")],
+        ]
+    else:
+        keyboard = [[InlineKeyboardButton(text="📊 Нагрузка узлов", callback_data="fleet_status")]]
+    keyboard.append([InlineKeyboardButton(text="◀️ Назад", callback_data="back_to_menu")])
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
@@ -46,6 +87,25 @@ def get_confirm_restart(action: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
+def get_bulk_confirm(job_id: str) -> InlineKeyboardMarkup:
+    """Подтверждение массовой операции."""
+    keyboard = [
+        [
+            InlineKeyboardButton(text="✅ Выполнить", callback_data=f"bulk_run:{job_id}"),
+            InlineKeyboardButton(text="❌ Отмена", callback_data=f"bulk_cancel:{job_id}"),
+        ]
+    ]
+    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+
+def get_bulk_progress(job_id: str, paused: bool = False) -> InlineKeyboardMarkup:
+    """Кнопки выполняющейся или приостановленной массовой операции."""
+    row = [InlineKeyboardButton(text="⏹ Остановить", callback_data=f"bulk_stop:{job_id}")]
+    if paused:
+        row.insert(0, InlineKeyboardButton(text="▶️ Продолжить", callback_data=f"bulk_run:{job_id}"))
+    return InlineKeyboardMarkup(inline_keyboard=[row])
+
+
 def get_logs_menu() -> InlineKeyboardMarkup:
     """Меню выбора логов."""
     keyboard = [
@@ -55,47 +115,145 @@ def get_logs_menu() -> InlineKeyboardMarkup:
         ],
         [
             InlineKeyboardButton(text="📝 Последние 200", callback_data="logs_200"),
+            InlineKeyboardButton(text="📡 Live", callback_data="logtail"),
         ],
         [InlineKeyboardButton(text="◀️ Назад", callback_data="back_to_menu")],
     ]
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
-def get_client_actions(client_id: int, client_name: str) -> InlineKeyboardMarkup:
+# Уровни логов для live-просмотра: значение параметра level -> подпись
+LOG_LEVELS = {
+    "": "Все",
+    "info": "Info",
+    "warning": "Warning",
+    "error": "Error",
+}
+
+
+def get_logtail_keyboard(level: str, running: bool = True) -> InlineKeyboardMarkup:
+    """Кнопки live-просмотра логов."""
+    if not running:
+        keyboard = [
+            [InlineKeyboardButton(text="▶️ Запустить снова", callback_data=f"logtail:{level}")],
+            [InlineKeyboardButton(text="◀️ Назад", callback_data="back_to_menu")],
+        ]
+        return InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+    levels = [
+        InlineKeyboardButton(
+            text=f"• {label}" if key == level else label,
+            callback_data=f"logtail:{key}",
+        )
+        for key, label in LOG_LEVELS.items()
+    ]
+    keyboard = [levels, [InlineKeyboardButton(text="⏹ Стоп", callback_data="logtail_stop")]]
+    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+
+def get_client_actions(
+    client_id: int,
+    client_name: str,
+    back: str = "clients",
+) -> InlineKeyboardMarkup:
     """Действия с клиентом."""
+    # Сохраняем позицию в списке, чтобы "Назад" вернул на ту же страницу
+    suffix = back.removeprefix("clients")
     keyboard = [
-        [InlineKeyboardButton(text="🔄 Обновить", callback_data=f"client_info:{client_id}")],
-        [InlineKeyboardButton(text="◀️ Назад", callback_data="clients")],
+        [InlineKeyboardButton(text="🔄 Обновить", callback_data=f"client_info:{client_id}{suffix}")],
+        [InlineKeyboardButton(text="◀️ Назад", callback_data=back)],
     ]
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
-def get_clients_keyboard(clients: list, online_users: list = None) -> InlineKeyboardMarkup:
-    """Клавиатура со списком клиентов с индикацией онлайн статуса."""
+def get_search_results_keyboard(clients: list[Client], online_users: frozenset = frozenset()) -> InlineKeyboardMarkup:
+    """Клавиатура с результатами поиска клиентов."""
+    keyboard = []
+    for client in clients:
+        name = client.name or "Unknown"
+        if name in online_users:
+            status = "🟢"
+        elif client.enable:
+            status = "🟡"
+        else:
+            status = "🔴"
+        keyboard.append([
+            InlineKeyboardButton(
+                text=f"{status} {name}",
+                callback_data=f"client_info:{client.id}",
+            )
+        ])
+    keyboard.append([InlineKeyboardButton(text="◀️ Меню", callback_data="back_to_menu")])
+    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+
+# Клиентов на одной странице списка
+CLIENTS_PAGE_SIZE = 20
+
+# Подписи кнопок сортировки
+CLIENT_SORT_LABELS = {
+    "name": "🔤 Имя",
+    "online": "🟢 Онлайн",
+    "traffic": "📊 Трафик",
+    "expiry": "📅 Срок",
+}
+
+
+def get_clients_keyboard(
+    clients: list[Client],
+    online_users: list = None,
+    page: int = 0,
+    sort: str = "name",
+) -> InlineKeyboardMarkup:
+    """
+    Клавиатура со страницей списка клиентов с индикацией онлайн статуса.
+
+    Список клиентов должен быть уже отсортирован; страница вырезается срезом,
+    а номер страницы и сортировка передаются в callback_data.
+    """
     keyboard = []
-    online_set = set(online_users) if online_users else set()
+    online_set = online_users if isinstance(online_users, (set, frozenset)) else set(online_users or ())
+    
+    pages = max(1, -(-len(clients) // CLIENTS_PAGE_SIZE))
+    page = min(max(page, 0), pages - 1)
+    start = page * CLIENTS_PAGE_SIZE
+    
+    for client in clients[start:start + CLIENTS_PAGE_SIZE]:
+        name = client.name or "Unknown"
+        
+        # Определяем статус
+        if name in online_set:
+            status = "🟢"  # Онлайн и активен
+        elif client.enable:
+            status = "🟡"  # Активен но офлайн
+        else:
+            status = "🔴"  # Отключен
+        
+        keyboard.append([
+            InlineKeyboardButton(
+                text=f"{status} {name}",
+                callback_data=f"client_info:{client.id}:{sort}:{page}",
+            )
+        ])
     
-    for client in clients[:20]:  # Максимум 20 клиентов
-        if isinstance(client, dict):
-            client_id = client.get("id")
-            name = client.get("name", "Unknown")
-            enable = client.get("enable", False)
-            
-            # Определяем статус
-            if name in online_set:
-                status = "🟢"  # Онлайн и активен
-            elif enable:
-                status = "🟡"  # Активен но офлайн
-            else:
-                status = "🔴"  # Отключен
-            
-            keyboard.append([
-                InlineKeyboardButton(
-                    text=f"{status} {name}",
-                    callback_data=f"client_info:{client_id}",
-                )
-            ])
+    # Навигация по страницам
+    if pages > 1:
+        nav = []
+        if page > 0:
+            nav.append(InlineKeyboardButton(text="◀️", callback_data=f"clients:{sort}:{page - 1}"))
+        nav.append(InlineKeyboardButton(text=f"{page + 1}/{pages}", callback_data="noop"))
+        if page < pages - 1:
+            nav.append(InlineKeyboardButton(text="▶️", callback_data=f"clients:{sort}:{page + 1}"))
+        keyboard.append(nav)
+    
+    # Выбор сортировки
+    keyboard.append([
+        InlineKeyboardButton(
+            text=f"• {label}" if key == sort else label,
+            callback_data=f"clients:{key}:0",
+        )
+        for key, label in CLIENT_SORT_LABELS.items()
+    ])
     
     keyboard.append([InlineKeyboardButton(text="◀️ Назад", callback_data="back_to_menu")])
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
-
@@ -0,0 +1,240 @@
+"""Поиск по логам панели и оповещения по шаблонам."""
+
+import asyncio
+import logging
+import re
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from src.logtail import LogDeduplicator
+from src.panels import Panel, PanelRegistry
+
+logger = logging.getLogger(__name__)
+
+# Сколько строк с совпадениями показывать в оповещении
+SAMPLE_LINES = 3
+
+
+class LogMatcher:
+    """
+    Набор правил, собранный в одно регулярное выражение.
+
+    Каждое правило становится именованной группой альтернативы
+    `(?P<_r0>...)|(?P<_r1>...)`, поэтому строка просматривается одним
+    проходом движка независимо от числа правил, а сработавшее правило
+    определяется по `lastgroup`. Если два правила совпадают с одной и той же
+    позиции строки, засчитывается первое по порядку.
+    """
+
+    def __init__(self, rules: dict[str, str], flags: int = re.IGNORECASE):
+        """
+        Инициализация.
+
+        Args:
+            rules: Имя правила -> регулярное выражение
+            flags: Флаги регулярных выражений
+
+        Raises:
+            ValueError: Выражение правила некорректно или совпадает с пустой строкой
+        """
+        self.names = list(rules)
+        self._groups: dict[str, str] = {}
+        parts = []
+        for index, (name, pattern) in enumerate(rules.items()):
+            try:
+                compiled = re.compile(pattern, flags)
+            except re.error as e:
+                raise ValueError(f"Правило {name}: некорректное выражение: {e}") from e
+            if compiled.groups and re.search(r"\\[1-9]|\(\?P=", pattern):
+                # Номера групп сдвигаются при объединении правил
+                raise ValueError(f"Правило {name}: обратные ссылки не поддерживаются")
+            if compiled.search(""):
+                raise ValueError(f"Правило {name}: выражение совпадает с пустой строкой")
+            group = f"_r{index}"
+            self._groups[group] = name
+            parts.append(f"(?P<{group}>{pattern})")
+        try:
+            self._pattern = re.compile("|".join(parts), flags) if parts else None
+        except re.error as e:
+            raise ValueError(f"Правила нельзя объединить: {e}") from e
+
+    def __bool__(self) -> bool:
+        """Есть ли правила."""
+        return self._pattern is not None
+
+    def match(self, line: str) -> set[str]:
+        """
+        Правила, совпавшие со строкой.
+
+        Args:
+            line: Строка лога
+
+        Returns:
+            Имена сработавших правил
+        """
+        found: set[str] = set()
+        if self._pattern is None:
+            return found
+        pos = 0
+        # Следующий поиск начинается со следующего символа, а не с конца
+        # совпадения, чтобы не пропустить правила, пересекающиеся с найденным
+        while len(found) < len(self._groups):
+            m = self._pattern.search(line, pos)
+            if m is None:
+                break
+            found.add(self._groups[m.lastgroup])
+            pos = m.start() + 1
+        return found
+
+    def scan(self, lines: list[str]) -> dict[str, list[str]]:
+        """
+        Сгруппировать строки по сработавшим правилам.
+
+        Args:
+            lines: Строки лога
+
+        Returns:
+            Имя правила -> совпавшие строки
+        """
+        hits: dict[str, list[str]] = {}
+        for line in lines:
+            for name in self.match(line):
+                hits.setdefault(name, []).append(line)
+        return hits
+
+
+@dataclass
+class LogAlert:
+    """Совпадения одного правила на одной панели."""
+
+    panel: str
+    rule: str
+    count: int = 0
+    samples: deque[str] = field(default_factory=lambda: deque(maxlen=SAMPLE_LINES))
+
+
+class LogAlertWatcher:
+    """
+    Фоновая проверка новых строк логов всех панелей по правилам.
+
+    Логи панелей запрашиваются параллельно раз в `interval` секунд, новые
+    строки выделяются так же, как в live-просмотре. При первом опросе
+    строки только запоминаются, чтобы не присылать оповещения о старых
+    записях после перезапуска бота. По одному правилу на одной панели
+    оповещение отправляется не чаще раза в `cooldown` секунд; совпадения за
+    это время накапливаются и приходят одним сообщением.
+    """
+
+    def __init__(
+        self,
+        registry: PanelRegistry,
+        matcher: LogMatcher,
+        report: Callable[[object, LogAlert], Awaitable[None]],
+        interval: float = 30.0,
+        window: int = 200,
+        cooldown: float = 300.0,
+        concurrency: int = 8,
+        timeout: float = 5.0,
+    ):
+        """
+        Инициализация.
+
+        Args:
+            registry: Реестр панелей
+            matcher: Правила
+            report: Корутина отправки оповещения (бот, оповещение)
+            interval: Интервал опроса в секундах
+            window: Сколько последних строк запрашивать
+            cooldown: Минимальный интервал между оповещениями по правилу
+            concurrency: Одновременных запросов к панелям
+            timeout: Таймаут запроса к одной панели
+        """
+        self.registry = registry
+        self.matcher = matcher
+        self.report = report
+        self.interval = interval
+        self.window = window
+        self.cooldown = cooldown
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.bot = None
+        self._dedup: dict[str, LogDeduplicator] = {}
+        self._pending: dict[tuple[str, str], LogAlert] = {}
+        self._sent_at: dict[tuple[str, str], float] = {}
+        self._task: asyncio.Task | None = None
+
+    def start(self, bot):
+        """
+        Запустить проверку, если правила настроены.
+
+        Args:
+            bot: Бот для оповещений
+        """
+        self.bot = bot
+        if self.matcher and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Остановить проверку."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _fetch(self, panel: Panel) -> list[str]:
+        """Новые строки лога панели."""
+        response = await panel.client.get_logs(count=self.window)
+        logs = response.get("obj") or []
+        lines = [str(line) for line in logs] if isinstance(logs, list) else []
+        dedup = self._dedup.setdefault(panel.name, LogDeduplicator())
+        if not dedup.primed:
+            dedup.feed(lines, None)
+            return []
+        start = dedup.find(lines)
+        if start is None and len(lines) >= self.window:
+            logger.debug(f"Панель {panel.name}: новых строк логов больше {self.window}, часть пропущена")
+        return dedup.feed(lines, start)
+
+    async def check(self) -> list[LogAlert]:
+        """
+        Проверить новые строки всех панелей.
+
+        Returns:
+            Оповещения, которые пора отправить
+        """
+        results = await self.registry.fan_out(self._fetch, self.concurrency, self.timeout)
+        for panel, lines in results:
+            if isinstance(lines, BaseException):
+                logger.warning(f"Не удалось получить логи панели {panel.name}: {lines}")
+                continue
+            for rule, matched in self.matcher.scan(lines).items():
+                key = (panel.name, rule)
+                alert = self._pending.get(key)
+                if alert is None:
+                    alert = self._pending[key] = LogAlert(panel.name, rule)
+                alert.count += len(matched)
+                alert.samples.extend(matched)
+
+        now = time.monotonic()
+        due = []
+        for key, alert in list(self._pending.items()):
+            if now - self._sent_at.get(key, float("-inf")) >= self.cooldown:
+                due.append(alert)
+                self._sent_at[key] = now
+                del self._pending[key]
+        return due
+
+    async def _run(self):
+        """Цикл проверки."""
+        while True:
+            try:
+                for alert in await self.check():
+                    await self.report(self.bot, alert)
+            except Exception:
+                logger.exception("Непредвиденная ошибка при проверке логов")
+            await asyncio.sleep(self.interval)
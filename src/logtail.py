@@ -0,0 +1,285 @@
+"""Просмотр логов панели в реальном времени."""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+
+from src.sui_api import SUiAPIError, SUiClient
+
+logger = logging.getLogger(__name__)
+
+# Сколько последних строк служат якорем для поиска новых строк
+ANCHOR_LINES = 3
+
+_MOD = (1 << 61) - 1
+_BASE = 1_000_003
+_BASE_INV = pow(_BASE, -1, _MOD)
+
+
+def _window_hash(hashes: list[int] | tuple[int, ...]) -> int:
+    """Полиномиальный хэш последовательности хэшей строк."""
+    value = 0
+    for h in hashes:
+        value = (value * _BASE + h) % _MOD
+    return value
+
+
+class LogDeduplicator:
+    """
+    Выделение новых строк из повторно запрошенного хвоста лога.
+
+    /apiv2/logs отдаёт последние N строк без курсора, поэтому запоминаются
+    хэши последних ANCHOR_LINES строк предыдущего ответа (якорь). В новом
+    ответе якорь ищется скользящим хэшем окна той же длины, с конца - новыми
+    считаются строки после последнего совпадения. Одинаковые строки в логе
+    не теряются: сравнивается последовательность, а не отдельные строки.
+    """
+
+    def __init__(self, anchor_lines: int = ANCHOR_LINES):
+        """
+        Инициализация.
+
+        Args:
+            anchor_lines: Длина якоря в строках
+        """
+        self.anchor_lines = anchor_lines
+        self._anchor: tuple[int, ...] = ()
+
+    @property
+    def primed(self) -> bool:
+        """Есть ли якорь с прошлого ответа."""
+        return bool(self._anchor)
+
+    def reset(self):
+        """Забыть прочитанное."""
+        self._anchor = ()
+
+    def find(self, lines: list[str]) -> int | None:
+        """
+        Найти начало новых строк.
+
+        Args:
+            lines: Строки ответа в хронологическом порядке
+
+        Returns:
+            Индекс первой новой строки или None, если якорь не найден
+            (новых строк больше, чем в ответе, или это первый запрос)
+        """
+        k = len(self._anchor)
+        if not k or len(lines) < k:
+            return None
+        hashes = [hash(line) for line in lines]
+        target = _window_hash(self._anchor)
+
+        # Скользящий хэш окна справа налево: убираем строку справа,
+        # добавляем слева, старшая степень у левой строки окна
+        top = pow(_BASE, k - 1, _MOD)
+        end = len(hashes)
+        value = _window_hash(hashes[end - k:end])
+        while True:
+            if value == target and tuple(hashes[end - k:end]) == self._anchor:
+                return end
+            if end == k:
+                return None
+            end -= 1
+            value = (value - hashes[end]) * _BASE_INV % _MOD
+            value = (value + hashes[end - k] * top) % _MOD
+
+    def feed(self, lines: list[str], start: int | None) -> list[str]:
+        """
+        Принять ответ и вернуть новые строки.
+
+        Args:
+            lines: Строки ответа
+            start: Результат find() (None - все строки новые)
+
+        Returns:
+            Новые строки
+        """
+        new = lines[start or 0:]
+        if lines:
+            self._anchor = tuple(hash(line) for line in lines[-self.anchor_lines:])
+        return new
+
+
+class LogTailSession:
+    """
+    Live-просмотр логов в одном сообщении.
+
+    Хвост лога запрашивается раз в `interval` секунд. Окно запроса
+    начинается с `min_lines` строк и удваивается до `max_lines`, только если
+    в нём не нашёлся якорь (новых строк больше окна), и снова сжимается,
+    когда новых строк мало. Сообщение редактируется, только когда появились
+    новые строки, и не чаще раза в `edit_interval` секунд; на ответ Telegram
+    "слишком много запросов" сессия ждёт указанное время.
+    """
+
+    def __init__(
+        self,
+        client: SUiClient,
+        bot,
+        chat_id: int,
+        message_id: int,
+        render: Callable[["LogTailSession"], Awaitable[None]],
+        level: str = "",
+        interval: float = 5.0,
+        edit_interval: float = 3.0,
+        duration: float = 600.0,
+        min_lines: int = 20,
+        max_lines: int = 200,
+        keep_lines: int = 40,
+        panel_name: str = "",
+        on_finish: Callable[["LogTailSession"], None] | None = None,
+    ):
+        """
+        Инициализация.
+
+        Args:
+            client: Клиент S-UI API
+            bot: Бот
+            chat_id: Чат
+            message_id: Сообщение, которое редактируется
+            render: Корутина, редактирующая сообщение по состоянию сессии
+            level: Уровень логов (пусто - все)
+            interval: Интервал опроса в секундах
+            edit_interval: Минимальный интервал между правками сообщения
+            duration: Через сколько секунд сессия останавливается сама
+            min_lines: Начальное окно запроса
+            max_lines: Максимальное окно запроса
+            keep_lines: Сколько последних строк показывать
+            panel_name: Имя панели для заголовка
+            on_finish: Вызывается, когда цикл опроса завершился (истёк срок,
+                сообщение недоступно или сессия остановлена)
+        """
+        self.client = client
+        self.bot = bot
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.render = render
+        self.panel_name = panel_name
+        self.on_finish = on_finish
+        self.level = level
+        self.interval = interval
+        self.edit_interval = edit_interval
+        self.duration = duration
+        self.min_lines = min_lines
+        self.max_lines = max_lines
+        self.lines: deque[str] = deque(maxlen=keep_lines)
+        self.updated_at = 0.0
+        self.gaps = 0
+        self.error: str | None = None
+        self.running = False
+        self._window = min_lines
+        self._dedup = LogDeduplicator()
+        self._task: asyncio.Task | None = None
+
+    def set_level(self, level: str):
+        """Сменить уровень логов; показ начинается заново."""
+        self.level = level
+        self.lines.clear()
+        self._dedup.reset()
+        self._window = self.min_lines
+
+    def start(self):
+        """Запустить опрос."""
+        if self._task is None or self._task.done():
+            self.running = True
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Остановить опрос."""
+        self.running = False
+        if self._task and self._task is not asyncio.current_task():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def poll(self) -> int:
+        """
+        Запросить хвост лога и добавить новые строки.
+
+        Returns:
+            Число новых строк
+        """
+        first = not self._dedup.primed
+        while True:
+            response = await self.client.get_logs(count=self._window, level=self.level)
+            logs = response.get("obj") or []
+            lines = [str(line) for line in logs] if isinstance(logs, list) else []
+            start = self._dedup.find(lines)
+            if start is not None or first or len(lines) < self._window or self._window >= self.max_lines:
+                break
+            # Якорь выпал из окна - новых строк больше, чем запрошено
+            self._window = min(self.max_lines, self._window * 2)
+
+        if start is None and not first and len(lines) >= self._window:
+            # Даже в максимальном окне нет якоря - часть строк пропущена
+            self.gaps += 1
+            self.lines.append("…")
+
+        new = self._dedup.feed(lines, start)
+        self.lines.extend(new)
+        if start is not None and len(new) * 4 < self._window:
+            self._window = max(self.min_lines, self._window // 2)
+        return len(new)
+
+    async def _edit(self) -> bool:
+        """
+        Отредактировать сообщение с учётом лимитов Telegram.
+
+        Returns:
+            True, если сообщение обновлено или не изменилось
+        """
+        try:
+            await self.render(self)
+        except TelegramRetryAfter as e:
+            logger.warning(f"Live логи: Telegram просит подождать {e.retry_after} с")
+            await asyncio.sleep(e.retry_after)
+            return False
+        except TelegramBadRequest as e:
+            if "message is not modified" not in str(e):
+                # Сообщение удалено или недоступно - показывать больше некуда
+                logger.info(f"Live логи остановлены: {e}")
+                self.running = False
+        except Exception as e:
+            logger.warning(f"Не удалось обновить сообщение live логов: {e}")
+            return False
+        return True
+
+    async def _run(self):
+        """Цикл опроса."""
+        deadline = time.monotonic() + self.duration
+        edited_at = 0.0
+        pending = True
+        try:
+            while self.running and time.monotonic() < deadline:
+                try:
+                    if await self.poll():
+                        pending = True
+                    self.error = None
+                except SUiAPIError as e:
+                    self.error = str(e)
+                    pending = True
+                self.updated_at = time.time()
+
+                if pending and time.monotonic() - edited_at >= self.edit_interval:
+                    pending = not await self._edit()
+                    edited_at = time.monotonic()
+                await asyncio.sleep(self.interval)
+        finally:
+            if self.running:
+                # Сессия истекла - показываем итог без кнопок управления
+                self.running = False
+                try:
+                    await self.render(self)
+                except Exception as e:
+                    logger.debug(f"Не удалось обновить сообщение live логов: {e}")
+            if self.on_finish is not None:
+                self.on_finish(self)
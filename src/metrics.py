@@ -0,0 +1,314 @@
+"""Метрики бота в текстовом формате Prometheus."""
+
+import bisect
+import logging
+import math
+from collections.abc import Callable
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# Границы корзин гистограмм длительности (секунды)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    """Экранирование значения метки."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    """Значение в формате Prometheus."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if isinstance(value, int) or value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    """Блок меток {a="1",b="2"}."""
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    """Базовый класс метрики с метками."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        """
+        Инициализация.
+
+        Args:
+            name: Имя метрики
+            help: Описание
+            labels: Имена меток
+        """
+        self.name = name
+        self.help = help
+        self.labels = labels
+
+    def _key(self, values: tuple) -> tuple[str, ...]:
+        """Значения меток в виде ключа."""
+        if len(values) != len(self.labels):
+            raise ValueError(f"{self.name}: ожидается меток {len(self.labels)}, передано {len(values)}")
+        return tuple(str(value) for value in values)
+
+    def samples(self) -> list[str]:
+        """Строки значений."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """Метрика в текстовом формате."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines) + "\n"
+
+
+class Counter(Metric):
+    """Счётчик, который только растёт."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels, amount: float = 1):
+        """Увеличить счётчик."""
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, *labels) -> float:
+        """Текущее значение."""
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_labels(self.labels, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(Metric):
+    """
+    Значение, которое может расти и падать.
+
+    Если задан `collect`, значения читаются им в момент выгрузки метрик:
+    так показываются величины, которые уже считает другой объект
+    (попадания в кэш, число задач), без дублирования учёта.
+    """
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        collect: Callable[[], dict[tuple, float]] | None = None,
+        type: str = "gauge",
+    ):
+        """
+        Инициализация.
+
+        Args:
+            name: Имя метрики
+            help: Описание
+            labels: Имена меток
+            collect: Функция, возвращающая значения по меткам
+            type: Тип для выгрузки (counter для накопительных значений)
+        """
+        super().__init__(name, help, labels)
+        self.collect = collect
+        self.type = type
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labels):
+        """Задать значение."""
+        self._values[self._key(labels)] = value
+
+    def inc(self, *labels, amount: float = 1):
+        """Увеличить значение."""
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, *labels, amount: float = 1):
+        """Уменьшить значение."""
+        self.inc(*labels, amount=-amount)
+
+    def value(self, *labels) -> float:
+        """Текущее значение."""
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> list[str]:
+        values = dict(self._values)
+        if self.collect is not None:
+            try:
+                values.update({self._key(key): value for key, value in self.collect().items()})
+            except Exception:
+                logger.exception(f"Ошибка при сборе метрики {self.name}")
+        return [
+            f"{self.name}{_labels(self.labels, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram(Metric):
+    """Распределение значений по корзинам с суммой и количеством."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        """
+        Инициализация.
+
+        Args:
+            name: Имя метрики
+            help: Описание
+            labels: Имена меток
+            buckets: Верхние границы корзин по возрастанию
+        """
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Метки -> [счётчики корзин (последняя - +Inf), сумма]
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels):
+        """Учесть значение."""
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, *labels) -> int:
+        """Число учтённых значений."""
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> list[str]:
+        lines = []
+        for key, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Набор метрик процесса."""
+
+    def __init__(self):
+        """Инициализация."""
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """
+        Добавить метрику.
+
+        Повторная регистрация под тем же именем возвращает уже
+        зарегистрированную метрику (модуль мог быть импортирован повторно).
+        """
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Counter:
+        """Зарегистрировать счётчик."""
+        return self.register(Counter(name, help, labels))
+
+    def gauge(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        collect: Callable[[], dict[tuple, float]] | None = None,
+        type: str = "gauge",
+    ) -> Gauge:
+        """Зарегистрировать значение."""
+        return self.register(Gauge(name, help, labels, collect, type))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Зарегистрировать гистограмму."""
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def render(self, prefix: str = "") -> str:
+        """
+        Метрики в текстовом формате.
+
+        Args:
+            prefix: Выгрузить только метрики с этим началом имени
+        """
+        return "".join(
+            metric.render()
+            for name, metric in sorted(self._metrics.items())
+            if name.startswith(prefix)
+        )
+
+
+# Метрики процесса; модули регистрируют в нём свои метрики при импорте
+REGISTRY = MetricsRegistry()
+
+
+class MetricsServer:
+    """HTTP сервер с эндпоинтом /metrics."""
+
+    def __init__(self, host: str, port: int, registry: MetricsRegistry = REGISTRY):
+        """
+        Инициализация.
+
+        Args:
+            host: Адрес
+            port: Порт
+            registry: Набор метрик
+        """
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self._runner: web.AppRunner | None = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Отдать метрики."""
+        return web.Response(body=self.registry.render().encode(), headers={"Content-Type": CONTENT_TYPE})
+
+    async def start(self):
+        """Запустить сервер."""
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"Метрики доступны на http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        """Остановить сервер."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
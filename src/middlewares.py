@@ -0,0 +1,88 @@
+"""Middleware бота."""
+
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from src.metrics import REGISTRY
+
+UPDATES = REGISTRY.counter(
+    "bot_updates_total",
+    "Полученные обновления Telegram по типу",
+    ("type",),
+)
+UPDATES_IN_PROGRESS = REGISTRY.gauge(
+    "bot_updates_in_progress",
+    "Обновления, которые сейчас обрабатываются (глубина очереди)",
+)
+HANDLER_DURATION = REGISTRY.histogram(
+    "bot_handler_duration_seconds",
+    "Длительность обработчиков",
+    ("handler",),
+)
+HANDLER_ERRORS = REGISTRY.counter(
+    "bot_handler_errors_total",
+    "Исключения в обработчиках",
+    ("handler",),
+)
+
+
+def handler_name(data: dict[str, Any]) -> str:
+    """Имя функции обработчика, выбранного для события."""
+    handler = data.get("handler")
+    callback = getattr(handler, "callback", None)
+    return getattr(callback, "__name__", "unknown")
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """
+    Учёт обновлений на уровне диспетчера.
+
+    Регистрируется как outer middleware `dp.update`: в polling и webhook
+    режимах обновления обрабатываются параллельными задачами, и число
+    одновременно обрабатываемых обновлений показывает, сколько их ждёт
+    ответа панели или Telegram.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if isinstance(event, Update):
+            UPDATES.inc(event.event_type)
+        UPDATES_IN_PROGRESS.inc()
+        try:
+            return await handler(event, data)
+        finally:
+            UPDATES_IN_PROGRESS.dec()
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """
+    Длительность и ошибки обработчиков.
+
+    Регистрируется как inner middleware на главном роутере и
+    распространяется на вложенные роутеры, поэтому вызывается только для
+    событий, у которых нашёлся обработчик; метка - имя его функции.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        name = handler_name(data)
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            HANDLER_ERRORS.inc(name)
+            raise
+        finally:
+            HANDLER_DURATION.observe(time.perf_counter() - started, name)
@@ -0,0 +1,112 @@
+"""Фоновый опрос онлайн пользователей панели."""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+
+from src.sui_api import SUiAPIError, SUiClient
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OnlineState:
+    """Неизменяемый снимок онлайн пользователей."""
+
+    users: frozenset[str] = frozenset()
+    inbounds: frozenset[str] = frozenset()
+    outbounds: frozenset[str] = frozenset()
+    # Время получения (unix timestamp), 0 - данных ещё нет
+    updated_at: float = 0.0
+
+
+def _names(value) -> frozenset[str]:
+    """Множество имён из списка ответа API."""
+    return frozenset(value) if isinstance(value, list) else frozenset()
+
+
+class OnlinePoller:
+    """
+    Периодически опрашивает /apiv2/onlines и публикует OnlineState.
+
+    Обработчики читают `state` без запросов к панели; проверка
+    `name in state.users` выполняется за O(1).
+    """
+
+    def __init__(self, client: SUiClient, interval: float = 10.0):
+        """
+        Инициализация опросчика.
+
+        Args:
+            client: Клиент S-UI API
+            interval: Интервал опроса в секундах
+        """
+        self.client = client
+        self.interval = interval
+        self.state = OnlineState()
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    async def refresh(self) -> OnlineState:
+        """
+        Запросить онлайн пользователей и опубликовать новый снимок.
+
+        Returns:
+            Новый снимок
+        """
+        async with self._lock:
+            response = await self.client.get_onlines()
+            obj = response.get("obj", {})
+            if not isinstance(obj, dict):
+                obj = {}
+            self.state = OnlineState(
+                users=_names(obj.get("user")),
+                inbounds=_names(obj.get("inbound")),
+                outbounds=_names(obj.get("outbound")),
+                updated_at=time.time(),
+            )
+            return self.state
+
+    async def ensure_loaded(self) -> OnlineState:
+        """
+        Получить снимок, загрузив его при первом обращении.
+
+        Ошибка панели не пробрасывается: возвращается текущий (возможно
+        пустой) снимок.
+
+        Returns:
+            Снимок онлайн пользователей
+        """
+        if not self.state.updated_at:
+            try:
+                await self.refresh()
+            except SUiAPIError as e:
+                logger.warning(f"Не удалось получить онлайн пользователей: {e}")
+        return self.state
+
+    def start(self):
+        """Запустить фоновый опрос."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Остановить фоновый опрос."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        """Цикл фонового опроса."""
+        while True:
+            try:
+                await self.refresh()
+            except SUiAPIError as e:
+                logger.warning(f"Не удалось обновить онлайн пользователей: {e}")
+            except Exception:
+                logger.exception("Непредвиденная ошибка при опросе онлайн пользователей")
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,187 @@
+"""Реестр панелей S-UI: один процесс бота обслуживает несколько узлов."""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any, TypeVar
+
+from src.client_store import ClientStore
+from src.config import PanelConfig, Settings
+from src.onlines import OnlinePoller
+from src.search_index import ClientSearchIndex
+from src.snapshot import PanelSnapshot
+from src.subscriptions import SubscriptionLinks
+from src.sui_api import SUiClient
+from src.traffic import TrafficCollector, TrafficStore
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Panel:
+    """Панель S-UI со своим клиентом API, пулом соединений и кэшами."""
+
+    def __init__(self, config: PanelConfig, settings: Settings, traffic_db_path: str):
+        """
+        Инициализация панели.
+
+        Args:
+            config: Адрес и токен панели
+            settings: Настройки приложения
+            traffic_db_path: Путь к базе истории трафика этой панели
+        """
+        self.name = config.name
+        self.url = config.url
+        self.client = SUiClient(config.url, config.token, settings.connection_options, name=config.name)
+
+        # Снимок данных панели, обновляемый в фоне
+        self.snapshot = PanelSnapshot(
+            self.client,
+            interval=settings.snapshot_interval,
+            full_interval=settings.snapshot_full_interval,
+        )
+
+        # Кэш клиентов с индексами; полная загрузка снимка обновляет и его
+        self.client_store = ClientStore(self.client, ttl=settings.client_cache_ttl)
+        self.snapshot.subscribe(lambda snapshot: self.client_store.replace(snapshot.clients))
+
+        # Онлайн пользователи, опрашиваемые в фоне
+        self.online_poller = OnlinePoller(self.client, interval=settings.onlines_interval)
+
+        # Сборщик истории трафика
+        self.traffic_collector = TrafficCollector(
+            self.client,
+            self.client_store,
+            self.snapshot,
+            TrafficStore(traffic_db_path),
+            interval=settings.traffic_interval,
+            retention_days=settings.traffic_retention_days,
+        )
+
+        # Поисковый индекс клиентов, догоняет кэш клиентов при поиске
+        self.search_index = ClientSearchIndex()
+
+        # Ссылки подписки по шаблону из настроек панели
+        self.subscriptions = SubscriptionLinks(self.client, config.url)
+
+    def start(self):
+        """Запустить фоновые задачи панели."""
+        self.snapshot.start()
+        self.online_poller.start()
+        self.traffic_collector.start()
+
+    async def stop(self):
+        """Остановить фоновые задачи и закрыть сессию."""
+        await self.snapshot.stop()
+        await self.online_poller.stop()
+        await self.traffic_collector.stop()
+        await self.client.close()
+
+
+class PanelRegistry:
+    """
+    Реестр панелей и выбранной панели каждого администратора.
+
+    Порядок панелей совпадает с порядком в настройках; в callback_data
+    панель передаётся индексом, так как имя может не поместиться в 64 байта.
+    """
+
+    def __init__(self, panels: list[Panel]):
+        """
+        Инициализация реестра.
+
+        Args:
+            panels: Панели (хотя бы одна)
+        """
+        if not panels:
+            raise ValueError("Не настроено ни одной панели S-UI")
+        self.panels = panels
+        self._by_name = {panel.name: panel for panel in panels}
+        self._selected: dict[int, str] = {}
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "PanelRegistry":
+        """Создать реестр по настройкам."""
+        configs = settings.panel_configs
+        db_path = Path(settings.traffic_db_path)
+        panels = []
+        for config in configs:
+            # У каждой панели своя база, чтобы теги разных узлов не смешивались
+            path = db_path if len(configs) == 1 else db_path.with_stem(f"{db_path.stem}-{config.name}")
+            panels.append(Panel(config, settings, str(path)))
+        return cls(panels)
+
+    def __iter__(self):
+        """Перебор панелей."""
+        return iter(self.panels)
+
+    def __len__(self) -> int:
+        """Число панелей."""
+        return len(self.panels)
+
+    @property
+    def multi(self) -> bool:
+        """Настроено ли больше одной панели."""
+        return len(self.panels) > 1
+
+    def get(self, name: str) -> Panel | None:
+        """Панель по имени."""
+        return self._by_name.get(name)
+
+    def by_index(self, index: int) -> Panel | None:
+        """Панель по номеру в списке."""
+        return self.panels[index] if 0 <= index < len(self.panels) else None
+
+    def current(self, user_id: int) -> Panel:
+        """Панель, выбранная администратором (по умолчанию первая)."""
+        return self._by_name.get(self._selected.get(user_id, ""), self.panels[0])
+
+    def select(self, user_id: int, panel: Panel):
+        """Выбрать панель для администратора."""
+        self._selected[user_id] = panel.name
+
+    def start(self):
+        """Запустить фоновые задачи всех панелей."""
+        for panel in self.panels:
+            panel.start()
+
+    async def stop(self):
+        """Остановить все панели."""
+        await asyncio.gather(*(panel.stop() for panel in self.panels))
+
+    async def fan_out(
+        self,
+        func: Callable[[Panel], Awaitable[T]],
+        concurrency: int = 8,
+        timeout: float = 5.0,
+    ) -> list[tuple[Panel, T | BaseException]]:
+        """
+        Выполнить запрос ко всем панелям параллельно.
+
+        Одновременно выполняется не больше `concurrency` запросов, каждый
+        ограничен `timeout` секундами. Ошибка или таймаут одного узла не
+        мешает остальным: на месте результата возвращается исключение.
+
+        Args:
+            func: Корутина, получающая панель
+            concurrency: Максимум одновременных запросов
+            timeout: Таймаут на один узел в секундах
+
+        Returns:
+            Пары (панель, результат или исключение) в порядке панелей
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(panel: Panel) -> Any:
+            async with semaphore:
+                return await asyncio.wait_for(func(panel), timeout)
+
+        results = await asyncio.gather(*(run(panel) for panel in self.panels), return_exceptions=True)
+        for panel, result in zip(self.panels, results):
+            if isinstance(result, asyncio.TimeoutError):
+                logger.warning(f"Панель {panel.name} не ответила за {timeout} с")
+            elif isinstance(result, Exception):
+                logger.warning(f"Ошибка запроса к панели {panel.name}: {result}")
+        return list(zip(self.panels, results))
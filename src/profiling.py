@@ -0,0 +1,170 @@
+"""Выборочное профилирование обработчиков бота."""
+
+import cProfile
+import io
+import marshal
+import pstats
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, InlineQuery, Message, TelegramObject
+
+
+def profile_key(event: TelegramObject) -> str:
+    """
+    Ключ агрегации для события.
+
+    Для callback - данные кнопки до первого ":" (client_info:12 ->
+    client_info:*), для сообщений - команда, для inline запросов -
+    inline_query.
+    """
+    if isinstance(event, CallbackQuery):
+        data = event.data or ""
+        prefix, sep, _ = data.partition(":")
+        return f"{prefix}:*" if sep else prefix
+    if isinstance(event, Message):
+        text = event.text or ""
+        if text.startswith("/"):
+            return text.split(maxsplit=1)[0].split("@", 1)[0]
+        return "message"
+    if isinstance(event, InlineQuery):
+        return "inline_query"
+    return type(event).__name__
+
+
+@dataclass
+class ProfileEntry:
+    """Накопленный профиль одного ключа."""
+
+    stats: pstats.Stats
+    count: int = 0
+    # Суммарное время обработчиков по часам (секунды)
+    wall: float = 0.0
+
+
+class HandlerProfiler:
+    """
+    Накопление профилей cProfile по ключам событий.
+
+    Профилируется доля `rate` событий. Одновременно профилируется только
+    одно событие: cProfile не поддерживает вложенные профили, поэтому
+    событие, пришедшее во время профилирования другого, пропускается.
+    Пока профилируемый обработчик ждёт ответа панели, в профиль попадает и
+    работа других корутин цикла событий - это видно по функциям, не
+    относящимся к обработчику, и сглаживается накоплением многих замеров.
+    """
+
+    def __init__(self, rate: float = 0.0):
+        """
+        Инициализация.
+
+        Args:
+            rate: Доля профилируемых событий от 0 до 1
+        """
+        self.rate = rate
+        self.entries: dict[str, ProfileEntry] = {}
+        self._active = False
+
+    def should_sample(self) -> bool:
+        """Профилировать ли очередное событие."""
+        return not self._active and self.rate > 0 and random.random() < self.rate
+
+    async def run(self, key: str, handler: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Выполнить обработчик под профилировщиком.
+
+        Args:
+            key: Ключ агрегации
+            handler: Обработчик
+
+        Returns:
+            Результат обработчика
+        """
+        self._active = True
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            return await handler()
+        finally:
+            profiler.disable()
+            wall = time.perf_counter() - started
+            self._active = False
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = self.entries[key] = ProfileEntry(pstats.Stats(profiler))
+            else:
+                entry.stats.add(profiler)
+            entry.count += 1
+            entry.wall += wall
+
+    def reset(self):
+        """Забыть накопленные профили."""
+        self.entries.clear()
+
+    def merged(self, key: str | None = None) -> pstats.Stats | None:
+        """
+        Профиль ключа или всех ключей вместе.
+
+        Args:
+            key: Ключ (None - все)
+
+        Returns:
+            Статистика или None, если замеров нет
+        """
+        if key is None:
+            entries = list(self.entries.values())
+        else:
+            entries = [self.entries[key]] if key in self.entries else []
+        if not entries:
+            return None
+        # Копия: сортировка и strip_dirs меняют статистику на месте
+        stats = pstats.Stats()
+        for entry in entries:
+            stats.add(entry.stats)
+        return stats
+
+    @staticmethod
+    def dump(stats: pstats.Stats) -> bytes:
+        """
+        Файл профиля в формате pstats.
+
+        Открывается `python -m pstats`, snakeviz, а flameprof и gprof2dot
+        строят по нему flame graph и граф вызовов.
+        """
+        return marshal.dumps(stats.stats)
+
+    @staticmethod
+    def top(stats: pstats.Stats, limit: int = 20, sort: str = "cumulative") -> str:
+        """Текстовая таблица самых затратных функций (сокращает пути в `stats`)."""
+        buffer = io.StringIO()
+        stats.stream = buffer
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return buffer.getvalue()
+
+
+class ProfilingMiddleware(BaseMiddleware):
+    """Inner middleware, профилирующий выбранные события."""
+
+    def __init__(self, profiler: HandlerProfiler):
+        """
+        Инициализация.
+
+        Args:
+            profiler: Накопитель профилей
+        """
+        self.profiler = profiler
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if not self.profiler.should_sample():
+            return await handler(event, data)
+        return await self.profiler.run(profile_key(event), lambda: handler(event, data))
@@ -0,0 +1,161 @@
+"""Вывод длинных ответов: несколько сообщений или файл."""
+
+import html
+import io
+import re
+
+from aiogram import Bot
+from aiogram.types import BufferedInputFile, InlineKeyboardMarkup, Message
+
+# Максимальная длина сообщения с запасом от лимита Telegram (4096)
+MESSAGE_LIMIT = 4000
+
+TAG_RE = re.compile(r"<[^>]+>")
+
+
+def html_to_text(fragment: str) -> str:
+    """Текст HTML фрагмента без тегов."""
+    return html.unescape(TAG_RE.sub("", fragment))
+
+
+class Output:
+    """
+    Накопитель длинного ответа.
+
+    Ответ состоит из блоков - законченных HTML фрагментов (запись списка,
+    строка лога). Блок никогда не разрезается, поэтому теги не рвутся на
+    границе сообщений; `wrap` (например <pre>...</pre>) открывается и
+    закрывается в каждом сообщении заново. Параллельно блоки без разметки
+    пишутся в буфер будущего файла, поэтому файл собирается по мере
+    добавления, без повторной склейки строк. Если сообщений получается
+    больше `max_messages` или блок не помещается в одно сообщение, ответ
+    отправляется файлом.
+    """
+
+    def __init__(
+        self,
+        header: str,
+        filename: str,
+        max_messages: int = 3,
+        wrap: tuple[str, str] = ("", ""),
+    ):
+        """
+        Инициализация.
+
+        Args:
+            header: Заголовок первого сообщения (HTML)
+            filename: Имя файла, если ответ отправляется файлом
+            max_messages: Максимум сообщений, дальше - файл
+            wrap: Открывающий и закрывающий тег вокруг блоков каждого сообщения
+        """
+        self.header = header
+        self.filename = filename
+        self.max_messages = max_messages
+        self.wrap = wrap
+        self.blocks = 0
+        self._messages: list[list[str]] = [[header, wrap[0]]]
+        self._length = len(header) + len(wrap[0]) + len(wrap[1])
+        self._oversized = False
+        self._file = io.BytesIO()
+        self._file.write(html_to_text(header).encode())
+
+    @property
+    def as_document(self) -> bool:
+        """Будет ли ответ отправлен файлом."""
+        return self._oversized or len(self._messages) > self.max_messages
+
+    def add(self, block: str):
+        """
+        Добавить блок.
+
+        Args:
+            block: Законченный HTML фрагмент
+        """
+        self.blocks += 1
+        self._file.write(html_to_text(block).encode())
+        if self.as_document:
+            return
+
+        overhead = len(self.wrap[0]) + len(self.wrap[1])
+        if len(block) + overhead > MESSAGE_LIMIT:
+            self._oversized = True
+            return
+        if self._length + len(block) > MESSAGE_LIMIT:
+            self._messages[-1].append(self.wrap[1])
+            self._messages.append([self.wrap[0]])
+            self._length = overhead
+        self._messages[-1].append(block)
+        self._length += len(block)
+
+    def messages(self) -> list[str]:
+        """Тексты сообщений."""
+        parts = [list(message) for message in self._messages]
+        parts[-1].append(self.wrap[1])
+        return ["".join(message) for message in parts]
+
+    def document(self) -> BufferedInputFile:
+        """Файл с полным ответом без разметки."""
+        return BufferedInputFile(self._file.getvalue(), filename=self.filename)
+
+
+async def send_output(
+    message: Message,
+    output: Output,
+    reply_markup: InlineKeyboardMarkup | None = None,
+    edit: bool = True,
+):
+    """
+    Отправить ответ.
+
+    Первое сообщение редактирует `message` (или отправляется новым, если
+    `edit` выключен), остальные отправляются следом; кнопки остаются под
+    последним сообщением. Большой ответ отправляется файлом.
+
+    Args:
+        message: Сообщение с кнопками или сообщение с командой
+        output: Ответ
+        reply_markup: Клавиатура под ответом
+        edit: Редактировать `message`, а не отвечать на него
+    """
+    first = message.edit_text if edit else message.answer
+    if output.as_document:
+        await first(
+            f"{output.header}📎 Полный список во вложении ({output.blocks} записей)",
+            parse_mode="HTML",
+        )
+        await message.answer_document(output.document(), reply_markup=reply_markup)
+        return
+
+    messages = output.messages()
+    await first(
+        messages[0],
+        parse_mode="HTML",
+        reply_markup=reply_markup if len(messages) == 1 else None,
+    )
+    for index, text in enumerate(messages[1:], 2):
+        await message.answer(
+            text,
+            parse_mode="HTML",
+            reply_markup=reply_markup if index == len(messages) else None,
+        )
+
+
+async def send_output_to(bot: Bot, chat_id: int, output: Output):
+    """
+    Отправить ответ в чат без исходного сообщения (оповещения).
+
+    Args:
+        bot: Бот
+        chat_id: Чат
+        output: Ответ
+    """
+    if output.as_document:
+        await bot.send_document(
+            chat_id,
+            output.document(),
+            caption=f"{output.header}📎 Полный список во вложении ({output.blocks} записей)",
+            parse_mode="HTML",
+        )
+        return
+    for text in output.messages():
+        await bot.send_message(chat_id, text, parse_mode="HTML")
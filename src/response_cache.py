@@ -0,0 +1,123 @@
+"""Кэш ответов панели с временем жизни по эндпоинтам и вытеснением LRU."""
+
+import time
+from collections import OrderedDict
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+# Время жизни ответов по умолчанию (секунды) по имени эндпоинта /apiv2/<имя>.
+# Эндпоинты без TTL не кэшируются, их ответы хранятся только для работы
+# при недоступной панели.
+DEFAULT_CACHE_TTLS: dict[str, float] = {
+    "settings": 300.0,
+    "tls": 300.0,
+    "config": 300.0,
+    "users": 300.0,
+    "status": 5.0,
+    "onlines": 5.0,
+}
+
+
+def endpoint_name(endpoint: str) -> str:
+    """Имя эндпоинта без префикса (/apiv2/settings -> settings)."""
+    return endpoint.rsplit("/", 1)[-1]
+
+
+class ResponseCache:
+    """
+    Кэш успешных GET ответов.
+
+    Ключ - эндпоинт и отсортированные query параметры. Свежий ответ (моложе
+    TTL эндпоинта) отдаётся без запроса к панели; ответ любой давности
+    отдаётся как устаревший, пока панель недоступна. Размер ограничен
+    `maxsize` записями, вытесняются давно не использованные.
+    """
+
+    def __init__(self, maxsize: int = 256, ttls: Mapping[str, float] | None = None):
+        """
+        Инициализация кэша.
+
+        Args:
+            maxsize: Максимум записей
+            ttls: Время жизни ответов по имени эндпоинта (секунды)
+        """
+        self.maxsize = maxsize
+        self.ttls = dict(DEFAULT_CACHE_TTLS if ttls is None else ttls)
+        self.hits = 0
+        self.misses = 0
+        # Ключ -> (ответ, момент устаревания по time.monotonic)
+        self._entries: OrderedDict[tuple, tuple[dict[str, Any], float]] = OrderedDict()
+        self._generation = 0
+
+    def __len__(self) -> int:
+        """Число записей."""
+        return len(self._entries)
+
+    @property
+    def generation(self) -> int:
+        """Номер поколения, увеличивается при каждой инвалидации."""
+        return self._generation
+
+    def ttl(self, endpoint: str) -> float:
+        """Время жизни ответов эндпоинта (0 - не кэшируется)."""
+        return self.ttls.get(endpoint_name(endpoint), 0.0)
+
+    def get(self, key: tuple) -> dict[str, Any] | None:
+        """
+        Свежий ответ.
+
+        Args:
+            key: (эндпоинт, параметры)
+
+        Returns:
+            Ответ или None, если его нет или он устарел
+        """
+        if self.ttl(key[0]) <= 0:
+            return None
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def get_stale(self, key: tuple) -> dict[str, Any] | None:
+        """Последний сохранённый ответ любой давности."""
+        entry = self._entries.get(key)
+        return entry[0] if entry is not None else None
+
+    def put(self, key: tuple, response: dict[str, Any], generation: int):
+        """
+        Сохранить ответ.
+
+        Ответ на запрос, начатый до инвалидации, сохраняется уже устаревшим:
+        он мог быть получен до изменения данных на панели.
+
+        Args:
+            key: (эндпоинт, параметры)
+            response: Ответ API
+            generation: Поколение кэша на момент начала запроса
+        """
+        expires_at = 0.0
+        if generation == self._generation:
+            expires_at = time.monotonic() + self.ttl(key[0])
+        self._entries[key] = (response, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, endpoints: Iterable[str] | None = None):
+        """
+        Пометить ответы устаревшими.
+
+        Записи остаются для работы при недоступной панели.
+
+        Args:
+            endpoints: Имена эндпоинтов (по умолчанию все)
+        """
+        self._generation += 1
+        names = None if endpoints is None else set(endpoints)
+        for key, (response, _) in list(self._entries.items()):
+            if names is None or endpoint_name(key[0]) in names:
+                self._entries[key] = (response, 0.0)
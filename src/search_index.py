@@ -0,0 +1,277 @@
+"""Поисковый индекс клиентов по префиксу имени, группе и статусу."""
+
+from bisect import bisect_left, insort
+from typing import Any
+
+from src.models import Client
+
+# Статусы, по которым можно фильтровать клиентов
+STATUSES = ("online", "offline", "enabled", "disabled")
+
+# При большем числе изменений массив имён пересобирается сортировкой целиком
+REBUILD_THRESHOLD = 64
+
+
+def _set_bit(bits: bytearray, slot: int, value: bool):
+    """Установить или сбросить бит, расширяя массив при необходимости."""
+    index = slot >> 3
+    if index >= len(bits):
+        bits.extend(bytes(index - len(bits) + 1))
+    if value:
+        bits[index] |= 1 << (slot & 7)
+    else:
+        bits[index] &= ~(1 << (slot & 7)) & 0xFF
+
+
+def _has_bit(bits: bytes, slot: int) -> bool:
+    """Установлен ли бит."""
+    index = slot >> 3
+    return index < len(bits) and bool(bits[index] >> (slot & 7) & 1)
+
+
+def _iter_bits(bits: bytes):
+    """Номера установленных битов по возрастанию."""
+    for index, byte in enumerate(bits):
+        while byte:
+            low = byte & -byte
+            yield (index << 3) + low.bit_length() - 1
+            byte ^= low
+
+
+class ClientSearchIndex:
+    """
+    Индекс клиентов для поиска без обхода всего списка.
+
+    Имена хранятся в отсортированном массиве (поиск по префиксу - бинарный),
+    группы, включённость и онлайн - битовыми множествами по номерам слотов.
+    Фильтры объединяются побитовым AND, после чего выбирается дешёвая
+    стратегия: перебор диапазона имён или перебор совпавших битов.
+    """
+
+    def __init__(self):
+        """Инициализация пустого индекса."""
+        # Версия источника данных, по которой индекс был построен
+        self.version = -1
+        self._keys: list[tuple[str, int]] = []
+        self._clients: list[Client | None] = []
+        self._names: list[str | None] = []
+        self._slot_by_id: dict[Any, int] = {}
+        self._slot_by_name: dict[str, int] = {}
+        self._signature: dict[Any, tuple[str, str, bool]] = {}
+        self._free: list[int] = []
+        self._present = bytearray()
+        self._enabled = bytearray()
+        self._groups: dict[str, bytearray] = {}
+        self._online = bytearray()
+        self._online_source: frozenset[str] | None = None
+
+    def __len__(self) -> int:
+        """Число клиентов в индексе."""
+        return len(self._slot_by_id)
+
+    def update(self, clients: list[Client], version: int = 0):
+        """
+        Привести индекс в соответствие со списком клиентов.
+
+        Перестраиваются только клиенты, у которых изменились имя, группа или
+        включённость; остальным лишь подменяется объект с данными.
+
+        Args:
+            clients: Актуальный список клиентов
+            version: Версия источника данных
+        """
+        changed: list[tuple[Any, Client, tuple[str, str, bool]]] = []
+        seen = set()
+        for client in clients:
+            client_id = client.id
+            seen.add(client_id)
+            signature = (client.name, client.group, client.enable)
+            slot = self._slot_by_id.get(client_id)
+            if slot is not None and self._signature[client_id] == signature:
+                self._clients[slot] = client
+            else:
+                changed.append((client_id, client, signature))
+
+        removed = [client_id for client_id in self._slot_by_id if client_id not in seen]
+        bulk = len(changed) + len(removed) > REBUILD_THRESHOLD
+
+        for client_id in removed:
+            self._remove(client_id, keep_keys=bulk)
+        for client_id, client, signature in changed:
+            if client_id in self._slot_by_id:
+                self._remove(client_id, keep_keys=bulk)
+            self._add(client_id, client, signature, insert_key=not bulk)
+
+        if bulk:
+            self._keys = sorted((self._names[slot], slot) for slot in self._slot_by_id.values())
+        self._online_source = None
+        self.version = version
+
+    def _add(self, client_id: Any, client: Client, signature: tuple[str, str, bool], insert_key: bool):
+        """Занять слот под клиента."""
+        name, group, enable = signature
+        slot = self._free.pop() if self._free else len(self._clients)
+        if slot == len(self._clients):
+            self._clients.append(client)
+            self._names.append(name.lower())
+        else:
+            self._clients[slot] = client
+            self._names[slot] = name.lower()
+        self._slot_by_id[client_id] = slot
+        self._slot_by_name[name] = slot
+        self._signature[client_id] = signature
+        _set_bit(self._present, slot, True)
+        _set_bit(self._enabled, slot, enable)
+        _set_bit(self._groups.setdefault(group, bytearray()), slot, True)
+        if insert_key:
+            insort(self._keys, (name.lower(), slot))
+
+    def _remove(self, client_id: Any, keep_keys: bool):
+        """Освободить слот клиента."""
+        slot = self._slot_by_id.pop(client_id)
+        name, group, _ = self._signature.pop(client_id)
+        if self._slot_by_name.get(name) == slot:
+            del self._slot_by_name[name]
+        self._clients[slot] = None
+        self._names[slot] = None
+        self._free.append(slot)
+        _set_bit(self._present, slot, False)
+        _set_bit(self._enabled, slot, False)
+        _set_bit(self._online, slot, False)
+        group_bits = self._groups.get(group)
+        if group_bits is not None:
+            _set_bit(group_bits, slot, False)
+            if not any(group_bits):
+                del self._groups[group]
+        if not keep_keys:
+            key = (name.lower(), slot)
+            index = bisect_left(self._keys, key)
+            if index < len(self._keys) and self._keys[index] == key:
+                del self._keys[index]
+
+    def set_online(self, names: frozenset[str]):
+        """
+        Обновить множество онлайн клиентов.
+
+        Args:
+            names: Имена онлайн пользователей
+        """
+        if names is self._online_source:
+            return
+        online = bytearray(len(self._present))
+        for name in names:
+            slot = self._slot_by_name.get(name)
+            if slot is not None:
+                _set_bit(online, slot, True)
+        self._online = online
+        self._online_source = names
+
+    @property
+    def groups(self) -> list[str]:
+        """Имена групп в индексе."""
+        return sorted(self._groups)
+
+    def _status_mask(self, status: str) -> int:
+        """Битовая маска клиентов с указанным статусом."""
+        if status == "enabled":
+            return int.from_bytes(self._enabled, "little")
+        if status == "disabled":
+            return int.from_bytes(self._present, "little") & ~int.from_bytes(self._enabled, "little")
+        if status == "online":
+            return int.from_bytes(self._online, "little")
+        # Офлайн - включённые клиенты, которых нет среди онлайн
+        return int.from_bytes(self._enabled, "little") & ~int.from_bytes(self._online, "little")
+
+    def search(
+        self,
+        prefix: str = "",
+        group: str | None = None,
+        status: str | None = None,
+        limit: int = 20,
+    ) -> list[Client]:
+        """
+        Найти клиентов.
+
+        Args:
+            prefix: Начало имени (без учёта регистра)
+            group: Группа
+            status: Статус из STATUSES
+            limit: Максимум результатов
+
+        Returns:
+            Клиенты в порядке имён
+        """
+        prefix = prefix.lower()
+        lo = bisect_left(self._keys, (prefix,))
+        if prefix:
+            hi = bisect_left(self._keys, (prefix + "\U0010ffff",), lo)
+        else:
+            hi = len(self._keys)
+
+        mask = None
+        if group is not None:
+            group_bits = self._groups.get(group)
+            if group_bits is None:
+                return []
+            mask = int.from_bytes(group_bits, "little")
+        if status in STATUSES:
+            status_mask = self._status_mask(status)
+            mask = status_mask if mask is None else mask & status_mask
+
+        if mask is None:
+            return [self._clients[slot] for _, slot in self._keys[lo:min(hi, lo + limit)]]
+
+        matched = mask.bit_count()
+        filter_bits = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+
+        if not matched or lo >= hi:
+            return []
+
+        # Оценка стоимости: перебор диапазона имён проверяет в среднем
+        # limit * (диапазон / совпадения) имён, перебор битов - все байты маски
+        scan_cost = min(hi - lo, limit * (hi - lo) // matched)
+        if len(filter_bits) + matched < scan_cost:
+            found = []
+            for slot in _iter_bits(filter_bits):
+                name = self._names[slot]
+                if name is not None and name.startswith(prefix):
+                    found.append((name, slot))
+            found.sort()
+            return [self._clients[slot] for _, slot in found[:limit]]
+
+        # Фильтры пропускают много клиентов - идём по диапазону имён
+        result = []
+        for index in range(lo, hi):
+            slot = self._keys[index][1]
+            if _has_bit(filter_bits, slot):
+                result.append(self._clients[slot])
+                if len(result) >= limit:
+                    break
+        return result
+
+
+def parse_query(query: str) -> tuple[str, str | None, str | None]:
+    """
+    Разобрать строку поиска.
+
+    Поддерживаются токены `group:<имя>` (или `g:`) и `status:<статус>`
+    (или `s:`), остальной текст считается префиксом имени.
+
+    Args:
+        query: Строка поиска
+
+    Returns:
+        Префикс имени, группа и статус
+    """
+    prefix_parts = []
+    group = None
+    status = None
+    for token in query.split():
+        key, sep, value = token.partition(":")
+        if sep and key.lower() in ("group", "g"):
+            group = value
+        elif sep and key.lower() in ("status", "s") and value.lower() in STATUSES:
+            status = value.lower()
+        else:
+            prefix_parts.append(token)
+    return " ".join(prefix_parts), group, status
@@ -0,0 +1,203 @@
+"""Снимок состояния панели S-UI с инкрементальным обновлением."""
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from typing import Any
+
+from src.models import Client, Inbound, LoadData, Outbound, TlsEntry
+from src.sui_api import SUiAPIError, SUiClient
+
+logger = logging.getLogger(__name__)
+
+# Ключи /apiv2/load, которые панель присылает только если конфигурация изменилась
+SNAPSHOT_KEYS = (
+    "config",
+    "clients",
+    "tls",
+    "inbounds",
+    "outbounds",
+    "endpoints",
+    "services",
+    "subURI",
+)
+
+# Запас в секундах, на который `lu` сдвигается назад. Панель не возвращает своё
+# время, а журнал изменений ведётся по её часам: если часы бота спешат, изменения
+# в пределах расхождения иначе пришли бы только со следующей полной загрузкой.
+# Изменения внутри запаса могут прийти повторно, это безопасно.
+LU_MARGIN = 30
+
+
+class PanelSnapshot:
+    """
+    Хранит данные панели (inbounds, клиенты, TLS, outbounds) в памяти.
+
+    Панель сравнивает параметр `lu` с журналом изменений и присылает полный
+    набор данных только если после `lu` что-то менялось, иначе в ответе
+    остаются лишь онлайн пользователи. Трафик клиентов в журнал изменений не
+    попадает, поэтому раз в `full_interval` секунд снимок загружается целиком.
+    """
+
+    def __init__(
+        self,
+        client: SUiClient,
+        interval: float = 10.0,
+        full_interval: float = 60.0,
+    ):
+        """
+        Инициализация снимка.
+
+        Args:
+            client: Клиент S-UI API
+            interval: Интервал фонового обновления в секундах
+            full_interval: Интервал принудительной полной загрузки в секундах
+        """
+        self.client = client
+        self.interval = interval
+        self.full_interval = full_interval
+        self.version = 0
+        self._data: LoadData | None = None
+        self._onlines: dict[str, Any] = {}
+        self._last_update = 0
+        self._last_full = 0.0
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._listeners: list[Callable[["PanelSnapshot"], None]] = []
+
+    def subscribe(self, listener: Callable[["PanelSnapshot"], None]):
+        """
+        Подписаться на обновления снимка.
+
+        Args:
+            listener: Функция, вызываемая после каждой загрузки новых данных
+        """
+        self._listeners.append(listener)
+
+    @property
+    def loaded(self) -> bool:
+        """Загружен ли снимок хотя бы один раз."""
+        return self._data is not None
+
+    async def ensure_loaded(self):
+        """Загрузить снимок, если он ещё пуст."""
+        if self._data is not None:
+            return
+        async with self._lock:
+            if self._data is None:
+                await self._refresh_locked(full=True)
+
+    async def refresh(self, force_full: bool = False) -> bool:
+        """
+        Обновить снимок.
+
+        Args:
+            force_full: Загрузить все данные, не передавая `lu`
+
+        Returns:
+            True, если данные конфигурации изменились
+        """
+        async with self._lock:
+            full = (
+                force_full
+                or self._data is None
+                or time.monotonic() - self._last_full >= self.full_interval
+            )
+            return await self._refresh_locked(full=full)
+
+    async def _refresh_locked(self, full: bool) -> bool:
+        """Выполнить запрос /apiv2/load под блокировкой."""
+        last_update = "" if full else str(self._last_update)
+        # Запоминаем время до запроса, чтобы не пропустить изменения во время загрузки
+        started = int(time.time()) - LU_MARGIN
+
+        response = await self.client.load_full_data(last_update)
+        obj = response.get("obj")
+        if obj is None:
+            raise SUiAPIError("Панель не вернула данные /load")
+
+        changed = False
+        if any(getattr(obj, key) is not None for key in SNAPSHOT_KEYS):
+            self._data = obj
+            self._last_full = time.monotonic()
+            self.version += 1
+            changed = True
+            logger.info(
+                f"Снимок панели обновлён (v{self.version}): "
+                f"{len(self.clients)} клиентов, {len(self.inbounds)} inbounds"
+            )
+            for listener in self._listeners:
+                try:
+                    listener(self)
+                except Exception:
+                    logger.exception("Ошибка в подписчике снимка панели")
+
+        if obj.onlines is not None:
+            self._onlines = obj.onlines
+
+        self._last_update = started
+        return changed
+
+    @property
+    def clients(self) -> list[Client]:
+        """Клиенты."""
+        return (self._data and self._data.clients) or []
+
+    @property
+    def inbounds(self) -> list[Inbound]:
+        """Inbound соединения."""
+        return (self._data and self._data.inbounds) or []
+
+    @property
+    def outbounds(self) -> list[Outbound]:
+        """Outbound соединения."""
+        return (self._data and self._data.outbounds) or []
+
+    @property
+    def tls(self) -> list[TlsEntry]:
+        """TLS конфигурации."""
+        return (self._data and self._data.tls) or []
+
+    @property
+    def config(self) -> dict:
+        """Конфигурация sing-box."""
+        return (self._data and self._data.config) or {}
+
+    @property
+    def onlines(self) -> dict:
+        """Онлайн пользователи из последнего ответа /load."""
+        return self._onlines
+
+    def find_inbound(self, inbound_id: int) -> Inbound | None:
+        """Найти inbound по ID."""
+        for inbound in self.inbounds:
+            if inbound.id == inbound_id:
+                return inbound
+        return None
+
+    def start(self):
+        """Запустить фоновое обновление."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Остановить фоновое обновление."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        """Цикл фонового обновления."""
+        while True:
+            try:
+                await self.refresh()
+            except SUiAPIError as e:
+                logger.warning(f"Не удалось обновить снимок панели: {e}")
+            except Exception:
+                logger.exception("Непредвиденная ошибка при обновлении снимка панели")
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,117 @@
+"""Ссылки подписки клиентов."""
+
+import logging
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlparse
+
+from src.models import Client
+from src.sui_api import SUiClient
+
+logger = logging.getLogger(__name__)
+
+# Поля настроек панели, от которых зависит ссылка подписки
+SUBSCRIPTION_FIELDS = ("subURI", "subPath", "subDomain", "subPort", "webPort")
+
+
+@dataclass(frozen=True)
+class SubscriptionTemplate:
+    """Общая для всех клиентов часть ссылки подписки."""
+
+    prefix: str
+
+    def link(self, name: str) -> str:
+        """Ссылка подписки клиента."""
+        return self.prefix + name
+
+    def links(self, clients: list[Client]) -> list[tuple[Client, str]]:
+        """
+        Ссылки подписки для списка клиентов за один проход.
+
+        Args:
+            clients: Клиенты
+
+        Returns:
+            Пары (клиент, ссылка); клиенты без имени пропускаются
+        """
+        prefix = self.prefix
+        return [(client, prefix + client.name) for client in clients if client.name]
+
+
+def compile_template(settings_obj: dict[str, Any], panel_url: str) -> SubscriptionTemplate:
+    """
+    Собрать шаблон ссылки подписки из настроек панели.
+
+    Args:
+        settings_obj: Поле obj ответа /apiv2/settings
+        panel_url: URL панели из конфига бота
+
+    Returns:
+        Шаблон ссылки
+    """
+    # Путь подписки (по умолчанию /sub согласно документации)
+    sub_uri = settings_obj.get("subURI", settings_obj.get("subPath", "/sub"))
+    sub_domain = settings_obj.get("subDomain", "")
+    # Порт подписки (может быть отдельным или тем же что и панель)
+    sub_port = settings_obj.get("subPort", settings_obj.get("webPort", None))
+
+    # Если sub_uri пустой, используем стандартный путь /sub
+    if not sub_uri or sub_uri.strip() == "":
+        sub_uri = "/sub"
+
+    # Путь начинается с / и без / в конце (в S-UI по умолчанию /sub/)
+    sub_uri = sub_uri.strip("/")
+    sub_uri = f"/{sub_uri}" if sub_uri else ""
+
+    if sub_domain:
+        # Если указан отдельный домен для подписки
+        if sub_port and sub_port not in [80, 443]:
+            return SubscriptionTemplate(f"https://{sub_domain}:{sub_port}{sub_uri}/")
+        return SubscriptionTemplate(f"https://{sub_domain}{sub_uri}/")
+
+    # Используем URL панели из конфига бота
+    parsed = urlparse(panel_url)
+    # Порт подписки если указан, иначе порт из URL
+    port = sub_port or parsed.port
+    if port and port not in [80, 443]:
+        return SubscriptionTemplate(f"{parsed.scheme}://{parsed.hostname}:{port}{sub_uri}/")
+    return SubscriptionTemplate(f"{parsed.scheme}://{parsed.hostname}{sub_uri}/")
+
+
+class SubscriptionLinks:
+    """
+    Построение ссылок подписки панели.
+
+    Шаблон собирается один раз и пересобирается, только когда меняются
+    влияющие на ссылку поля настроек. Сами настройки берутся через кэш
+    ответов SUiClient, поэтому панель запрашивается не чаще его TTL.
+    """
+
+    def __init__(self, client: SUiClient, panel_url: str):
+        """
+        Инициализация.
+
+        Args:
+            client: Клиент S-UI API
+            panel_url: URL панели из конфига бота
+        """
+        self.client = client
+        self.panel_url = panel_url
+        self._version: tuple | None = None
+        self._template: SubscriptionTemplate | None = None
+
+    async def template(self) -> SubscriptionTemplate:
+        """
+        Актуальный шаблон ссылки подписки.
+
+        Raises:
+            SUiAPIError: Если настройки не удалось получить
+        """
+        response = await self.client.get_settings()
+        settings_obj = response.get("obj") or {}
+        version = tuple(settings_obj.get(key) for key in SUBSCRIPTION_FIELDS)
+        if self._template is None or version != self._version:
+            self._template = compile_template(settings_obj, self.panel_url)
+            self._version = version
+            logger.info(f"Шаблон ссылки подписки: {self._template.prefix}<имя>")
+        return self._template
@@ -1,42 +1,196 @@
 """Клиент для работы с S-UI API."""
 
+import asyncio
+import functools
 import logging
+import random
+import time
+from collections.abc import Awaitable, Mapping
+from dataclasses import dataclass, field, make_dataclass
 from typing import Any
 
 import aiohttp
 
+from src.circuit_breaker import CircuitBreaker
+from src.json_codec import JSONDecodeError, JSONDecoder
+from src.metrics import REGISTRY
+from src.models import ClientsObj, LoadData
+from src.response_cache import DEFAULT_CACHE_TTLS, ResponseCache, endpoint_name
+
 logger = logging.getLogger(__name__)
 
 
+REQUEST_DURATION = REGISTRY.histogram(
+    "sui_request_duration_seconds",
+    "Длительность HTTP запросов к панели",
+    ("panel", "endpoint"),
+)
+REQUESTS = REGISTRY.counter(
+    "sui_requests_total",
+    "Запросы к панели по результату (ok, api_error, connection_error, timeout, circuit_open, stale)",
+    ("panel", "endpoint", "result"),
+)
+COALESCED = REGISTRY.counter(
+    "sui_coalesced_requests_total",
+    "GET запросы, дождавшиеся ответа уже выполняющегося запроса",
+    ("panel", "endpoint"),
+)
+
+
 class SUiAPIError(Exception):
     """Ошибка API S-UI."""
     pass
 
 
+class SUiConnectionError(SUiAPIError):
+    """Панель недоступна: сетевая ошибка, таймаут или ответ 5xx."""
+    pass
+
+
+class SUiCircuitOpenError(SUiConnectionError):
+    """Автомат защиты разомкнут, запрос к панели не выполнялся."""
+    pass
+
+
+@dataclass(frozen=True)
+class ConnectionOptions:
+    """Параметры пула соединений и таймаутов HTTP сессии."""
+
+    # Всего соединений в пуле (0 - без ограничения)
+    limit: int = 20
+    # Соединений на один хост (0 - без ограничения)
+    limit_per_host: int = 10
+    # Сколько секунд держать простаивающее соединение открытым
+    keepalive_timeout: float = 30.0
+    # Таймаут установки соединения, включая ожидание свободного места в пуле
+    connect_timeout: float = 5.0
+    # Таймаут чтения между пакетами ответа
+    read_timeout: float = 30.0
+    # Общий таймаут запроса
+    total_timeout: float = 60.0
+    # Время жизни DNS кэша в секундах
+    dns_cache_ttl: int = 300
+    # Повторы GET запросов при сетевых сбоях
+    retries: int = 2
+    # Базовая и максимальная задержка экспоненциального backoff в секундах
+    backoff_base: float = 0.2
+    backoff_max: float = 2.0
+    # Сбоев подряд до размыкания автомата защиты
+    breaker_threshold: int = 5
+    # Через сколько секунд разомкнутый автомат пропустит пробный запрос
+    breaker_reset_timeout: float = 30.0
+    # Сколько GET ответов хранить в кэше (и для работы при недоступной панели)
+    cache_size: int = 256
+    # Время жизни кэшированных ответов по имени эндпоинта (секунды)
+    cache_ttls: Mapping[str, float] = field(default_factory=lambda: dict(DEFAULT_CACHE_TTLS))
+    # Разбор JSON ответов: auto, orjson, msgspec или json
+    json_backend: str = "auto"
+
+
+# Какие кэшированные эндпоинты устаревают после запроса на изменение
+# (None - все). Сохранение любого объекта может изменить связанные с ним
+# (ссылки клиентов в inbounds, TLS в inbounds, итоговый config), поэтому
+# сбрасывается весь кэш.
+WRITE_INVALIDATES: dict[str, tuple[str, ...] | None] = {
+    "/apiv2/save": None,
+    "/apiv2/restartApp": None,
+    "/apiv2/restartSb": ("status", "onlines"),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def response_type(obj_type: Any) -> type:
+    """Ответ API {success, msg, obj} с полем obj заданного типа."""
+    return make_dataclass(
+        "Response",
+        [("success", bool, False), ("msg", str, ""), ("obj", obj_type | None, None)],
+        slots=True,
+    )
+
+
 class SUiClient:
     """Клиент для взаимодействия с S-UI API."""
 
-    def __init__(self, base_url: str, token: str):
+    def __init__(
+        self,
+        base_url: str,
+        token: str,
+        options: ConnectionOptions | None = None,
+        name: str = "",
+    ):
         """
         Инициализация клиента.
 
         Args:
             base_url: Базовый URL API (например, http://localhost:2095/app)
             token: API токен для аутентификации
+            options: Параметры пула соединений и таймаутов
+            name: Имя панели для метрик
         """
         self.base_url = base_url.rstrip("/")
         self.token = token
+        self.name = name
+        self.options = options or ConnectionOptions()
         self.session: aiohttp.ClientSession | None = None
+        self.breaker = CircuitBreaker(
+            failure_threshold=self.options.breaker_threshold,
+            reset_timeout=self.options.breaker_reset_timeout,
+        )
+        self.cache = ResponseCache(self.options.cache_size, self.options.cache_ttls)
+        self.decoder = JSONDecoder(self.options.json_backend)
+        # Выполняющиеся GET запросы: одинаковые запросы ждут один ответ
+        self._in_flight: dict[tuple, asyncio.Task] = {}
 
     async def _ensure_session(self):
         """Создать сессию если её нет."""
         if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.options.limit,
+                limit_per_host=self.options.limit_per_host,
+                keepalive_timeout=self.options.keepalive_timeout,
+                ttl_dns_cache=self.options.dns_cache_ttl,
+            )
+            timeout = aiohttp.ClientTimeout(
+                total=self.options.total_timeout,
+                connect=self.options.connect_timeout,
+                sock_read=self.options.read_timeout,
+            )
             self.session = aiohttp.ClientSession(
-                headers={"Token": self.token}
+                headers={"Token": self.token},
+                connector=connector,
+                timeout=timeout,
             )
 
+    def pool_stats(self) -> dict[str, int]:
+        """
+        Статистика пула соединений.
+
+        Returns:
+            Лимиты пула и число занятых, свободных и ожидающих соединений
+        """
+        stats = {
+            "limit": self.options.limit,
+            "limit_per_host": self.options.limit_per_host,
+            "in_use": 0,
+            "idle": 0,
+            "queued": 0,
+        }
+        if self.session is None or self.session.closed:
+            return stats
+
+        # Публичного API для этих счётчиков у aiohttp нет
+        connector = self.session.connector
+        stats["in_use"] = len(getattr(connector, "_acquired", ()))
+        stats["idle"] = sum(len(conns) for conns in getattr(connector, "_conns", {}).values())
+        stats["queued"] = sum(len(waiters) for waiters in getattr(connector, "_waiters", {}).values())
+        return stats
+
     async def close(self):
         """Закрыть сессию."""
+        in_flight = list(self._in_flight.values())
+        for task in in_flight:
+            task.cancel()
+        await asyncio.gather(*in_flight, return_exceptions=True)
         if self.session and not self.session.closed:
             await self.session.close()
 
@@ -46,15 +200,25 @@ class SUiClient:
         endpoint: str,
         params: dict[str, Any] | None = None,
         data: dict[str, Any] | None = None,
+        model: Any = None,
     ) -> dict[str, Any]:
         """
         Выполнить HTTP запрос к API.
 
+        Свежий ответ из кэша возвращается без запроса к панели. Одинаковые
+        GET запросы (эндпоинт и параметры), пришедшие, пока первый ещё
+        выполняется, не отправляются повторно, а ждут его ответ. Ответ общий
+        для всех ожидающих и кэша, изменять его нельзя. Отмена одного из
+        ожидающих не прерывает запрос для остальных. Запросы на изменение
+        сбрасывают затронутые записи кэша (WRITE_INVALIDATES).
+
         Args:
             method: HTTP метод
             endpoint: Эндпоинт API
             params: Query параметры
             data: Данные для POST запроса
+            model: Тип поля obj (модели из src.models); ответ с моделью
+                кэшируется отдельно от ответа без неё
 
         Returns:
             Ответ API
@@ -62,9 +226,127 @@ class SUiClient:
         Raises:
             SUiAPIError: При ошибке API
         """
+        if method != "GET":
+            try:
+                return await self._execute(method, endpoint, params, data, model)
+            finally:
+                # Изменение могло примениться, даже если ответ не получен
+                if endpoint in WRITE_INVALIDATES:
+                    self._invalidate(WRITE_INVALIDATES[endpoint])
+
+        key = (endpoint, tuple(sorted((params or {}).items())), model)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._execute(method, endpoint, params, data, model))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._request_done(key, done))
+        else:
+            COALESCED.inc(self.name, endpoint_name(endpoint))
+            logger.debug(f"Запрос {endpoint} уже выполняется, ждём его ответ")
+        return await asyncio.shield(task)
+
+    @property
+    def in_flight(self) -> int:
+        """Число выполняющихся GET запросов."""
+        return len(self._in_flight)
+
+    def _invalidate(self, endpoints: tuple[str, ...] | None):
+        """Сбросить кэш эндпоинтов и не присоединяться к их начатым запросам."""
+        self.cache.invalidate(endpoints)
+        for key in list(self._in_flight):
+            if endpoints is None or endpoint_name(key[0]) in endpoints:
+                del self._in_flight[key]
+
+    def _request_done(self, key: tuple, task: asyncio.Task):
+        """Убрать завершённый запрос из выполняющихся."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Помечаем исключение полученным, даже если все ожидающие отменены
+        if not task.cancelled():
+            task.exception()
+
+    async def _execute(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, Any] | None,
+        data: dict[str, Any] | None,
+        model: Any = None,
+    ) -> dict[str, Any]:
+        """
+        Выполнить запрос с повторами и автоматом защиты.
+
+        GET запросы при сетевых сбоях повторяются с экспоненциальной задержкой
+        и случайным разбросом. Пока автомат защиты разомкнут, запрос к панели
+        не выполняется: GET получает последний успешный ответ с пометкой
+        `stale`, если он есть, остальные запросы сразу завершаются ошибкой.
+        """
+        cache_key = (endpoint, tuple(sorted((params or {}).items())), model)
+        idempotent = method == "GET"
+        generation = self.cache.generation
+
+        if not self.breaker.allow():
+            cached = self.cache.get_stale(cache_key) if idempotent else None
+            REQUESTS.inc(self.name, endpoint_name(endpoint), "circuit_open" if cached is None else "stale")
+            if cached is not None:
+                logger.warning(f"Панель недоступна, используем сохранённый ответ {endpoint}")
+                return {**cached, "stale": True}
+            raise SUiCircuitOpenError(
+                f"Панель недоступна, следующая попытка через {self.breaker.retry_after:.0f} с"
+            )
+
+        attempts = 1 + (self.options.retries if idempotent else 0)
+        try:
+            for attempt in range(attempts):
+                try:
+                    response_data = await self._send(method, endpoint, params, data, model)
+                    break
+                except SUiConnectionError as e:
+                    if attempt + 1 >= attempts:
+                        raise
+                    delay = random.uniform(
+                        0, min(self.options.backoff_max, self.options.backoff_base * 2 ** attempt)
+                    )
+                    logger.warning(
+                        f"Сбой запроса {endpoint} ({e}), повтор {attempt + 1}/{attempts - 1} "
+                        f"через {delay:.2f} с"
+                    )
+                    await asyncio.sleep(delay)
+        except SUiConnectionError:
+            self.breaker.record_failure()
+            raise
+        except SUiAPIError:
+            # Панель ответила, пусть и ошибкой - связь в порядке
+            self.breaker.record_success()
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+
+        self.breaker.record_success()
+        if idempotent:
+            self.cache.put(cache_key, response_data, generation)
+        return response_data
+
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, Any] | None,
+        data: dict[str, Any] | None,
+        model: Any = None,
+    ) -> dict[str, Any]:
+        """Выполнить одну попытку HTTP запроса."""
         await self._ensure_session()
 
         url = f"{self.base_url}{endpoint}"
+        started = time.perf_counter()
+        # Результат для метрик; исключения, не разобранные ниже, - отмена запроса
+        result = "cancelled"
         try:
             async with self.session.request(
                 method=method,
@@ -79,6 +361,9 @@ class SUiClient:
                 if response.status == 403:
                     raise SUiAPIError("Доступ запрещен. Проверьте права API токена.")
                 
+                if response.status >= 500:
+                    raise SUiConnectionError(f"Панель вернула ошибку {response.status}")
+                
                 # Проверяем Content-Type
                 content_type = response.headers.get('Content-Type', '')
                 if 'text/html' in content_type:
@@ -88,25 +373,91 @@ class SUiClient:
                         "найдите любой API запрос → скопируйте заголовок 'Token'"
                     )
                 
-                # Пытаемся распарсить JSON
-                try:
-                    response_data = await response.json()
-                except aiohttp.ContentTypeError as e:
-                    text = await response.text()
-                    logger.error(f"Не удалось распарсить JSON. Ответ: {text[:500]}")
-                    raise SUiAPIError(f"Неверный формат ответа от API: {str(e)}")
-
+                body = await response.read()
+                if model is not None and not self.decoder.native_typed:
+                    # Без msgspec модели собираются на Python (сотни мс на
+                    # десятках тысяч клиентов) - не держим цикл событий
+                    response_data = await asyncio.to_thread(self._decode, body, endpoint, model)
+                else:
+                    response_data = self._decode(body, endpoint, model)
                 if not response_data.get("success"):
                     error_msg = response_data.get("msg", "Неизвестная ошибка")
                     raise SUiAPIError(f"API Error: {error_msg}")
 
+                result = "ok"
                 return response_data
 
-        except SUiAPIError:
+        except SUiAPIError as e:
+            result = "connection_error" if isinstance(e, SUiConnectionError) else "api_error"
             raise
+        except asyncio.TimeoutError:
+            result = "timeout"
+            logger.error(f"Таймаут запроса к {url}")
+            raise SUiConnectionError("Панель не ответила вовремя")
         except aiohttp.ClientError as e:
+            result = "connection_error"
             logger.error(f"Ошибка при запросе к {url}: {e}")
-            raise SUiAPIError(f"Ошибка подключения: {str(e)}")
+            raise SUiConnectionError(f"Ошибка подключения: {str(e)}")
+        finally:
+            name = endpoint_name(endpoint)
+            REQUEST_DURATION.observe(time.perf_counter() - started, self.name, name)
+            REQUESTS.inc(self.name, name, result)
+
+    def _decode(self, body: bytes, endpoint: str, model: Any) -> dict[str, Any]:
+        """
+        Разобрать тело ответа.
+
+        С моделью поле obj сразу разбирается в её тип и проверяется. Ответ
+        с ошибкой, который под модель не подходит, разбирается повторно без
+        неё, чтобы показать сообщение панели.
+        """
+        error = None
+        if model is not None:
+            try:
+                response = self.decoder.decode_typed(body, response_type(model))
+            except JSONDecodeError as e:
+                error = e
+            else:
+                return {"success": response.success, "msg": response.msg, "obj": response.obj}
+
+        # Разбираем тело как есть, без промежуточной строки
+        try:
+            response_data = self.decoder.decode(body)
+        except JSONDecodeError as e:
+            logger.error(f"Не удалось распарсить JSON. Ответ: {body[:500].decode(errors='replace')}")
+            raise SUiAPIError(f"Неверный формат ответа от API: {str(e)}")
+        if not isinstance(response_data, dict):
+            raise SUiAPIError("Неверный формат ответа от API: ожидался объект")
+        if error is not None and response_data.get("success"):
+            logger.error(f"Ответ {endpoint} не совпадает с моделью: {error}")
+            raise SUiAPIError(f"Неверный формат ответа от API: {error}")
+        return response_data
+
+    async def gather(self, *requests: Awaitable[Any]) -> list[Any]:
+        """
+        Выполнить независимые запросы параллельно.
+
+        Ошибка одного запроса не прерывает остальные: на её месте в результате
+        возвращается экземпляр SUiAPIError, который вызывающий код проверяет сам.
+
+        Args:
+            requests: Корутины запросов
+
+        Returns:
+            Результаты в порядке запросов
+        """
+        await self._ensure_session()
+        results = await asyncio.gather(*requests, return_exceptions=True)
+
+        batch = []
+        for result in results:
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+            if isinstance(result, Exception) and not isinstance(result, SUiAPIError):
+                logger.error(f"Непредвиденная ошибка в пакетном запросе: {result!r}")
+                result = SUiAPIError(f"Ошибка запроса: {result}")
+            batch.append(result)
+        return batch
 
     async def get_inbounds(self, inbound_id: str | None = None) -> dict[str, Any]:
         """
@@ -121,18 +472,20 @@ class SUiClient:
         params = {"id": inbound_id} if inbound_id else None
         return await self._request("GET", "/apiv2/inbounds", params=params)
 
-    async def get_clients(self, client_id: str | None = None) -> dict[str, Any]:
+    async def get_clients(self, client_id: str | None = None, raw: bool = False) -> dict[str, Any]:
         """
         Получить список клиентов.
 
         Args:
             client_id: ID конкретного клиента (опционально)
+            raw: Вернуть клиентов словарями со всеми полями (для правки)
 
         Returns:
-            Данные клиентов
+            Данные клиентов; obj - ClientList или список Client (models.client_list)
         """
         params = {"id": client_id} if client_id else None
-        return await self._request("GET", "/apiv2/clients", params=params)
+        model = None if raw else ClientsObj
+        return await self._request("GET", "/apiv2/clients", params=params, model=model)
 
     async def get_status(self, resource: str = "cpu,ram,disk") -> dict[str, Any]:
         """
@@ -201,15 +554,15 @@ class SUiClient:
         self,
         obj: str,
         action: str,
-        data: dict[str, Any],
+        data: Any,
     ) -> dict[str, Any]:
         """
         Сохранить конфигурацию.
 
         Args:
-            obj: Тип объекта (inbound, client, etc.)
-            action: Действие (add, update, delete)
-            data: Данные для сохранения
+            obj: Тип объекта (inbounds, clients, etc.)
+            action: Действие (new, edit, del)
+            data: Данные для сохранения (объект, для del - его ID)
 
         Returns:
             Результат операции
@@ -263,10 +616,10 @@ class SUiClient:
             last_update: Временная метка последнего обновления
 
         Returns:
-            Полные данные системы
+            Полные данные системы; obj - LoadData
         """
         params = {"lu": last_update} if last_update else None
-        return await self._request("GET", "/apiv2/load", params=params)
+        return await self._request("GET", "/apiv2/load", params=params, model=LoadData)
 
     async def get_outbounds(self) -> dict[str, Any]:
         """
@@ -0,0 +1,372 @@
+"""Сбор истории трафика клиентов и inbounds в SQLite."""
+
+import asyncio
+import logging
+import sqlite3
+import time
+from typing import Any
+
+from src.client_store import ClientStore
+from src.snapshot import PanelSnapshot
+from src.sui_api import SUiAPIError, SUiClient
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    kind TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    up INTEGER NOT NULL,
+    down INTEGER NOT NULL,
+    PRIMARY KEY (kind, tag, ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts);
+CREATE TABLE IF NOT EXISTS counters (
+    kind TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    up INTEGER NOT NULL,
+    down INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    PRIMARY KEY (kind, tag)
+) WITHOUT ROWID;
+"""
+
+# Форматы группировки итогов по периодам
+PERIOD_FORMATS = {
+    "day": "%Y-%m-%d",
+    "month": "%Y-%m",
+}
+
+
+class TrafficStore:
+    """
+    Хранилище истории трафика.
+
+    В таблице samples лежат приращения трафика (байты за интервал), поэтому
+    скорость, топ и итоги за период считаются одной агрегирующей выборкой.
+    Таблица counters хранит последние накопительные счётчики клиентов и
+    отметку времени последней записи статистики inbound, чтобы после
+    перезапуска продолжить с того же места.
+
+    Методы синхронные; из асинхронного кода их вызывают через
+    asyncio.to_thread под общей блокировкой.
+    """
+
+    def __init__(self, path: str):
+        """
+        Инициализация хранилища.
+
+        Args:
+            path: Путь к файлу базы SQLite
+        """
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Соединение с базой, открываемое при первом обращении."""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def close(self):
+        """Закрыть соединение с базой."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def load_counters(self, kind: str) -> dict[str, tuple[int, int, int]]:
+        """
+        Последние сохранённые счётчики.
+
+        Args:
+            kind: Тип ресурса (client, inbound)
+
+        Returns:
+            Словарь тег -> (up, down, ts)
+        """
+        rows = self.conn.execute(
+            "SELECT tag, up, down, ts FROM counters WHERE kind = ?", (kind,)
+        )
+        return {tag: (up, down, ts) for tag, up, down, ts in rows}
+
+    def write(
+        self,
+        samples: list[tuple[str, str, int, int, int]],
+        counters: list[tuple[str, str, int, int, int]],
+    ):
+        """
+        Записать пачку приращений и счётчиков одной транзакцией.
+
+        Args:
+            samples: Кортежи (kind, tag, ts, up, down)
+            counters: Кортежи (kind, tag, up, down, ts)
+        """
+        with self.conn:
+            if samples:
+                self.conn.executemany(
+                    "INSERT INTO samples (kind, tag, ts, up, down) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (kind, tag, ts) DO UPDATE SET "
+                    "up = up + excluded.up, down = down + excluded.down",
+                    samples,
+                )
+            if counters:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO counters (kind, tag, up, down, ts) VALUES (?, ?, ?, ?, ?)",
+                    counters,
+                )
+
+    def prune(self, before: int) -> int:
+        """
+        Удалить записи старше отметки времени.
+
+        Args:
+            before: Unix timestamp
+
+        Returns:
+            Число удалённых записей
+        """
+        with self.conn:
+            return self.conn.execute("DELETE FROM samples WHERE ts < ?", (before,)).rowcount
+
+    def rates(self, kind: str, window: int, limit: int = 10) -> list[tuple[str, float, float]]:
+        """
+        Средняя скорость за последние `window` секунд.
+
+        Args:
+            kind: Тип ресурса
+            window: Окно в секундах
+            limit: Максимум строк
+
+        Returns:
+            Кортежи (тег, up байт/с, down байт/с) по убыванию суммарной скорости
+        """
+        since = int(time.time()) - window
+        rows = self.conn.execute(
+            "SELECT tag, SUM(up), SUM(down) FROM samples WHERE kind = ? AND ts >= ? "
+            "GROUP BY tag ORDER BY SUM(up) + SUM(down) DESC LIMIT ?",
+            (kind, since, limit),
+        )
+        return [(tag, up / window, down / window) for tag, up, down in rows]
+
+    def top(self, kind: str, since: int, limit: int = 10) -> list[tuple[str, int, int]]:
+        """
+        Самые активные по трафику с отметки времени.
+
+        Args:
+            kind: Тип ресурса
+            since: Unix timestamp начала периода
+            limit: Максимум строк
+
+        Returns:
+            Кортежи (тег, up, down) по убыванию суммы
+        """
+        rows = self.conn.execute(
+            "SELECT tag, SUM(up), SUM(down) FROM samples WHERE kind = ? AND ts >= ? "
+            "GROUP BY tag ORDER BY SUM(up) + SUM(down) DESC LIMIT ?",
+            (kind, since, limit),
+        )
+        return list(rows)
+
+    def totals(
+        self,
+        kind: str,
+        period: str,
+        since: int,
+        tag: str | None = None,
+    ) -> list[tuple[str, int, int]]:
+        """
+        Итоги по дням или месяцам (по локальному времени).
+
+        Args:
+            kind: Тип ресурса
+            period: "day" или "month"
+            since: Unix timestamp начала периода
+            tag: Тег (по умолчанию все)
+
+        Returns:
+            Кортежи (период, up, down) в хронологическом порядке
+        """
+        fmt = PERIOD_FORMATS[period]
+        query = (
+            f"SELECT strftime('{fmt}', ts, 'unixepoch', 'localtime') AS period, SUM(up), SUM(down) "
+            "FROM samples WHERE kind = ? AND ts >= ?"
+        )
+        params: list[Any] = [kind, since]
+        if tag is not None:
+            query += " AND tag = ?"
+            params.append(tag)
+        query += " GROUP BY period ORDER BY period"
+        return list(self.conn.execute(query, params))
+
+
+class TrafficCollector:
+    """
+    Периодически снимает счётчики трафика и пишет приращения в TrafficStore.
+
+    Трафик клиентов берётся из накопительных счётчиков up/down в кэше
+    клиентов, трафик inbounds - из /apiv2/stats, который отдаёт уже
+    приращения по времени; записи не новее последней сохранённой
+    пропускаются.
+    """
+
+    def __init__(
+        self,
+        client: SUiClient,
+        client_store: ClientStore,
+        snapshot: PanelSnapshot,
+        store: TrafficStore,
+        interval: float = 60.0,
+        retention_days: int = 90,
+    ):
+        """
+        Инициализация сборщика.
+
+        Args:
+            client: Клиент S-UI API
+            client_store: Кэш клиентов
+            snapshot: Снимок панели (список inbounds)
+            store: Хранилище истории
+            interval: Интервал сбора в секундах
+            retention_days: Сколько дней хранить историю
+        """
+        self.client = client
+        self.client_store = client_store
+        self.snapshot = snapshot
+        self.store = store
+        self.interval = interval
+        self.retention_days = retention_days
+        self._lock = asyncio.Lock()
+        self._counters: dict[str, dict[str, tuple[int, int, int]]] | None = None
+        self._last_prune = 0.0
+        self._task: asyncio.Task | None = None
+
+    async def query(self, method: str, *args: Any) -> Any:
+        """
+        Выполнить метод чтения TrafficStore в отдельном потоке.
+
+        Args:
+            method: Имя метода (rates, top, totals)
+            args: Аргументы метода
+
+        Returns:
+            Результат метода
+        """
+        async with self._lock:
+            return await asyncio.to_thread(getattr(self.store, method), *args)
+
+    async def collect(self):
+        """Снять счётчики и записать приращения."""
+        if self._counters is None:
+            async with self._lock:
+                self._counters = {
+                    kind: await asyncio.to_thread(self.store.load_counters, kind)
+                    for kind in ("client", "inbound")
+                }
+
+        now = int(time.time())
+        samples: list[tuple[str, str, int, int, int]] = []
+        counters: list[tuple[str, str, int, int, int]] = []
+
+        # Клиенты: разница накопительных счётчиков
+        previous = self._counters["client"]
+        for client in await self.client_store.all():
+            name, up, down = client.name, client.up, client.down
+            if not name:
+                continue
+            last = previous.get(name)
+            if last is not None and (up, down) == last[:2]:
+                continue
+            if last is not None:
+                # Счётчик уменьшился - трафик сбросили, считаем с нуля
+                delta_up = up - last[0] if up >= last[0] else up
+                delta_down = down - last[1] if down >= last[1] else down
+                if delta_up or delta_down:
+                    samples.append(("client", name, now, delta_up, delta_down))
+            previous[name] = (up, down, now)
+            counters.append(("client", name, up, down, now))
+
+        # Inbounds: записи /apiv2/stats за последний час
+        samples_inbound, counters_inbound = await self._collect_inbounds()
+        samples.extend(samples_inbound)
+        counters.extend(counters_inbound)
+
+        async with self._lock:
+            await asyncio.to_thread(self.store.write, samples, counters)
+            if time.monotonic() - self._last_prune > 86400:
+                pruned = await asyncio.to_thread(
+                    self.store.prune, now - self.retention_days * 86400
+                )
+                self._last_prune = time.monotonic()
+                if pruned:
+                    logger.info(f"Удалено устаревших записей трафика: {pruned}")
+
+        logger.debug(f"Записано приращений трафика: {len(samples)}")
+
+    async def _collect_inbounds(self) -> tuple[list, list]:
+        """Собрать статистику inbounds."""
+        await self.snapshot.ensure_loaded()
+        tags = [inbound.tag for inbound in self.snapshot.inbounds if inbound.tag]
+        if not tags:
+            return [], []
+
+        previous = self._counters["inbound"]
+        samples = []
+        counters = []
+        responses = await self.client.gather(
+            *(self.client.get_stats("inbound", tag, 1) for tag in tags)
+        )
+        for tag, response in zip(tags, responses):
+            if isinstance(response, SUiAPIError):
+                logger.warning(f"Не удалось получить статистику inbound {tag}: {response}")
+                continue
+            records = response.get("obj") or []
+            watermark = previous.get(tag, (0, 0, 0))[2]
+            newest = watermark
+            buckets: dict[int, list[int]] = {}
+            for record in records if isinstance(records, list) else []:
+                ts = record.get("dateTime", 0)
+                traffic = record.get("traffic", 0)
+                if ts <= watermark or not traffic:
+                    continue
+                bucket = buckets.setdefault(ts, [0, 0])
+                # direction = true - исходящий (uplink) трафик
+                bucket[0 if record.get("direction") else 1] += traffic
+                newest = max(newest, ts)
+            samples.extend(("inbound", tag, ts, up, down) for ts, (up, down) in buckets.items())
+            if newest > watermark:
+                previous[tag] = (0, 0, newest)
+                counters.append(("inbound", tag, 0, 0, newest))
+        return samples, counters
+
+    def start(self):
+        """Запустить фоновый сбор."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Остановить фоновый сбор и закрыть базу."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        async with self._lock:
+            self.store.close()
+
+    async def _run(self):
+        """Цикл фонового сбора."""
+        while True:
+            try:
+                await self.collect()
+            except SUiAPIError as e:
+                logger.warning(f"Не удалось собрать статистику трафика: {e}")
+            except Exception:
+                logger.exception("Непредвиденная ошибка при сборе статистики трафика")
+            await asyncio.sleep(self.interval)